@@ -0,0 +1,326 @@
+"""
+Local stand-ins for Tavily search and an OpenAI-compatible chat API.
+
+Both servers use only the standard library and expose knobs for latency,
+error rate and payload size so GrantResearchAgent can be load tested without
+spending real quota.
+
+- Search:  POST {search_url}/search            (Tavily request/response shape)
+- Extract: POST {search_url}/extract           (Tavily extract shape)
+- Chat:    POST {llm_url}/v1/chat/completions  (OpenAI shape, incl. "stream": true)
+
+Usage:
+    python loadtest/fake_services.py --latency-ms 300 --error-rate 0.05
+
+Then point the agent at them:
+    TAVILY_BASE_URL=http://127.0.0.1:8765 OPENROUTER_BASE_URL=http://127.0.0.1:8766/v1
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+_WORDS = (
+    "grant funding foundation nonprofit community health education tribal program "
+    "eligibility deadline award application rural capacity wellness youth research "
+    "federal state indigenous support initiative proposal budget outcomes"
+).split()
+
+
+@dataclass
+class FakeServiceConfig:
+    """Behavior of a fake service."""
+
+    latency_ms: float = 200.0  # median response latency
+    jitter: float = 0.5  # lognormal shape; 0 gives a fixed latency
+    error_rate: float = 0.0  # fraction of requests answered with an error
+    error_status: int = 503  # status used for injected errors (429 adds Retry-After)
+    payload_kb: float = 4.0  # raw_content size per search hit / completion size
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Sample one response delay in seconds."""
+        with self._lock:
+            if self.jitter <= 0:
+                return self.latency_ms / 1000.0
+            return self._rng.lognormvariate(
+                math.log(max(self.latency_ms, 0.1) / 1000.0), self.jitter
+            )
+
+    def should_fail(self) -> bool:
+        """Decide whether this request gets an injected error."""
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def text(self, kilobytes: float) -> str:
+        """Random filler text of roughly the given size."""
+        with self._lock:
+            words = []
+            size = 0
+            target = int(kilobytes * 1024)
+            while size < target:
+                word = self._rng.choice(_WORDS)
+                words.append(word)
+                size += len(word) + 1
+            return " ".join(words)
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """Shared request plumbing; subclasses implement ``respond``."""
+
+    config: FakeServiceConfig = FakeServiceConfig()
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is exercised
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send_json(
+        self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        time.sleep(self.config.delay())
+        if self.config.should_fail():
+            headers = {"Retry-After": "1"} if self.config.error_status == 429 else None
+            self._send_json(self.config.error_status, {"error": "injected failure"}, headers)
+            return
+        self.respond(request)
+
+    def respond(self, request: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class FakeTavilyHandler(_FakeHandler):
+    """Tavily-compatible /search and /extract endpoints."""
+
+    def respond(self, request: Dict[str, Any]) -> None:
+        if self.path.rstrip("/") == "/extract":
+            self._send_json(
+                200,
+                {
+                    "results": [
+                        {"url": url, "raw_content": self.config.text(self.config.payload_kb)}
+                        for url in request.get("urls", [])
+                    ],
+                    "failed_results": [],
+                    "response_time": 0.0,
+                },
+            )
+            return
+        if self.path.rstrip("/") != "/search":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        query = request.get("query", "")
+        max_results = int(request.get("max_results", 5))
+        include_raw = bool(request.get("include_raw_content"))
+        results = []
+        for i in range(max_results):
+            slug = uuid.uuid5(uuid.NAMESPACE_URL, f"{query}-{i}").hex[:12]
+            results.append(
+                {
+                    "title": f"{query[:40]} grant opportunity {i + 1}",
+                    "url": f"https://grants.example.org/{slug}?utm_source=fake",
+                    "content": self.config.text(0.4),
+                    "score": round(1.0 - i / max(max_results, 1), 3),
+                    "raw_content": (
+                        self.config.text(self.config.payload_kb) if include_raw else None
+                    ),
+                }
+            )
+        self._send_json(
+            200,
+            {
+                "query": query,
+                "results": results,
+                "response_time": 0.0,
+            },
+        )
+
+
+class FakeChatHandler(_FakeHandler):
+    """OpenAI-compatible /v1/chat/completions endpoint (plain and streaming)."""
+
+    def respond(self, request: Dict[str, Any]) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        model = request.get("model", "fake-model")
+        content = self.config.text(self.config.payload_kb)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not request.get("stream"):
+            self._send_json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": sum(
+                            len(str(m.get("content", ""))) // 4 for m in request.get("messages", [])
+                        ),
+                        "completion_tokens": len(content) // 4,
+                        "total_tokens": 0,
+                    },
+                },
+            )
+            return
+
+        # Streamed bodies have no Content-Length; end them by closing the connection
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = content.split(" ")
+        for start in range(0, len(words), 8):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": " ".join(words[start : start + 8]) + " "},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+
+def start_server(
+    handler: type, config: FakeServiceConfig, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start a fake service on a background thread.
+
+    Args:
+        handler: FakeTavilyHandler or FakeChatHandler
+        config: Latency / error / payload settings
+        host: Bind address
+        port: Port (0 picks a free one)
+
+    Returns:
+        Tuple of (server, base URL)
+    """
+    bound = type(handler.__name__, (handler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), bound)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def start_fake_services(
+    search_config: Optional[FakeServiceConfig] = None,
+    llm_config: Optional[FakeServiceConfig] = None,
+    search_port: int = 0,
+    llm_port: int = 0,
+) -> Dict[str, Any]:
+    """
+    Start both fakes and return their servers and agent-ready base URLs.
+
+    Returns:
+        Dict with ``search_url``, ``llm_url`` (ends in /v1) and ``servers``
+    """
+    search_server, search_url = start_server(
+        FakeTavilyHandler, search_config or FakeServiceConfig(), port=search_port
+    )
+    llm_server, llm_url = start_server(
+        FakeChatHandler,
+        llm_config or FakeServiceConfig(latency_ms=1500, payload_kb=2),
+        port=llm_port,
+    )
+    return {
+        "search_url": search_url,
+        "llm_url": f"{llm_url}/v1",
+        "servers": [search_server, llm_server],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run fake Tavily and OpenAI-compatible services")
+    parser.add_argument("--search-port", type=int, default=8765)
+    parser.add_argument("--llm-port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median search latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0, help="median LLM latency")
+    parser.add_argument("--jitter", type=float, default=0.5, help="lognormal shape (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--payload-kb", type=float, default=4.0, help="raw_content size per hit")
+    parser.add_argument("--llm-payload-kb", type=float, default=2.0, help="completion size")
+    args = parser.parse_args()
+
+    services = start_fake_services(
+        FakeServiceConfig(
+            args.latency_ms, args.jitter, args.error_rate, args.error_status, args.payload_kb
+        ),
+        FakeServiceConfig(
+            args.llm_latency_ms,
+            args.jitter,
+            args.error_rate,
+            args.error_status,
+            args.llm_payload_kb,
+        ),
+        search_port=args.search_port,
+        llm_port=args.llm_port,
+    )
+    print(f"Fake Tavily:  TAVILY_BASE_URL={services['search_url']}")
+    print(f"Fake LLM:     OPENROUTER_BASE_URL={services['llm_url']}")
+    print("Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in services["servers"]:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
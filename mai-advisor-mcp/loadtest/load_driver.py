@@ -0,0 +1,208 @@
+"""
+Load driver for GrantResearchAgent.
+
+Runs many research_grants calls concurrently against the local fake services
+(or any endpoints given via --search-url / --llm-url) and reports
+p50/p95/p99 latency per pipeline stage, plus error counts and the resilience
+layer's retry / circuit metrics.
+
+Usage:
+    python loadtest/load_driver.py --runs 40 --concurrency 8 --depth deep
+    python loadtest/load_driver.py --error-rate 0.1 --latency-ms 400 --jitter 0.8
+    python loadtest/load_driver.py --search-rate 100 --llm-rate 100   # ignore provider quotas
+    python loadtest/load_driver.py --depth basic --jitter 1.0 --hedge   # hedge slow searches
+    python loadtest/load_driver.py --payload-kb 64 --eager-content --no-spill   # payloads in memory
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Literal
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_services import FakeServiceConfig, start_fake_services  # noqa: E402
+from grant_agent import GrantResearchAgent  # noqa: E402
+from latency_stats import summarize  # noqa: E402
+from resilience import configure_provider, resilience_stats  # noqa: E402
+from hedging import hedging_stats  # noqa: E402
+from query_planner import QueryHistory, QueryPlanner  # noqa: E402
+from search_operators import GrantSearchCriteria  # noqa: E402
+
+TOPICS = [
+    ["community health", "tribal"],
+    ["youth", "STEM education"],
+    ["rural", "broadband"],
+    ["indigenous", "language revitalization"],
+    ["food sovereignty"],
+    ["mental health", "wellness"],
+]
+
+
+async def run_load(
+    agent: GrantResearchAgent,
+    runs: int,
+    concurrency: int,
+    depth: Literal["basic", "deep"],
+    lazy_content: bool = True,
+) -> Dict[str, Any]:
+    """Execute ``runs`` research calls with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    stage_samples: Dict[str, List[float]] = {}
+    errors: List[str] = []
+
+    async def one(index: int) -> None:
+        criteria = GrantSearchCriteria(
+            keywords=TOPICS[index % len(TOPICS)] + [f"run{index}"],
+            organization_type="nonprofit",
+        )
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await agent.research_grants(
+                    criteria, depth=depth, use_llm_cache=False, lazy_content=lazy_content
+                )
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                return
+            stage_samples.setdefault("wall", []).append(time.perf_counter() - started)
+            for stage, seconds in result.get("timings", {}).items():
+                stage_samples.setdefault(stage, []).append(seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsed": elapsed,
+        "errors": errors,
+        "stages": {stage: summarize(values) for stage, values in stage_samples.items()},
+        "calls": agent.stage_latency.summary(),
+    }
+
+
+def print_table(title: str, stats: Dict[str, Dict[str, float]]) -> None:
+    """Print count and p50/p95/p99 in milliseconds."""
+    print(f"\n{title}")
+    print(f"{'stage':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, row in sorted(stats.items()):
+        if not row.get("count"):
+            continue
+        print(
+            f"{stage:<14}{row['count']:>7}"
+            f"{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}"
+            f"{row['p99'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test GrantResearchAgent")
+    parser.add_argument("--runs", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--depth", choices=["basic", "deep"], default="deep")
+    parser.add_argument(
+        "--search-url", help="use an existing search endpoint instead of starting fakes"
+    )
+    parser.add_argument("--llm-url", help="use an existing OpenAI-compatible endpoint (…/v1)")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--payload-kb", type=float, default=4.0)
+    parser.add_argument(
+        "--eager-content", action="store_true", help="request raw content for every hit"
+    )
+    parser.add_argument(
+        "--search-rate", type=float, help="override the Tavily token-bucket rate (req/s)"
+    )
+    parser.add_argument(
+        "--llm-rate", type=float, help="override the OpenRouter token-bucket rate (req/s)"
+    )
+    parser.add_argument("--hedge", action="store_true", help="hedge slow search calls")
+    parser.add_argument(
+        "--triage-model", help="fast model for per-result triage (two-tier routing)"
+    )
+    parser.add_argument(
+        "--no-spill", action="store_true", help="keep raw search payloads in memory"
+    )
+    args = parser.parse_args()
+
+    if args.search_rate:
+        configure_provider(
+            "tavily", rate_per_second=args.search_rate, burst=max(1, int(args.search_rate * 2))
+        )
+    if args.llm_rate:
+        configure_provider(
+            "openrouter", rate_per_second=args.llm_rate, burst=max(1, int(args.llm_rate * 2))
+        )
+
+    search_url, llm_url = args.search_url, args.llm_url
+    if not (search_url and llm_url):
+        services = start_fake_services(
+            FakeServiceConfig(
+                args.latency_ms, args.jitter, args.error_rate, args.error_status, args.payload_kb
+            ),
+            FakeServiceConfig(
+                args.llm_latency_ms, args.jitter, args.error_rate, args.error_status, 2.0
+            ),
+        )
+        search_url = search_url or services["search_url"]
+        llm_url = llm_url or services["llm_url"]
+
+    agent = GrantResearchAgent(
+        tavily_api_key=os.environ.get("TAVILY_API_KEY", "load-test"),
+        openrouter_api_key=os.environ.get("OPENROUTER_API_KEY", "load-test"),
+        tavily_base_url=search_url,
+        openrouter_base_url=llm_url,
+        enable_search_cache=False,
+        enable_llm_cache=False,
+        enable_opportunity_store=False,  # keep synthetic grants out of the real store
+        # Synthetic yields must not reach the real query history
+        query_planner=QueryPlanner(
+            QueryHistory(os.path.join(tempfile.mkdtemp(), "query_history.sqlite"))
+        ),
+        hedge_searches=args.hedge,
+        fast_model_name=args.triage_model,
+        spill_results=not args.no_spill,
+    )
+
+    report = asyncio.run(
+        run_load(
+            agent, args.runs, args.concurrency, args.depth, lazy_content=not args.eager_content
+        )
+    )
+
+    print(f"Runs: {args.runs}  concurrency: {args.concurrency}  depth: {args.depth}")
+    print(
+        f"Elapsed: {report['elapsed']:.2f}s  "
+        f"throughput: {args.runs / report['elapsed']:.2f} runs/s  errors: {len(report['errors'])}"
+    )
+    # ru_maxrss is in kilobytes on Linux
+    print(
+        f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB  "
+        f"raw payloads: {'in memory' if args.no_spill else 'spilled to disk'}"
+    )
+    print_table("Per-run stage latency", report["stages"])
+    print_table("Per-call latency", report["calls"])
+    print("\nResilience:")
+    for provider, metrics in resilience_stats().items():
+        print(f"  {provider}: {metrics}")
+    print("\nModel tiers:")
+    for tier, metrics in agent.model_usage.summary().items():
+        print(f"  {tier}: {metrics}")
+    if args.hedge:
+        print("\nHedging:")
+        for provider, metrics in hedging_stats().items():
+            print(f"  {provider}: {metrics}")
+    for error in report["errors"][:5]:
+        print(f"  error: {error}")
+
+
+if __name__ == "__main__":
+    main()
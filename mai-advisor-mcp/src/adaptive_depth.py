@@ -0,0 +1,152 @@
+"""
+Latency-budgeted depth selection for research runs.
+
+``depth`` alone is all-or-nothing: "deep" always waits for a full LLM
+synthesis, "basic" never uses one. Given a latency budget instead, the
+pipeline is sized from live latency estimates (the agent's rolling
+LatencyRecorder, falling back to priors before any calls were made):
+
+1. Analysis: the strongest model whose p90 call latency fits next to one
+   wave of searches, else the fast model, else no LLM at all.
+2. Search fan-out: as many waves of ``max_concurrency`` web searches as
+   the time left allows (local index only when not even one wave fits).
+3. Raw content: page fetches only when their p90 still fits.
+
+Anything left out is listed in ``skipped`` so the result can say so.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from latency_stats import LatencyRecorder
+
+# Seconds assumed for a stage before the recorder has samples
+DEFAULT_LATENCY_PRIORS = {
+    "search_call": 2.0,
+    "fetch_call": 1.5,
+    "llm_call": 12.0,
+    "llm_call_fast": 4.0,
+}
+
+# Share of the budget held back for planning, dedup, ranking and reporting
+RESERVE_FRACTION = 0.1
+
+
+@dataclass
+class DepthPlan:
+    """Pipeline shape chosen for one latency budget."""
+
+    budget: float  # seconds
+    search_waves: int  # waves of parallel web searches (0 = local index only)
+    max_searches: int  # web search calls (the planner's cost budget)
+    fetch_content: bool  # fetch full page content for the top hits
+    analysis: Optional[str]  # "default", "fast" or None (no LLM)
+    estimates: Dict[str, float] = field(default_factory=dict)  # p90 seconds per call type
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def analysis_seconds(self) -> float:
+        """Estimated LLM time of the planned analysis (0 without one)."""
+        if self.analysis is None:
+            return 0.0
+        return self.estimates.get("llm_call_fast" if self.analysis == "fast" else "llm_call", 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (seconds rounded to milliseconds)."""
+        data = asdict(self)
+        data["budget_ms"] = round(data.pop("budget") * 1000)
+        data["estimates_ms"] = {
+            stage: round(s * 1000) for stage, s in data.pop("estimates").items()
+        }
+        return data
+
+
+def latency_estimates(
+    recorder: LatencyRecorder, quantile: float = 90, priors: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """
+    Live per-call latency estimates.
+
+    Args:
+        recorder: Rolling per-stage latency samples
+        quantile: Percentile used as the estimate
+        priors: Estimates for stages without samples (defaults to
+            DEFAULT_LATENCY_PRIORS)
+
+    Returns:
+        Seconds per call for every stage in ``priors``
+    """
+    priors = priors or DEFAULT_LATENCY_PRIORS
+    estimates = {}
+    for stage, prior in priors.items():
+        observed = recorder.percentile(stage, quantile)
+        estimates[stage] = observed if observed is not None else prior
+    return estimates
+
+
+def plan_depth(
+    budget: float,
+    estimates: Dict[str, float],
+    concurrency: int = 4,
+    max_waves: int = 2,
+    fast_model: bool = False,
+    allow_analysis: bool = True,
+    local_index: bool = False,
+) -> DepthPlan:
+    """
+    Choose search width, content fetching and analysis model for a budget.
+
+    Args:
+        budget: Latency budget in seconds
+        estimates: Seconds per call (see latency_estimates)
+        concurrency: Web searches run in parallel per wave
+        max_waves: Upper bound on search waves
+        fast_model: A fast model is configured
+        allow_analysis: The caller asked for LLM analysis (deep depth)
+        local_index: An offline index can answer when web search cannot
+
+    Returns:
+        The plan
+    """
+    available = budget * (1 - RESERVE_FRACTION)
+    search_call = estimates["search_call"]
+    skipped: List[str] = []
+
+    # Analysis is the most valuable stage, as long as one search wave fits beside it
+    analysis = None
+    if allow_analysis:
+        options = [("default", estimates["llm_call"])]
+        if fast_model:
+            options.append(("fast", estimates["llm_call_fast"]))
+        for name, seconds in options:
+            if search_call + seconds <= available:
+                analysis = name
+                available -= seconds
+                break
+        else:
+            skipped.append("analysis")
+        if analysis == "fast":
+            skipped.append("default_model")
+
+    waves = int(min(max_waves, available // search_call)) if search_call > 0 else max_waves
+    if waves == 0 and not local_index:
+        waves = 1  # better a late answer than none
+    if waves == 0:
+        skipped.append("web_search")
+    elif waves < max_waves:
+        skipped.append("extra_search_waves")
+    available -= waves * search_call
+
+    fetch_content = estimates["fetch_call"] <= available
+    if not fetch_content:
+        skipped.append("fetch")
+
+    return DepthPlan(
+        budget=budget,
+        search_waves=waves,
+        max_searches=waves * max(1, concurrency),
+        fetch_content=fetch_content,
+        analysis=analysis,
+        estimates={stage: round(seconds, 4) for stage, seconds in estimates.items()},
+        skipped=skipped,
+    )
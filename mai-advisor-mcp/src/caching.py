@@ -0,0 +1,255 @@
+"""
+Persistent caches for MAI Advisor.
+
+Search results and LLM responses are cached in local SQLite files so repeated
+research for the same dorks, and repeated analysis of the same prompts, is
+served from disk instead of spending Tavily quota and LLM tokens.
+
+Cache files live in mcp_cache/ under the project root by default, or in the
+directory named by the MAI_ADVISOR_CACHE_DIR environment variable.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+
+def default_cache_dir() -> Path:
+    """Return the directory used for cache files, creating it if needed."""
+    env_dir = os.environ.get("MAI_ADVISOR_CACHE_DIR")
+    cache_dir = Path(env_dir) if env_dir else Path(__file__).parent.parent / "mcp_cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+class SQLiteTTLCache:
+    """
+    Key/value cache stored in SQLite with per-entry TTL and LRU eviction.
+
+    Values are JSON-serialized. Entries past their TTL are treated as misses
+    and removed on access. When the table grows past ``max_entries`` the least
+    recently used entries are evicted. The cache is safe to share between
+    threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = 86400,
+        max_entries: int = 5000,
+        filename: str = "cache.sqlite",
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/<filename>)
+            ttl_seconds: Time-to-live for new entries
+            max_entries: Maximum number of entries kept before LRU eviction
+            filename: File name used when ``path`` is not given
+        """
+        self.path = Path(path) if path else default_cache_dir() / filename
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable cache key from JSON-serializable parts."""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least recently used entries if over capacity.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl_seconds: Override the default TTL for this entry
+        """
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        payload = json.dumps(value, default=str, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now, now + ttl, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Remove all expired entries and return how many were deleted."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            self.expirations += cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SearchResultCache(SQLiteTTLCache):
+    """Cache of Tavily search responses keyed by the full search request."""
+
+    def __init__(
+        self, path: Optional[str] = None, ttl_seconds: float = 86400, max_entries: int = 5000
+    ):
+        """
+        Initialize the search result cache.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/search_cache.sqlite)
+            ttl_seconds: How long a search response stays fresh (default 24h)
+            max_entries: Maximum cached searches before LRU eviction
+        """
+        super().__init__(
+            path=path,
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            filename="search_cache.sqlite",
+        )
+
+    @staticmethod
+    def search_key(query: str, max_results: int, topic: str, include_raw_content: bool) -> str:
+        """Build the cache key for one search request."""
+        return SQLiteTTLCache.make_key("search", query, max_results, topic, include_raw_content)
+
+    @staticmethod
+    def extract_key(url: str) -> str:
+        """Build the cache key for one page's extracted content."""
+        return SQLiteTTLCache.make_key("extract", url)
+
+
+class LLMResponseCache(SQLiteTTLCache):
+    """Exact-match cache of LLM responses keyed by normalized prompt, model and temperature."""
+
+    def __init__(
+        self, path: Optional[str] = None, ttl_seconds: float = 7 * 86400, max_entries: int = 2000
+    ):
+        """
+        Initialize the LLM response cache.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/llm_cache.sqlite)
+            ttl_seconds: How long a response stays fresh (default 7 days)
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        super().__init__(
+            path=path, ttl_seconds=ttl_seconds, max_entries=max_entries, filename="llm_cache.sqlite"
+        )
+
+    @staticmethod
+    def normalize_prompt(messages: Sequence[Any]) -> list:
+        """
+        Reduce chat messages to (role, text) pairs with whitespace collapsed.
+
+        Args:
+            messages: LangChain messages (anything with ``type`` and ``content``)
+
+        Returns:
+            List of [role, normalized_text] pairs
+        """
+        normalized = []
+        for message in messages:
+            role = getattr(message, "type", message.__class__.__name__)
+            content = getattr(message, "content", message)
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True, default=str)
+            normalized.append([role, " ".join(content.split())])
+        return normalized
+
+    @staticmethod
+    def response_key(messages: Sequence[Any], model_name: str, temperature: Optional[float]) -> str:
+        """Build the cache key for one LLM request."""
+        return SQLiteTTLCache.make_key(
+            "llm", model_name, temperature, LLMResponseCache.normalize_prompt(messages)
+        )
@@ -0,0 +1,227 @@
+"""
+Record/replay cassettes for Tavily searches and LLM calls.
+
+A cassette is a JSONL file holding real responses captured once from the live
+providers, one interaction per line, appended as it is recorded. In replay
+mode GrantResearchAgent answers every search and LLM call from the cassette
+instead of the network, so the whole research pipeline can be profiled and
+regression-tested on an offline CI box.
+
+Modes:
+- "record": call the live provider and append every response to the cassette
+- "replay": answer only from the cassette; a missing interaction is an error
+- "auto": replay when the cassette has the interaction, otherwise record it
+
+Repeated identical requests replay their recorded responses in order.
+Replay can sleep to imitate provider latency, either the latency observed
+while recording or a seeded synthetic distribution.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, cast
+
+from caching import SQLiteTTLCache
+
+CassetteMode = Literal["record", "replay", "auto"]
+
+
+class CassetteMissError(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Simulated latency applied when replaying interactions.
+
+    Distributions:
+    - "none": no delay
+    - "recorded": the latency measured while recording (times ``scale``)
+    - "fixed": always ``mean`` seconds
+    - "uniform": uniform in [mean - spread, mean + spread]
+    - "lognormal": median ``mean`` seconds, shape ``spread`` (heavy tail)
+    """
+
+    distribution: Literal["none", "recorded", "fixed", "uniform", "lognormal"] = "none"
+    mean: float = 0.0
+    spread: float = 0.0
+    scale: float = 1.0
+    seed: Optional[int] = 0
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded: float = 0.0) -> float:
+        """Return a delay in seconds for one replayed interaction."""
+        with self._lock:
+            if self.distribution == "recorded":
+                delay = recorded * self.scale
+            elif self.distribution == "fixed":
+                delay = self.mean
+            elif self.distribution == "uniform":
+                delay = self._rng.uniform(self.mean - self.spread, self.mean + self.spread)
+            elif self.distribution == "lognormal":
+                delay = self._rng.lognormvariate(math.log(max(self.mean, 1e-6)), self.spread)
+            else:
+                delay = 0.0
+        return max(0.0, delay)
+
+
+class Cassette:
+    """JSONL-file store of recorded provider interactions."""
+
+    def __init__(
+        self, path: str, mode: CassetteMode = "auto", latency: Optional[LatencyProfile] = None
+    ):
+        """
+        Open (or create) a cassette.
+
+        Args:
+            path: Cassette file (JSONL)
+            mode: "record", "replay" or "auto"; "record" starts the file over
+            latency: Simulated latency for replayed interactions
+        """
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency or LatencyProfile()
+        self._lock = threading.Lock()
+        self._interactions: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[int]] = {}
+        self._cursor: Dict[str, int] = {}
+        self.replayed = 0
+        self.recorded = 0
+
+        if mode != "replay":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        if mode == "record":
+            self.path.write_text("", encoding="utf-8")
+        elif self.path.exists():
+            with open(self.path, encoding="utf-8") as fp:
+                for line in fp:
+                    if line.strip():
+                        self._add(json.loads(line))
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """
+        Build a cassette from MAI_ADVISOR_CASSETTE (path) and
+        MAI_ADVISOR_CASSETTE_MODE (default "replay"), or return None.
+        """
+        path = os.environ.get("MAI_ADVISOR_CASSETTE")
+        if not path:
+            return None
+        mode = cast(CassetteMode, os.environ.get("MAI_ADVISOR_CASSETTE_MODE", "replay"))
+        return cls(path, mode=mode)  # __init__ rejects unknown modes
+
+    @staticmethod
+    def request_key(kind: str, request: Dict[str, Any]) -> str:
+        """Stable key for a request of the given kind ("search", "llm")."""
+        return SQLiteTTLCache.make_key("cassette", kind, request)
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        self._index.setdefault(interaction["key"], []).append(len(self._interactions))
+        self._interactions.append(interaction)
+
+    def _next(self, kind: str, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Next recorded interaction for a request, cycling through repeats."""
+        if self.mode == "record":
+            return None
+        key = self.request_key(kind, request)
+        with self._lock:
+            positions = self._index.get(key)
+            if not positions:
+                if self.mode == "replay":
+                    raise CassetteMissError(f"No recorded {kind} interaction for {request!r}"[:300])
+                return None
+            cursor = self._cursor.get(key, 0)
+            self._cursor[key] = cursor + 1
+            self.replayed += 1
+            return self._interactions[positions[cursor % len(positions)]]
+
+    def replay(self, kind: str, request: Dict[str, Any]) -> Optional[Any]:
+        """
+        Return the recorded response for a request, sleeping for simulated latency.
+
+        Args:
+            kind: Interaction kind ("search" or "llm")
+            request: JSON-serializable request description
+
+        Returns:
+            Recorded response, or None if it should be fetched live
+
+        Raises:
+            CassetteMissError: In replay mode when nothing was recorded
+        """
+        interaction = self._next(kind, request)
+        if interaction is None:
+            return None
+        delay = self.latency.sample(interaction.get("elapsed", 0.0))
+        if delay:
+            time.sleep(delay)
+        return interaction["response"]
+
+    async def areplay(self, kind: str, request: Dict[str, Any]) -> Optional[Any]:
+        """Async variant of ``replay`` (sleeps without blocking the loop)."""
+        interaction = self._next(kind, request)
+        if interaction is None:
+            return None
+        delay = self.latency.sample(interaction.get("elapsed", 0.0))
+        if delay:
+            await asyncio.sleep(delay)
+        return interaction["response"]
+
+    def record(self, kind: str, request: Dict[str, Any], response: Any, elapsed: float) -> None:
+        """
+        Append a live interaction to the cassette file (one line, no rewrite).
+
+        Args:
+            kind: Interaction kind ("search" or "llm")
+            request: JSON-serializable request description
+            response: JSON-serializable response
+            elapsed: Observed latency in seconds
+        """
+        if self.mode == "replay":
+            return
+        interaction = {
+            "kind": kind,
+            "key": self.request_key(kind, request),
+            "request": request,
+            "response": response,
+            "elapsed": round(elapsed, 4),
+        }
+        line = json.dumps(interaction, default=str) + "\n"
+        with self._lock:
+            self._add(interaction)
+            self.recorded += 1
+            with open(self.path, "a", encoding="utf-8") as fp:
+                fp.write(line)
+
+    async def arecord(
+        self, kind: str, request: Dict[str, Any], response: Any, elapsed: float
+    ) -> None:
+        """Async variant of ``record`` (file I/O runs in a worker thread)."""
+        if self.mode == "replay":
+            return
+        await asyncio.to_thread(self.record, kind, request, response, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of stored, replayed and newly recorded interactions."""
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "mode": self.mode,
+                "interactions": len(self._interactions),
+                "replayed": self.replayed,
+                "recorded": self.recorded,
+            }
@@ -0,0 +1,328 @@
+"""
+Process-wide pooled HTTP clients for Tavily and OpenRouter.
+
+Every GrantResearchAgent used to build its own TavilyClient and ChatOpenAI,
+each with a private connection pool, so each Gradio session and MCP server
+paid fresh TLS handshakes. This registry lazily creates one keep-alive
+httpx.Client per process and one httpx.AsyncClient per running event loop
+(an async pool cannot outlive or cross its loop, so a second
+``asyncio.run(...)`` gets a fresh one), and hands out search clients and chat
+models that share them.
+
+Pool size defaults to MAI_ADVISOR_HTTP_POOL_SIZE (or 20) and can be changed
+with ``configure_http_pool()``.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+_lock = threading.Lock()
+_settings: Dict[str, Any] = {
+    "pool_size": int(os.environ.get("MAI_ADVISOR_HTTP_POOL_SIZE", "20")),
+    "keepalive_expiry": 120.0,
+    "timeout": 60.0,
+}
+_http_client: Optional[httpx.Client] = None
+_async_http_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_search_clients: Dict[Tuple[Optional[str], str], "PooledTavilyClient"] = {}
+# Keyed by (model, api key, base url, temperature, event loop or None)
+_chat_models: Dict[Tuple[Any, ...], ChatOpenAI] = {}
+_closing: Set["asyncio.Future[None]"] = set()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _drop_closed_loops() -> None:
+    """Forget clients and models of event loops that have been closed (holds _lock)."""
+    for loop in [loop for loop in _async_http_clients if loop.is_closed()]:
+        # The pool's connections died with its loop; there is nothing to close
+        del _async_http_clients[loop]
+    for key in [key for key in _chat_models if key[-1] is not None and key[-1].is_closed()]:
+        del _chat_models[key]
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close an async client on the loop it belongs to."""
+    if loop.is_closed():
+        return
+    if loop is _running_loop():
+        task = loop.create_task(client.aclose())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        loop.run_until_complete(client.aclose())
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_settings["pool_size"],
+        max_keepalive_connections=_settings["pool_size"],
+        keepalive_expiry=_settings["keepalive_expiry"],
+    )
+
+
+def configure_http_pool(
+    pool_size: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """
+    Change pool settings; clients created afterwards use the new values.
+
+    Existing shared clients are closed and dropped from the registry so the
+    next request builds them with the new limits. Async clients are closed on
+    their own event loop (scheduled when that loop is running).
+
+    Args:
+        pool_size: Maximum (and keep-alive) connections per client
+        keepalive_expiry: Seconds an idle connection is kept open
+        timeout: Default request timeout in seconds
+    """
+    global _http_client
+    with _lock:
+        if pool_size is not None:
+            _settings["pool_size"] = max(1, pool_size)
+        if keepalive_expiry is not None:
+            _settings["keepalive_expiry"] = keepalive_expiry
+        if timeout is not None:
+            _settings["timeout"] = timeout
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        async_clients = list(_async_http_clients.items())
+        _async_http_clients.clear()
+        _search_clients.clear()
+        _chat_models.clear()
+    for loop, client in async_clients:
+        _close_async_client(loop, client)
+
+
+def get_http_client() -> httpx.Client:
+    """Shared keep-alive client for blocking calls."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=_settings["timeout"])
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for async calls on the running event loop.
+
+    An httpx.AsyncClient's connections belong to the loop that opened them,
+    so there is one client per loop: the MCP servers and Gradio app (one
+    long-lived loop) share a single pool, while code that calls
+    ``asyncio.run(...)`` repeatedly gets a fresh pool per loop.
+
+    Raises:
+        RuntimeError: When called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _drop_closed_loops()
+        client = _async_http_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=_limits(), timeout=_settings["timeout"])
+            _async_http_clients[loop] = client
+        return client
+
+
+class PooledTavilyClient:
+    """Minimal Tavily search client on top of the shared httpx pool."""
+
+    def __init__(self, api_key: Optional[str], base_url: str = TAVILY_BASE_URL):
+        """
+        Initialize the client.
+
+        Args:
+            api_key: Tavily API key
+            base_url: Tavily API root
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+
+    def _payload(
+        self, query: str, max_results: int, include_raw_content: bool, topic: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        if not self.api_key:
+            raise ValueError("Tavily API key is missing; set TAVILY_API_KEY")
+        return {
+            "query": query,
+            "max_results": max_results,
+            "include_raw_content": include_raw_content,
+            "topic": topic,
+            **kwargs,
+        }
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 5,
+        include_raw_content: bool = False,
+        topic: Literal["general", "news", "finance"] = "general",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """
+        Run a Tavily search (same arguments and response as TavilyClient.search).
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response
+        """
+        response = get_http_client().post(
+            f"{self.base_url}/search",
+            json=self._payload(query, max_results, include_raw_content, topic, **kwargs),
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        payload: Dict[str, Any] = response.json()
+        return payload
+
+    async def asearch(
+        self,
+        query: str,
+        max_results: int = 5,
+        include_raw_content: bool = False,
+        topic: Literal["general", "news", "finance"] = "general",
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Async variant of ``search`` using the shared async pool."""
+        response = await get_async_http_client().post(
+            f"{self.base_url}/search",
+            json=self._payload(query, max_results, include_raw_content, topic, **kwargs),
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        payload: Dict[str, Any] = response.json()
+        return payload
+
+    def extract(
+        self, urls: List[str], extract_depth: Literal["basic", "advanced"] = "basic"
+    ) -> Dict[str, Any]:
+        """
+        Fetch full page content for URLs (same response as TavilyClient.extract).
+
+        Args:
+            urls: Page URLs (Tavily accepts up to 20 per call)
+            extract_depth: Tavily extraction depth
+
+        Returns:
+            Dict with ``results`` ({url, raw_content}) and ``failed_results``
+
+        Raises:
+            httpx.HTTPStatusError: On a non-2xx response
+        """
+        if not self.api_key:
+            raise ValueError("Tavily API key is missing; set TAVILY_API_KEY")
+        response = get_http_client().post(
+            f"{self.base_url}/extract",
+            json={"urls": urls, "extract_depth": extract_depth},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        payload: Dict[str, Any] = response.json()
+        return payload
+
+    async def aextract(
+        self, urls: List[str], extract_depth: Literal["basic", "advanced"] = "basic"
+    ) -> Dict[str, Any]:
+        """Async variant of ``extract`` using the shared async pool."""
+        if not self.api_key:
+            raise ValueError("Tavily API key is missing; set TAVILY_API_KEY")
+        response = await get_async_http_client().post(
+            f"{self.base_url}/extract",
+            json={"urls": urls, "extract_depth": extract_depth},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        payload: Dict[str, Any] = response.json()
+        return payload
+
+
+def get_search_client(
+    api_key: Optional[str] = None, base_url: str = TAVILY_BASE_URL
+) -> PooledTavilyClient:
+    """
+    Shared Tavily client for an API key and endpoint.
+
+    Args:
+        api_key: Tavily API key (defaults to TAVILY_API_KEY)
+        base_url: Tavily API root
+
+    Returns:
+        Pooled search client
+    """
+    key = api_key or os.environ.get("TAVILY_API_KEY")
+    with _lock:
+        client = _search_clients.get((key, base_url))
+        if client is None:
+            client = PooledTavilyClient(key, base_url)
+            _search_clients[(key, base_url)] = client
+        return client
+
+
+def get_chat_model(
+    model_name: str,
+    api_key: Optional[str] = None,
+    base_url: str = OPENROUTER_BASE_URL,
+    temperature: float = 0.3,
+) -> ChatOpenAI:
+    """
+    Shared ChatOpenAI instance for a model/endpoint/temperature combination.
+
+    The model uses the process-wide httpx pools. Called inside an event loop
+    it is bound to that loop's async pool (one instance per loop); called
+    outside one, it only gets the sync pool and is meant for blocking calls.
+    Its built-in retries are off because the resilience layer retries instead.
+
+    Args:
+        model_name: Model identifier
+        api_key: API key (defaults to OPENROUTER_API_KEY)
+        base_url: OpenAI-compatible API root
+        temperature: Sampling temperature
+
+    Returns:
+        Chat model
+    """
+    key = api_key or os.environ.get("OPENROUTER_API_KEY")
+    loop = _running_loop()
+    cache_key = (model_name, key, base_url, temperature, loop)
+    http_client = get_http_client()
+    http_async_client = get_async_http_client() if loop is not None else None
+    with _lock:
+        model = _chat_models.get(cache_key)
+        if model is None:
+            model = ChatOpenAI(
+                model=model_name,
+                api_key=SecretStr(key) if key else None,
+                base_url=base_url,
+                temperature=temperature,
+                max_retries=0,
+                stream_usage=True,  # token counts for streamed responses too
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+            _chat_models[cache_key] = model
+        return model
@@ -0,0 +1,298 @@
+"""
+Token-budgeted context builder for grant analysis prompts.
+
+Every snippet returned by the search fan-out is scored against the search
+criteria with a local BM25 ranker, then packed greedily (best first) into a
+fixed token budget. The LLM sees the most relevant snippets regardless of
+which engine or query produced them, and nothing else.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from search_operators import GrantSearchCriteria
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+
+# Words that carry no relevance signal in grant listings
+_STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "for",
+    "from",
+    "in",
+    "is",
+    "it",
+    "of",
+    "on",
+    "or",
+    "that",
+    "the",
+    "to",
+    "with",
+    "this",
+    "will",
+    "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count (about 4 characters per token for English)."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+class BM25Ranker:
+    """Okapi BM25 scoring over an in-memory list of documents."""
+
+    def __init__(self, documents: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Index tokenized documents.
+
+        Args:
+            documents: One token list per document
+            k1: Term-frequency saturation parameter
+            b: Length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(doc) for doc in documents]
+        self.doc_lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.doc_lengths) / len(documents)) if documents else 0.0
+
+        doc_freq: Counter = Counter()
+        for freqs in self.term_freqs:
+            doc_freq.update(freqs.keys())
+        n_docs = len(documents)
+        self.idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()
+        }
+
+    def score(self, query_terms: List[str]) -> List[float]:
+        """Return one BM25 score per indexed document."""
+        scores = []
+        for freqs, length in zip(self.term_freqs, self.doc_lengths):
+            norm = (
+                self.k1 * (1 - self.b + self.b * length / self.avg_length)
+                if self.avg_length
+                else self.k1
+            )
+            total = 0.0
+            for term in query_terms:
+                tf = freqs.get(term)
+                if tf:
+                    total += self.idf.get(term, 0.0) * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(total)
+        return scores
+
+
+@dataclass
+class ContextSnippet:
+    """One search hit considered for the analysis prompt."""
+
+    engine: str
+    query: str
+    title: str
+    url: str
+    content: str
+    score: float = 0.0
+    facts: str = ""  # locally extracted amount/deadline/eligibility, if any
+
+
+@dataclass
+class PackedContext:
+    """Result of packing snippets into a token budget."""
+
+    text: str
+    token_count: int
+    token_budget: int
+    snippets: List[ContextSnippet] = field(default_factory=list)
+    candidates: int = 0
+    overflow: int = 0  # relevant snippets that did not fit the budget
+
+
+def criteria_terms(criteria: GrantSearchCriteria) -> List[str]:
+    """Query terms used to rank snippets for a set of criteria."""
+    parts = list(criteria.keywords)
+    for value in (criteria.sector, criteria.organization_type, criteria.location):
+        if value:
+            parts.append(value)
+    terms = tokenize(" ".join(parts))
+    # Keep order stable but drop duplicates so repeated keywords don't dominate
+    return list(dict.fromkeys(terms))
+
+
+def collect_snippets(
+    search_results: List[Dict[str, Any]], max_chars: int = 800
+) -> List[ContextSnippet]:
+    """
+    Flatten engine/query result sets into snippets.
+
+    Args:
+        search_results: Result sets as produced by research_grants
+        max_chars: Maximum characters of content kept per snippet
+
+    Returns:
+        Snippets in their original order
+    """
+    snippets = []
+    for result_set in search_results:
+        engine = result_set.get("engine", "unknown")
+        query = result_set.get("query", "")
+        for result in result_set.get("results", {}).get("results", []):
+            content = " ".join((result.get("content") or "").split())
+            snippets.append(
+                ContextSnippet(
+                    engine=", ".join(result.get("engines") or [engine]),
+                    query=query,
+                    title=result.get("title") or "No title",
+                    url=result.get("canonical_url") or result.get("url", ""),
+                    content=content[:max_chars],
+                )
+            )
+    return snippets
+
+
+def format_snippet(index: int, snippet: ContextSnippet) -> str:
+    """Render one snippet as it appears in the prompt."""
+    block = (
+        f"\nResult {index}: {snippet.title}\n" f"Source: {snippet.engine}\n" f"URL: {snippet.url}\n"
+    )
+    if snippet.facts:
+        block += f"Facts: {snippet.facts}\n"
+    return block + f"Content: {snippet.content}"
+
+
+def rank_snippets(
+    criteria: GrantSearchCriteria,
+    search_results: List[Dict[str, Any]],
+    max_snippet_chars: int = 800,
+) -> List[ContextSnippet]:
+    """
+    Score every snippet with BM25 against the criteria, best first.
+
+    Snippets with no term overlap are left out unless nothing matched at all,
+    and repeated URLs keep only their best-scoring snippet.
+
+    Args:
+        criteria: Search criteria supplying the ranking terms
+        search_results: Result sets as produced by research_grants
+        max_snippet_chars: Maximum characters of content kept per snippet
+
+    Returns:
+        Ranked snippets
+    """
+    snippets = collect_snippets(search_results, max_chars=max_snippet_chars)
+    if not snippets:
+        return []
+
+    ranker = BM25Ranker([tokenize(f"{s.title} {s.content}") for s in snippets])
+    for snippet, score in zip(snippets, ranker.score(criteria_terms(criteria))):
+        snippet.score = score
+
+    ranked = sorted(snippets, key=lambda s: s.score, reverse=True)
+    if ranked[0].score > 0:
+        ranked = [s for s in ranked if s.score > 0]
+
+    unique = []
+    seen_urls = set()
+    for snippet in ranked:
+        if snippet.url and snippet.url in seen_urls:
+            continue
+        seen_urls.add(snippet.url)
+        unique.append(snippet)
+    return unique
+
+
+def pack_snippets(ranked: List[ContextSnippet], token_budget: int) -> PackedContext:
+    """Greedily pack ranked snippets, skipping any that no longer fit."""
+    chosen: List[ContextSnippet] = []
+    parts: List[str] = []
+    used = 0
+    for snippet in ranked:
+        block = format_snippet(len(chosen) + 1, snippet)
+        cost = estimate_tokens(block)
+        if used + cost > token_budget:
+            continue
+        chosen.append(snippet)
+        parts.append(block)
+        used += cost
+
+    return PackedContext(
+        text="\n".join(parts),
+        token_count=used,
+        token_budget=token_budget,
+        snippets=chosen,
+        candidates=len(ranked),
+        overflow=len(ranked) - len(chosen),
+    )
+
+
+def pack_context(
+    criteria: GrantSearchCriteria,
+    search_results: List[Dict[str, Any]],
+    token_budget: int = 3000,
+    max_snippet_chars: int = 800,
+) -> PackedContext:
+    """
+    Rank every snippet with BM25 and greedily fill the token budget.
+
+    Snippets are taken best-first; one that does not fit the remaining budget
+    is skipped so smaller, lower-ranked snippets can still use the space.
+
+    Args:
+        criteria: Search criteria supplying the ranking terms
+        search_results: Result sets as produced by research_grants
+        token_budget: Maximum estimated tokens for the packed context
+        max_snippet_chars: Maximum characters of content kept per snippet
+
+    Returns:
+        Packed context text with its estimated token count
+    """
+    ranked = rank_snippets(criteria, search_results, max_snippet_chars=max_snippet_chars)
+    return pack_snippets(ranked, token_budget)
+
+
+def chunk_snippets(
+    ranked: List[ContextSnippet], token_budget: int = 3000, max_chunks: Optional[int] = None
+) -> List[PackedContext]:
+    """
+    Split ranked snippets into consecutive chunks that each fit the budget.
+
+    Used by map-reduce analysis: each chunk becomes one map call, so the best
+    snippets land in the first chunks.
+
+    Args:
+        ranked: Snippets in rank order
+        token_budget: Maximum estimated tokens per chunk
+        max_chunks: Stop after this many chunks (remaining snippets are dropped)
+
+    Returns:
+        Packed chunks in rank order
+    """
+    chunks: List[PackedContext] = []
+    remaining = list(ranked)
+    while remaining and (max_chunks is None or len(chunks) < max_chunks):
+        chunk = pack_snippets(remaining, token_budget)
+        if not chunk.snippets:
+            # A single snippet larger than the budget; give it a chunk of its own
+            chunk = pack_snippets(remaining[:1], estimate_tokens(format_snippet(1, remaining[0])))
+        chosen = {id(snippet) for snippet in chunk.snippets}
+        remaining = [snippet for snippet in remaining if id(snippet) not in chosen]
+        chunk.candidates = len(chunk.snippets)
+        chunk.overflow = 0
+        chunks.append(chunk)
+    return chunks
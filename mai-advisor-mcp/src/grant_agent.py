@@ -1,15 +1,221 @@
 """Grant research agent using deep agent architecture."""
+import asyncio
+import inspect
+import io
+import logging
 import os
-from typing import Literal, List, Dict, Any, Optional
-from tavily import TavilyClient
+import time
+import uuid
+from contextlib import aclosing, nullcontext
+from dataclasses import asdict, replace
+from typing import Literal, List, Dict, Any, Awaitable, Optional, Set, Tuple, Callable
+from langchain_core.messages import HumanMessage, SystemMessage, BaseMessage
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
 
 from search_operators import (
     GrantSearchCriteria,
     UnifiedSearchOperatorGenerator,
     SearchEngine
 )
+from caching import SearchResultCache, LLMResponseCache
+from context_builder import (
+    ContextSnippet,
+    PackedContext,
+    chunk_snippets,
+    criteria_terms,
+    pack_snippets,
+    rank_snippets,
+)
+from grant_extraction import (
+    GrantRecord,
+    apply_records,
+    extract_records,
+    format_amount,
+    rank_records,
+)
+from result_dedup import deduplicate_results
+from result_filter import filter_snippets
+from result_fusion import DEFAULT_RRF_K, fuse_results, fuse_snippets, ranking_summary
+from query_planner import (
+    DEFAULT_CALL_COSTS,
+    QueryPlanner,
+    SearchBudget,
+    count_new_relevant,
+    yield_flattened,
+)
+from adaptive_depth import DepthPlan, latency_estimates, plan_depth
+from result_spill import ResultSpill, prune_spills, write_json_report
+from model_routing import (
+    SYNTHESIS,
+    TRIAGE,
+    TRIAGE_SYSTEM_PROMPT,
+    ModelUsage,
+    parse_triage,
+    response_tokens,
+)
+from resilience import get_provider_guard
+from hedging import HedgePolicy, get_hedge_policy
+from client_pool import (
+    OPENROUTER_BASE_URL,
+    TAVILY_BASE_URL,
+    get_chat_model,
+    get_search_client,
+)
+from cassette import Cassette, CassetteMissError
+from run_checkpoint import RunCheckpoint, RunCheckpointStore
+from opportunity_store import OpportunityStore
+from local_index import LocalGrantIndex
+from latency_stats import LatencyRecorder
+
+# Diagnostics go through logging: the MCP stdio server uses stdout for JSON-RPC
+logger = logging.getLogger(__name__)
+
+# Callback receiving partial LLM output as it streams (may be sync or async)
+TokenCallback = Callable[[str], Any]
+# Callback receiving pipeline progress events (may be sync or async):
+# {"stage": str, "message": str, "progress": int, "total": int}
+ProgressCallback = Callable[[Dict[str, Any]], Any]
+
+# Tavily bills extraction per 5 successful URLs, so fetch in batches of 5
+EXTRACT_BATCH_SIZE = 5
+
+ANALYSIS_SYSTEM_PROMPT = """You are an expert grant research analyst. Your job is to:
+
+1. Analyze grant opportunities from search results
+2. Identify the most relevant and promising grants
+3. Extract key information: deadline, amount, eligibility, requirements
+4. Assess fit with the user's criteria
+5. Provide strategic recommendations
+
+Be thorough, accurate, and prioritize actionable information."""
+
+MAP_SYSTEM_PROMPT = """You are a grant research assistant extracting facts from one batch of search results.
+
+For every result that describes a real funding opportunity, output one entry:
+- Grant name and funder
+- URL
+- Funding amount (or "unknown")
+- Deadline (or "unknown")
+- Eligibility in one line
+- Relevance to the criteria (1-10) with a one-line reason
+
+Results may carry a "Facts" line with amount, deadline and eligibility extracted
+from the full page; prefer it over guessing from the short excerpt.
+
+Skip results that are not funding opportunities. Be concise; do not write a report."""
+
+
+def _format_amount_range(criteria: Optional[GrantSearchCriteria]) -> str:
+    """Render the criteria amount range as "$min - $max" for prompts and reports."""
+    if criteria is None:
+        return "N/A"
+    minimum = f"${criteria.amount_min:,}" if criteria.amount_min else "$0"
+    maximum = f"${criteria.amount_max:,}" if criteria.amount_max else "unlimited"
+    return f"{minimum} - {maximum}"
+
+
+def _criteria_summary(criteria: GrantSearchCriteria) -> str:
+    """Render the criteria block used in analysis prompts."""
+    return f"""- Keywords: {', '.join(criteria.keywords)}
+- Organization Type: {criteria.organization_type or 'Any'}
+- Sector: {criteria.sector or 'Any'}
+- Location: {criteria.location or 'Any'}
+- Funding Range: {_format_amount_range(criteria)}"""
+
+
+def _format_opportunities(opportunities: List[Dict[str, Any]]) -> str:
+    """Render locally extracted opportunities as a markdown list."""
+    lines = []
+    for index, opportunity in enumerate(opportunities, 1):
+        lines.append(f"### {index}. {opportunity['title']}")
+        lines.append(f"- **URL**: {opportunity['url']}")
+        if opportunity.get("amount_min") or opportunity.get("amount_max"):
+            lines.append(
+                f"- **Amount**: {format_amount(opportunity.get('amount_min'), opportunity.get('amount_max'))}"
+            )
+        if opportunity.get("deadline"):
+            passed = " (passed)" if opportunity.get("expired") else ""
+            lines.append(f"- **Deadline**: {opportunity['deadline']}{passed}")
+        elif opportunity.get("rolling"):
+            lines.append("- **Deadline**: rolling")
+        if opportunity.get("eligibility"):
+            lines.append(f"- **Eligibility**: {', '.join(opportunity['eligibility'])}")
+        if opportunity.get("locations"):
+            lines.append(f"- **Location**: {', '.join(opportunity['locations']).title()}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+async def _emit_token(on_token: TokenCallback, token: str) -> None:
+    """Deliver a token to a sync or async callback."""
+    result = on_token(token)
+    if inspect.isawaitable(result):
+        await result
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until a ``time.perf_counter()`` deadline (None without one)."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.perf_counter())
+
+
+def _search_failure(engine: SearchEngine, query: str, error: Any) -> Dict[str, Any]:
+    """Failed-search record kept in the run's result."""
+    if isinstance(error, BaseException):
+        error = f"{type(error).__name__}: {error}"
+    return {"engine": engine.value, "query": query, "error": str(error)}
+
+
+def _capped_timeout(
+    timeout: Optional[float], deadline: Optional[float]
+) -> Tuple[Optional[float], bool]:
+    """Per-call timeout capped by a deadline, and whether the deadline is the binding limit."""
+    remaining = _remaining(deadline)
+    if remaining is not None and (timeout is None or remaining < timeout):
+        return remaining, True
+    return timeout, False
+
+
+def _search_progress(
+    engine: SearchEngine,
+    query: str,
+    result_set: Optional[Dict[str, Any]],
+    cut_off: List[Tuple[SearchEngine, str]],
+) -> str:
+    """Progress message for one finished search (see _run_search)."""
+    if result_set is None:
+        reason = "cut off, out of time" if (engine, query) in cut_off else "search failed"
+        return f"{engine.value}: {reason}"
+    if "elapsed" not in result_set:
+        return f"{engine.value}: resumed from checkpoint"
+    hits = len(result_set.get("results", {}).get("results", []))
+    return f"{engine.value}: {hits} results"
+
+
+class _ProgressReporter:
+    """Counts completed pipeline steps and forwards them to a progress callback."""
+
+    def __init__(self, callback: Optional[ProgressCallback], total: int):
+        self.callback = callback
+        self.total = total
+        self.completed = 0
+
+    async def step(self, stage: str, message: str, advance: int = 1) -> None:
+        """Advance by ``advance`` steps and report; 0 just sends a status message."""
+        self.completed = min(self.total, self.completed + advance)
+        if self.callback is None:
+            return
+        result = self.callback(
+            {
+                "stage": stage,
+                "message": message,
+                "progress": self.completed,
+                "total": self.total,
+            }
+        )
+        if inspect.isawaitable(result):
+            await result
 
 
 class GrantResearchAgent:
@@ -24,19 +230,179 @@ class GrantResearchAgent:
         self,
         tavily_api_key: Optional[str] = None,
         openrouter_api_key: Optional[str] = None,
-        model_name: str = "google/gemini-2.0-flash-thinking-exp:free"
+        model_name: str = "google/gemini-2.0-flash-thinking-exp:free",
+        max_concurrency: int = 4,
+        search_timeout: Optional[float] = 30.0,
+        search_cache: Optional[SearchResultCache] = None,
+        enable_search_cache: bool = True,
+        llm_cache: Optional[LLMResponseCache] = None,
+        enable_llm_cache: bool = True,
+        context_token_budget: int = 3000,
+        llm_concurrency: int = 4,
+        max_map_chunks: int = 8,
+        cassette: Optional[Cassette] = None,
+        tavily_base_url: Optional[str] = None,
+        openrouter_base_url: Optional[str] = None,
+        raw_content_top_k: int = 8,
+        checkpoint_store: Optional[RunCheckpointStore] = None,
+        enable_checkpoints: bool = True,
+        opportunity_store: Optional[OpportunityStore] = None,
+        enable_opportunity_store: bool = True,
+        local_index: Optional[LocalGrantIndex] = None,
+        enable_local_index: bool = True,
+        rank_fusion: bool = True,
+        engine_weights: Optional[Dict[str, float]] = None,
+        rrf_k: int = DEFAULT_RRF_K,
+        query_planner: Optional[QueryPlanner] = None,
+        enable_query_planner: bool = True,
+        fast_model_name: Optional[str] = None,
+        hedge_searches: bool = False,
+        search_hedge: Optional[HedgePolicy] = None,
+        triage_candidates: int = 40,
+        spill_results: bool = True,
+        spill_dir: Optional[str] = None,
     ):
-        """Initialize the grant research agent."""
-        self.tavily_client = TavilyClient(
-            api_key=tavily_api_key or os.environ.get("TAVILY_API_KEY")
-        )
-        self.model = ChatOpenAI(
-            model=model_name,
-            api_key=openrouter_api_key or os.environ.get("OPENROUTER_API_KEY"),
-            base_url="https://openrouter.ai/api/v1",
-            temperature=0.3
+        """
+        Initialize the grant research agent.
+
+        Args:
+            tavily_api_key: Tavily API key (defaults to TAVILY_API_KEY)
+            openrouter_api_key: OpenRouter API key (defaults to OPENROUTER_API_KEY)
+            model_name: OpenRouter model identifier
+            max_concurrency: Maximum number of searches in flight at once
+            search_timeout: Per-query timeout in seconds (None disables it)
+            search_cache: Search result cache to use (a default on-disk cache
+                is created when omitted)
+            enable_search_cache: Set False to always hit Tavily
+            llm_cache: LLM response cache to use (a default on-disk cache is
+                created when omitted)
+            enable_llm_cache: Set False to always call the LLM
+            context_token_budget: Approximate token budget for the search
+                results packed into the analysis prompt (per map chunk in
+                map-reduce mode)
+            llm_concurrency: Maximum parallel LLM calls in map-reduce mode
+            max_map_chunks: Maximum number of map calls per analysis
+            cassette: Record/replay cassette for searches and LLM calls
+                (defaults to MAI_ADVISOR_CASSETTE if set). Disable the caches
+                when benchmarking so every call reaches the cassette.
+            tavily_base_url: Tavily API root (defaults to TAVILY_BASE_URL env
+                or the public API); point at a local stand-in for load tests
+            openrouter_base_url: OpenAI-compatible API root (defaults to
+                OPENROUTER_BASE_URL env or OpenRouter)
+            raw_content_top_k: Number of top-ranked pages whose full content
+                is fetched when research runs with lazy content
+            checkpoint_store: Store for resumable runs (a default on-disk
+                store is created when omitted); only used for runs given a
+                ``run_id``
+            enable_checkpoints: Set False to never checkpoint runs
+            opportunity_store: Store that every run feeds its extracted
+                opportunities into (a default on-disk store is created when
+                omitted)
+            enable_opportunity_store: Set False to not remember opportunities
+            local_index: Offline grant index queried as SearchEngine.LOCAL
+                (defaults to the index built by ``local_index.py ingest``,
+                if there is one)
+            enable_local_index: Set False to search the web engines only
+            rank_fusion: Order hits by reciprocal-rank fusion of every
+                engine/query list and the BM25 relevance ranking; False
+                ranks by BM25 alone
+            engine_weights: RRF weight per engine name (e.g.
+                {"local": 2.0}); engines not listed weigh 1.0
+            rrf_k: RRF rank damping constant
+            query_planner: Chooses which engines and query variants to run
+                from their historical yield (a default planner with on-disk
+                history is created when omitted, except with a cassette)
+            enable_query_planner: Set False to always run the first two
+                queries of every engine. With a cassette and no explicit
+                ``query_planner`` the planner is off, so the issued queries
+                do not depend on history and replay stays deterministic
+            fast_model_name: Fast, cheap OpenRouter model for the triage tier
+                (per-result relevance triage and map-reduce extraction);
+                ``model_name`` then only runs the final synthesis.
+                Latency-budgeted runs also fall back to it for synthesis
+            hedge_searches: Send a duplicate of any Tavily search still
+                running after its adaptive hedge delay and use the first
+                answer (extra load is capped; see hedging)
+            search_hedge: Hedge policy to use instead of the process-wide
+                Tavily policy (implies ``hedge_searches``)
+            triage_candidates: Best-ranked results screened by triage; only
+                the ones it keeps reach synthesis
+            spill_results: Write raw search payloads to a per-run JSONL file
+                as they arrive and keep only references to them in results
+                (see result_spill); False keeps them in memory
+            spill_dir: Directory for spill files (defaults to <cache dir>/runs;
+                files older than a day are pruned on start)
+        """
+        # Clients come from a process-wide registry so every agent shares
+        # the same keep-alive connection pools
+        self.tavily_client = get_search_client(
+            api_key=tavily_api_key or os.environ.get("TAVILY_API_KEY"),
+            base_url=tavily_base_url or os.environ.get("TAVILY_BASE_URL", TAVILY_BASE_URL),
         )
+        self.model_name = model_name
+        self.temperature = 0.3
+        # Chat models are looked up per call (see the model properties) so
+        # each event loop uses its own async connection pool
+        self._chat_settings: Dict[str, Any] = {
+            "api_key": openrouter_api_key or os.environ.get("OPENROUTER_API_KEY"),
+            "base_url": openrouter_base_url
+            or os.environ.get("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL),
+            "temperature": self.temperature,
+        }
+        self.fast_model_name = fast_model_name
+        self.triage_candidates = max(1, triage_candidates)
+        # Calls, cache hits, latency and tokens per model tier, across runs
+        self.model_usage = ModelUsage()
         self.search_generator = UnifiedSearchOperatorGenerator()
+        # Rate limiting, retries and circuit breaking shared across agents
+        self.search_guard = get_provider_guard("tavily")
+        self.llm_guard = get_provider_guard("openrouter")
+        # Optional hedging of slow searches, shared like the guards
+        self.search_hedge = search_hedge or (get_hedge_policy("tavily") if hedge_searches else None)
+        self.max_concurrency = max(1, max_concurrency)
+        self.search_timeout = search_timeout
+        self.context_token_budget = context_token_budget
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.max_map_chunks = max(1, max_map_chunks)
+        self.raw_content_top_k = max(0, raw_content_top_k)
+        self.rank_fusion = rank_fusion
+        self.engine_weights = dict(engine_weights or {})
+        self.rrf_k = rrf_k
+        self.cassette = cassette or Cassette.from_env()
+        # Rolling per-stage latency samples (seconds) across all runs
+        self.stage_latency = LatencyRecorder()
+        if enable_search_cache:
+            self.search_cache: Optional[SearchResultCache] = search_cache or SearchResultCache()
+        else:
+            self.search_cache = None
+        if enable_llm_cache:
+            self.llm_cache: Optional[LLMResponseCache] = llm_cache or LLMResponseCache()
+        else:
+            self.llm_cache = None
+        if enable_checkpoints:
+            self.checkpoints: Optional[RunCheckpointStore] = (
+                checkpoint_store or RunCheckpointStore()
+            )
+        else:
+            self.checkpoints = None
+        if enable_opportunity_store:
+            self.opportunity_store: Optional[OpportunityStore] = (
+                opportunity_store or OpportunityStore()
+            )
+        else:
+            self.opportunity_store = None
+        if enable_local_index:
+            self.local_index = local_index or LocalGrantIndex.open_default()
+        else:
+            self.local_index = None
+        if enable_query_planner and (query_planner is not None or self.cassette is None):
+            self.query_planner: Optional[QueryPlanner] = query_planner or QueryPlanner()
+        else:
+            self.query_planner = None
+        self.spill_results = spill_results
+        self.spill_dir = spill_dir
+        if spill_results:
+            prune_spills(spill_dir)
     
     def internet_search(
         self,
@@ -44,24 +410,263 @@ class GrantResearchAgent:
         max_results: int = 10,
         topic: Literal["general", "news", "finance"] = "general",
         include_raw_content: bool = True,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Run a web search using Tavily.
         
+        Identical requests are answered from the search result cache while the
+        cached response is fresh. Live requests go through the shared Tavily
+        guard (rate limit, retry with backoff, circuit breaker) and, with
+        ``hedge_searches``, are duplicated when they run unusually long.
+
         Args:
             query: Search query string
             max_results: Maximum number of results to return
             topic: Search topic category
             include_raw_content: Whether to include full page content
+            use_cache: Read and write the search result cache
         
         Returns:
             Search results from Tavily
         """
-        return self.tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic,
+        cache = self.search_cache if use_cache else None
+        if cache is not None:
+            key = cache.search_key(query, max_results, topic, include_raw_content)
+            cached: Optional[Dict[str, Any]] = cache.get(key)
+            if cached is not None:
+                return cached
+
+        results = self._live_search(query, max_results, topic, include_raw_content)
+
+        if cache is not None:
+            cache.set(key, results)
+        return results
+
+    def local_search(self, query: str, max_results: int = 10) -> Dict[str, Any]:
+        """
+        Query the offline grant index (SearchEngine.LOCAL).
+
+        Args:
+            query: Local index query (see LocalIndexQueryGenerator)
+            max_results: Maximum number of results to return
+
+        Returns:
+            Search results in the Tavily response shape, with full listing
+            content as ``raw_content`` (empty without a local index)
+        """
+        if self.local_index is None:
+            return {"query": query, "results": []}
+        started = time.perf_counter()
+        results = self.local_index.search(query, max_results=max_results)
+        self.stage_latency.record("local_search", time.perf_counter() - started)
+        return results
+
+    def _live_search(
+        self, query: str, max_results: int, topic: str, include_raw_content: bool
+    ) -> Dict[str, Any]:
+        """Search Tavily through the provider guard, or replay/record via the cassette."""
+        request = {
+            "query": query,
+            "max_results": max_results,
+            "topic": topic,
+            "include_raw_content": include_raw_content,
+        }
+        if self.cassette is not None:
+            replayed: Optional[Dict[str, Any]] = self.cassette.replay("search", request)
+            if replayed is not None:
+                return replayed
+
+        def search() -> Dict[str, Any]:
+            return self.search_guard.call(
+                self.tavily_client.search,
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic,
+            )
+
+        started = time.perf_counter()
+        results = self.search_hedge.run(search) if self.search_hedge is not None else search()
+        elapsed = time.perf_counter() - started
+        self.stage_latency.record("search_call", elapsed)
+        if self.cassette is not None:
+            self.cassette.record("search", request, results, elapsed)
+        return results
+
+    def extract_content(self, urls: List[str], use_cache: bool = True) -> Dict[str, str]:
+        """
+        Fetch full page content for URLs using Tavily extract.
+
+        Pages already in the search cache are not fetched again. Failed URLs
+        are left out of the result.
+
+        Args:
+            urls: Page URLs
+            use_cache: Read and write the search result cache
+
+        Returns:
+            URL -> raw page content
+        """
+        cache = self.search_cache if use_cache else None
+        contents: Dict[str, str] = {}
+        missing = []
+        for url in urls:
+            cached = cache.get(cache.extract_key(url)) if cache is not None else None
+            if cached is not None:
+                contents[url] = cached
+            else:
+                missing.append(url)
+        if not missing:
+            return contents
+
+        response = self._live_extract(missing)
+        for item in response.get("results", []):
+            url = item.get("url")
+            content = item.get("raw_content")
+            if url and content:
+                contents[url] = content
+                if cache is not None:
+                    cache.set(cache.extract_key(url), content)
+        return contents
+
+    def _live_extract(self, urls: List[str]) -> Dict[str, Any]:
+        """Call Tavily extract through the provider guard, or replay/record via the cassette."""
+        request = {"urls": urls}
+        if self.cassette is not None:
+            replayed: Optional[Dict[str, Any]] = self.cassette.replay("extract", request)
+            if replayed is not None:
+                return replayed
+
+        started = time.perf_counter()
+        response = self.search_guard.call(self.tavily_client.extract, urls)
+        elapsed = time.perf_counter() - started
+        self.stage_latency.record("fetch_call", elapsed)
+        if self.cassette is not None:
+            self.cassette.record("extract", request, response, elapsed)
+        return response
+
+    async def ainternet_search(
+        self,
+        query: str,
+        max_results: int = 10,
+        topic: Literal["general", "news", "finance"] = "general",
+        include_raw_content: bool = True,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of ``internet_search``.
+
+        The request runs on the shared async connection pool, so cancelling
+        the calling task aborts the HTTP request instead of leaving a worker
+        thread to finish it and spend quota.
+        """
+        cache = self.search_cache if use_cache else None
+        if cache is not None:
+            key = cache.search_key(query, max_results, topic, include_raw_content)
+            cached: Optional[Dict[str, Any]] = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return cached
+
+        request = {
+            "query": query,
+            "max_results": max_results,
+            "topic": topic,
+            "include_raw_content": include_raw_content,
+        }
+        results = None
+        if self.cassette is not None:
+            results = await self.cassette.areplay("search", request)
+        if results is None:
+
+            def search() -> Awaitable[Dict[str, Any]]:
+                return self.search_guard.acall(
+                    lambda: self.tavily_client.asearch(
+                        query,
+                        max_results=max_results,
+                        include_raw_content=include_raw_content,
+                        topic=topic,
+                    )
+                )
+
+            started = time.perf_counter()
+            results = await (
+                self.search_hedge.arun(search) if self.search_hedge is not None else search()
+            )
+            elapsed = time.perf_counter() - started
+            self.stage_latency.record("search_call", elapsed)
+            if self.cassette is not None:
+                await self.cassette.arecord("search", request, results, elapsed)
+
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, results)
+        return results
+
+    async def aextract_content(self, urls: List[str], use_cache: bool = True) -> Dict[str, str]:
+        """Async variant of ``extract_content`` (cancellation aborts the request)."""
+        cache = self.search_cache if use_cache else None
+        contents: Dict[str, str] = {}
+        missing = []
+        for url in urls:
+            cached = (
+                await asyncio.to_thread(cache.get, cache.extract_key(url))
+                if cache is not None
+                else None
+            )
+            if cached is not None:
+                contents[url] = cached
+            else:
+                missing.append(url)
+        if not missing:
+            return contents
+
+        request = {"urls": missing}
+        response: Optional[Dict[str, Any]] = None
+        if self.cassette is not None:
+            response = await self.cassette.areplay("extract", request)
+        if response is None:
+            started = time.perf_counter()
+            response = await self.search_guard.acall(lambda: self.tavily_client.aextract(missing))
+            elapsed = time.perf_counter() - started
+            self.stage_latency.record("fetch_call", elapsed)
+            if self.cassette is not None:
+                await self.cassette.arecord("extract", request, response, elapsed)
+
+        for item in response.get("results", []):
+            url = item.get("url")
+            content = item.get("raw_content")
+            if url and content:
+                contents[url] = content
+                if cache is not None:
+                    await asyncio.to_thread(cache.set, cache.extract_key(url), content)
+        return contents
+
+    def find_stored_opportunities(
+        self,
+        criteria: GrantSearchCriteria,
+        limit: int = 50,
+        include_expired: bool = False,
+        require_amount: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer a search from opportunities found by earlier runs, without any
+        web search or LLM call.
+
+        Args:
+            criteria: Grant search criteria (keywords, location, sector,
+                deadline_months and amount range are applied)
+            limit: Maximum opportunities returned
+            include_expired: Also return opportunities whose deadline passed
+            require_amount: Skip opportunities with no known award amount
+
+        Returns:
+            Stored opportunities ordered by soonest deadline (empty when the
+            store is disabled)
+        """
+        if self.opportunity_store is None:
+            return []
+        return self.opportunity_store.find(
+            criteria, include_expired=include_expired, require_amount=require_amount, limit=limit
         )
     
     def generate_search_strategies(
@@ -75,14 +680,35 @@ class GrantResearchAgent:
             criteria: Grant search criteria
         
         Returns:
-            Dictionary mapping search engines to query lists
+            Dictionary mapping search engines to query lists (the local
+            index is included only when one is available)
         """
-        return self.search_generator.generate_queries(criteria)
+        engines = [
+            engine
+            for engine in SearchEngine
+            if engine != SearchEngine.LOCAL or self.local_index is not None
+        ]
+        return self.search_generator.generate_queries(criteria, engines)
     
     async def research_grants(
         self,
         criteria: GrantSearchCriteria,
-        depth: Literal["basic", "deep"] = "deep"
+        depth: Literal["basic", "deep"] = "deep",
+        concurrent: bool = True,
+        on_token: Optional[TokenCallback] = None,
+        use_llm_cache: bool = True,
+        deduplicate: bool = True,
+        analysis_mode: Literal["single", "map_reduce", "auto"] = "auto",
+        max_results: int = 5,
+        extract_facts: bool = True,
+        lazy_content: bool = True,
+        run_id: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        timeout: Optional[float] = None,
+        filter_results: bool = True,
+        budget: Optional[SearchBudget] = None,
+        latency_budget_ms: Optional[float] = None,
+        triage: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Conduct comprehensive grant research using AI-guided search.
@@ -90,45 +716,804 @@ class GrantResearchAgent:
         Args:
             criteria: Grant search criteria
             depth: Research depth (basic or deep)
+            concurrent: Run the per-engine queries in parallel (bounded by
+                max_concurrency) instead of one after another
+            on_token: Optional callback that receives analysis tokens as
+                they stream from the LLM (deep mode only)
+            use_llm_cache: Reuse a cached analysis for an identical prompt
+            deduplicate: Collapse the same page found by several engines
+                (canonical URL or near-identical content) into one hit
+            analysis_mode: Deep analysis strategy; "auto" uses map-reduce
+                only when the ranked results overflow one prompt
+            max_results: Results requested per query
+            extract_facts: Pull amount, deadline and eligibility out of page
+                content locally; facts re-rank results, shrink the analysis
+                prompt and make up the "opportunities" list
+            lazy_content: Search with snippets only, then fetch full page
+                content for the ``raw_content_top_k`` best-ranked hits; False
+                requests raw content for every hit up front
+            run_id: Checkpoint every completed search, page fetch and LLM
+                response under this ID; calling again with the same ID after
+                a failure resumes the run and repeats only unfinished work
+            on_progress: Optional callback receiving an event as each search
+                completes, when results are ready, and as analysis starts and
+                finishes
+            timeout: Deadline in seconds for the whole run. When it passes (or
+                the calling task is cancelled) in-flight searches, page
+                fetches and LLM calls are aborted; work already checkpointed
+                under ``run_id`` is kept for a resume
+            filter_results: Drop hits whose extracted facts contradict the
+                amount range, deadline window, location or organization
+                type (needs ``extract_facts``)
+            budget: Search cost / latency budget for the query planner
+                (defaults to SearchBudget()); planned searches run in waves
+                of ``max_concurrency`` and stop once a wave's yield of new
+                relevant URLs flattens out. Pass ``min_yield=0`` to fan the
+                default plan out at once, for lower latency at full cost
+            latency_budget_ms: Answer within this many milliseconds. The
+                search width, page fetching and analysis model (default,
+                ``fast_model_name`` or none, which makes a deep run basic)
+                are chosen from live latency estimates; analysis still
+                running at the deadline is dropped in favour of the basic
+                result. ``latency_budget`` in the result lists skipped stages
+            triage: Screen results for relevance on the fast model before
+                synthesis on the strong model (default: when
+                ``fast_model_name`` is set; off under a latency budget).
+                ``model_usage`` in the result reports calls, latency and
+                tokens per tier
         
         Returns:
             Research results with grant opportunities and analysis
+
+        Raises:
+            RunCheckpointMismatchError: If ``run_id`` belongs to a run with
+                different criteria or options
+            asyncio.TimeoutError: If ``timeout`` expires
         """
-        # Generate search strategies
+        if timeout is not None:
+            return await asyncio.wait_for(
+                self.research_grants(
+                    criteria,
+                    depth=depth,
+                    concurrent=concurrent,
+                    on_token=on_token,
+                    use_llm_cache=use_llm_cache,
+                    deduplicate=deduplicate,
+                    analysis_mode=analysis_mode,
+                    max_results=max_results,
+                    extract_facts=extract_facts,
+                    lazy_content=lazy_content,
+                    run_id=run_id,
+                    on_progress=on_progress,
+                    filter_results=filter_results,
+                    budget=budget,
+                    latency_budget_ms=latency_budget_ms,
+                    triage=triage,
+                ),
+                timeout=timeout,
+            )
+
+        timings: Dict[str, float] = {}
+        run_started = time.perf_counter()
+        checkpoint = RunCheckpoint(self.checkpoints, run_id)
+        await asyncio.to_thread(
+            checkpoint.bind,
+            {
+                "criteria": criteria,
+                "depth": depth,
+                "max_results": max_results,
+                "deduplicate": deduplicate,
+                "lazy_content": lazy_content,
+                "analysis_mode": analysis_mode,
+                "model": self.model_name,
+                "budget": budget,
+                "latency_budget_ms": latency_budget_ms,
+                "triage": triage,
+            },
+        )
+        if triage is None:
+            triage = bool(self.fast_model_name) and latency_budget_ms is None
+        usage = ModelUsage()
+        # Raw payloads go to disk as they arrive; results keep references
+        spill = None
+        if self.spill_results:
+            spill = await asyncio.to_thread(
+                ResultSpill.for_run, run_id or uuid.uuid4().hex[:12], self.spill_dir
+            )
+
+        try:
+            # Size the run to the latency budget: search width, fetching, model
+            budget = budget or SearchBudget()
+            depth_plan = None
+            deadline = search_deadline = None
+            if latency_budget_ms is not None:
+                depth_plan = await self._plan_depth(latency_budget_ms / 1000, depth, checkpoint)
+                deadline = run_started + depth_plan.budget
+                search_deadline = deadline - depth_plan.analysis_seconds
+                budget = replace(budget, max_cost=min(budget.max_cost, depth_plan.max_searches))
+                lazy_content = True
+                if depth_plan.analysis is None:
+                    depth = "basic"
+
+            # Choose which engines and query variants to run
+            with self.stage_latency.time("plan", timings):
+                planned = await self._plan_searches(criteria, budget, checkpoint)
+            # One step per search, one for result preparation, two for analysis
+            progress = _ProgressReporter(
+                on_progress, len(planned) + 1 + (2 if depth == "deep" else 0)
+            )
+
+            # Execute searches in waves, stopping once new relevant URLs dry up
+            with self.stage_latency.time("search", timings):
+                all_results, search_plan = await self._execute_plan(
+                    criteria,
+                    planned,
+                    budget,
+                    max_results,
+                    include_raw_content=not lazy_content,
+                    concurrent=concurrent,
+                    checkpoint=checkpoint,
+                    progress=progress,
+                    deadline=search_deadline,
+                    spill=spill,
+                )
+            if depth_plan is not None and search_plan["cut_off"]:
+                depth_plan.skipped.append("slow_searches")
+
+            # Collapse cross-engine duplicates before they reach the LLM
+            dedup_stats = None
+            if deduplicate:
+                with self.stage_latency.time("dedup", timings):
+                    all_results, dedup_stats = deduplicate_results(all_results)
+
+            # Full page content only for the best-ranked hits
+            if (
+                lazy_content
+                and self.raw_content_top_k
+                and (depth_plan is None or depth_plan.fetch_content)
+            ):
+                with self.stage_latency.time("fetch", timings):
+                    try:
+                        all_results = await asyncio.wait_for(
+                            self._fetch_top_content(
+                                criteria,
+                                all_results,
+                                self.raw_content_top_k,
+                                checkpoint=checkpoint,
+                                spill=spill,
+                            ),
+                            timeout=_remaining(search_deadline),
+                        )
+                    except asyncio.TimeoutError:
+                        if depth_plan is None:
+                            raise
+                        depth_plan.skipped.append("fetch")
+
+            # Structured facts from raw page content, no LLM involved
+            records: Dict[str, GrantRecord] = {}
+            if extract_facts:
+                with self.stage_latency.time("extract", timings):
+                    records = extract_records(all_results, criteria)
+
+            # One ranking across engines, queries and relevance to the criteria
+            with self.stage_latency.time("rank", timings):
+                fused = (
+                    fuse_results(all_results, self.engine_weights, self.rrf_k)
+                    if self.rank_fusion
+                    else []
+                )
+                ranked = self._ranked_snippets(criteria, all_results, records, fused=fused)
+
+            # Remember relevant opportunities so repeat questions need no search
+            store_stats = None
+            if self.opportunity_store is not None and records:
+                with self.stage_latency.time("store", timings):
+                    store_stats = await asyncio.to_thread(
+                        self.opportunity_store.upsert, rank_records(records, ranked), criteria
+                    )
+
+            # Apply the criteria to the extracted facts, not just the query text
+            filter_stats = None
+            if filter_results and records:
+                with self.stage_latency.time("filter", timings):
+                    ranked, stats = filter_snippets(ranked, records, criteria)
+                filter_stats = stats.to_dict()
+
+            unique_hits = sum(len(r.get("results", {}).get("results", [])) for r in all_results)
+            await progress.step(
+                "prepare", f"{unique_hits} unique results from {len(all_results)} searches"
+            )
+            if spill is not None:
+                # Everything below works from ranked snippets and records, so the
+                # full payloads are released before the (slow) analysis
+                all_results = spill.refs
+
+            # Deep research: Use AI to analyze and synthesize results
+            analysis = None
+            if depth == "deep":
+                await progress.step("analysis", "Analysis started")
+                try:
+                    with self.stage_latency.time("analysis", timings):
+                        analysis = await asyncio.wait_for(
+                            self._deep_analysis(
+                                criteria,
+                                all_results,
+                                on_token=on_token,
+                                use_llm_cache=use_llm_cache,
+                                analysis_mode=analysis_mode,
+                                records=records,
+                                checkpoint=checkpoint,
+                                progress=progress,
+                                ranked=ranked,
+                                fast=depth_plan is not None and depth_plan.analysis == "fast",
+                                triage=triage,
+                                usage=usage,
+                            ),
+                            timeout=_remaining(deadline),
+                        )
+                except asyncio.TimeoutError:
+                    # Out of budget: the basic result below is the best answer in time
+                    if depth_plan is None:
+                        raise
+                    depth_plan.skipped.append("analysis")
+                await progress.step(
+                    "analysis", "Analysis finished" if analysis is not None else "Analysis skipped"
+                )
+
+            if analysis is None:
+                result = {
+                    "criteria": criteria,
+                    "search_results": all_results,
+                    "total_results": unique_hits,
+                    "opportunities": [record.to_dict() for record in rank_records(records, ranked)],
+                }
+            else:
+                result = analysis
+            result["dedup_stats"] = dedup_stats
+            result["store_stats"] = store_stats
+            result["filter_stats"] = filter_stats
+            result["ranked_results"] = ranking_summary(ranked, fused)
+            # Failed engines are reported, not silently dropped
+            result["failed_searches"] = search_plan.pop("failed")
+            result["search_plan"] = search_plan
+            result["model_usage"] = usage.summary()
+            if spill is not None:
+                result["spill_path"] = str(spill.path)
+            self._finish_timings(timings, run_started)
+            if depth_plan is not None:
+                result["latency_budget"] = {
+                    **depth_plan.to_dict(),
+                    "elapsed_ms": round(timings["total"] * 1000),
+                }
+            result["timings"] = timings
+            result["run_id"] = run_id
+            result["checkpoint"] = checkpoint.stats() if checkpoint.enabled else None
+            return result
+        finally:
+            # Failed, cancelled or timed-out runs must not leak the file handle
+            if spill is not None:
+                spill.close()
+
+    def _finish_timings(self, timings: Dict[str, float], run_started: float) -> None:
+        """Record the total run time and round per-run stage timings."""
+        total = time.perf_counter() - run_started
+        self.stage_latency.record("total", total)
+        timings["total"] = total
+        for stage, seconds in timings.items():
+            timings[stage] = round(seconds, 4)
+
+    async def _plan_depth(
+        self, budget_seconds: float, depth: Literal["basic", "deep"], checkpoint: RunCheckpoint
+    ) -> DepthPlan:
+        """
+        Choose the pipeline shape for a latency budget (see adaptive_depth).
+
+        A resumed run reuses its saved plan so it repeats the same stages.
+
+        Args:
+            budget_seconds: Latency budget
+            depth: Requested depth ("basic" never plans an LLM call)
+            checkpoint: Run checkpoint holding the plan
+
+        Returns:
+            The depth plan
+        """
+        saved = await checkpoint.aget("depth_plan")
+        if saved is not None:
+            return DepthPlan(**saved)
+        depth_plan = plan_depth(
+            budget_seconds,
+            latency_estimates(self.stage_latency),
+            concurrency=self.max_concurrency,
+            fast_model=bool(self.fast_model_name),
+            allow_analysis=depth == "deep",
+            local_index=self.local_index is not None,
+        )
+        await checkpoint.aset("depth_plan", asdict(depth_plan))
+        return depth_plan
+
+    async def _plan_searches(
+        self, criteria: GrantSearchCriteria, budget: SearchBudget, checkpoint: RunCheckpoint
+    ) -> List[Tuple[SearchEngine, str, int]]:
+        """
+        Choose the (engine, query, variant) searches for a run.
+
+        With a query planner, candidates from generate_search_strategies are
+        picked by historical yield per cost within ``budget``; without one,
+        the first two variants of every engine run, cut to ``budget.max_cost``
+        (first variants before second ones). A resumed run reuses its saved
+        plan so the same searches are replayed.
+
+        Args:
+            criteria: Grant search criteria
+            budget: Cost / latency limits
+            checkpoint: Run checkpoint holding the plan
+
+        Returns:
+            Searches in execution order
+        """
+        saved = await checkpoint.aget("plan")
+        if saved is not None:
+            return [(SearchEngine(engine), query, variant) for engine, query, variant in saved]
+
         search_queries = self.generate_search_strategies(criteria)
+        if self.query_planner is None:
+            planned = [
+                (engine, query, variant)
+                for engine, queries in search_queries.items()
+                for variant, query in enumerate(
+                    queries[:2]
+                )  # Limit to 2 queries per engine for efficiency
+            ]
+            kept = set()
+            spent = 0.0
+            for search in sorted(planned, key=lambda search: search[2]):
+                cost = DEFAULT_CALL_COSTS.get(search[0].value, 1.0)
+                if spent + cost <= budget.max_cost:
+                    kept.add(search)
+                    spent += cost
+            planned = [search for search in planned if search in kept]
+        else:
+            chosen = await asyncio.to_thread(
+                self.query_planner.plan, search_queries, budget, self.max_concurrency
+            )
+            planned = [(q.engine, q.query, q.variant) for q in chosen]
+        await checkpoint.aset(
+            "plan", [[engine.value, query, variant] for engine, query, variant in planned]
+        )
+        return planned
+
+    async def _execute_plan(
+        self,
+        criteria: GrantSearchCriteria,
+        planned: List[Tuple[SearchEngine, str, int]],
+        budget: SearchBudget,
+        max_results: int,
+        include_raw_content: bool,
+        concurrent: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        deadline: Optional[float] = None,
+        spill: Optional[ResultSpill] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run planned searches, measuring the yield of each one.
+
+        With a query planner the plan runs in waves of ``max_concurrency``.
+        Each call's new unique relevant URLs and latency are added to the
+        planner's history, and the remaining waves are skipped once a wave
+        yields fewer than ``budget.min_yield`` per call or less than
+        ``budget.flatten_ratio`` of the first wave.
+
+        Waves trade latency for search credits: the default six-search plan
+        at ``max_concurrency`` 4 runs as a wave of four and then one of two,
+        about one search latency slower than fanning out at once, and saves
+        the last two calls when the first wave finds too little. A plan that
+        nothing could stop early (no deadline, ``min_yield`` 0 and at most
+        two waves, or ``flatten_ratio`` also 0) fans out in a single wave.
+
+        Args:
+            criteria: Search criteria (relevance terms)
+            planned: Searches from _plan_searches
+            budget: Early-stopping thresholds
+            max_results: Results requested per query
+            include_raw_content: Request full page content with each hit
+            concurrent: Run each wave in parallel
+            checkpoint: Run checkpoint
+            progress: Reporter advanced once per search (skipped ones included)
+            deadline: ``time.perf_counter()`` value after which no further
+                wave starts if the last wave's duration would overrun it;
+                searches still running at the deadline are cut off
+            spill: Receives each result set as its wave completes
         
-        # Execute searches
+        Returns:
+            Tuple of (result sets, plan stats); failed searches are listed
+            under "failed" as {"engine", "variant", "query", "error"}
+        """
+        checkpoint = checkpoint or RunCheckpoint(None, None)
+        progress = progress or _ProgressReporter(None, len(planned))
+        variants = {(engine.value, query): variant for engine, query, variant in planned}
+        terms = set(criteria_terms(criteria))
+        seen_urls: Set[str] = set()
+        wave_size = self.max_concurrency if self.query_planner is not None else max(1, len(planned))
+        # Waves only pay off when something can skip the later ones; after the
+        # first wave only min_yield (or the deadline) can, and flatten_ratio
+        # needs a third wave to compare. Otherwise fan out at once, which
+        # keeps max_concurrency slots busy instead of waiting on each wave
+        waves = -(-len(planned) // wave_size)
+        if deadline is None and budget.min_yield <= 0 and (budget.flatten_ratio <= 0 or waves <= 2):
+            wave_size = max(1, len(planned))
+
+        all_results: List[Dict[str, Any]] = []
+        wave_yields: List[float] = []
+        cut_off: List[Tuple[SearchEngine, str]] = []
+        failed: List[Dict[str, Any]] = []
+        executed = 0
+        for start in range(0, len(planned), wave_size):
+            wave = [(engine, query) for engine, query, _ in planned[start : start + wave_size]]
+            wave_started = time.perf_counter()
+            if concurrent:
+                result_sets = await self._execute_searches_concurrently(
+                    wave,
+                    max_results,
+                    include_raw_content=include_raw_content,
+                    checkpoint=checkpoint,
+                    progress=progress,
+                    deadline=deadline,
+                    cut_off=cut_off,
+                    failed=failed,
+                )
+            else:
+                result_sets = await self._execute_searches_sequentially(
+                    wave,
+                    max_results,
+                    include_raw_content=include_raw_content,
+                    checkpoint=checkpoint,
+                    progress=progress,
+                    deadline=deadline,
+                    cut_off=cut_off,
+                    failed=failed,
+                )
+            executed += len(wave)
+
+            found = 0
+            for result_set in result_sets:
+                new_relevant = count_new_relevant(result_set, terms, seen_urls)
+                found += new_relevant
+                elapsed = result_set.pop("elapsed", None)
+                if spill is not None:
+                    await asyncio.to_thread(spill.append_search, result_set)
+                # Replayed checkpoints carry no timing and say nothing new
+                if self.query_planner is not None and elapsed is not None:
+                    await asyncio.to_thread(
+                        self.query_planner.history.record,
+                        result_set["engine"],
+                        variants.get((result_set["engine"], result_set["query"]), 0),
+                        new_relevant,
+                        elapsed,
+                    )
+            all_results.extend(result_sets)
+            wave_yield = found / len(wave)
+            wave_yields.append(round(wave_yield, 2))
+
+            if executed == len(planned):
+                break
+            reason = None
+            if (
+                deadline is not None
+                and time.perf_counter() + (time.perf_counter() - wave_started) > deadline
+            ):
+                reason = "out of time"
+            elif self.query_planner is not None and yield_flattened(
+                wave_yield, wave_yields[0], budget
+            ):
+                reason = "yield flattened"
+            if reason:
+                for engine, _, _ in planned[executed:]:
+                    await progress.step("search", f"{engine.value}: skipped, {reason}")
+                break
+
+        return all_results, {
+            "planned": len(planned),
+            "executed": executed,
+            "stopped_early": executed < len(planned),
+            "wave_yields": wave_yields,
+            "cut_off": [
+                {
+                    "engine": engine.value,
+                    "variant": variants.get((engine.value, query), 0),
+                    "query": query,
+                }
+                for engine, query in cut_off
+            ],
+            "failed": [
+                {**failure, "variant": variants.get((failure["engine"], failure["query"]), 0)}
+                for failure in failed
+            ],
+            "searches": [
+                {"engine": engine.value, "variant": variant, "query": query}
+                for engine, query, variant in planned[:executed]
+            ],
+        }
+
+    async def _execute_searches_sequentially(
+        self,
+        planned: List[Tuple[SearchEngine, str]],
+        max_results: int = 5,
+        include_raw_content: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        deadline: Optional[float] = None,
+        cut_off: Optional[List[Tuple[SearchEngine, str]]] = None,
+        failed: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run planned searches one after another (see _execute_searches_concurrently).
+
+        Returns:
+            Result sets in planned order; failed queries are dropped
+        """
+        checkpoint = checkpoint or RunCheckpoint(None, None)
+        progress = progress or _ProgressReporter(None, len(planned))
+        cut_off = cut_off if cut_off is not None else []
+        failed = failed if failed is not None else []
         all_results = []
-        for engine, queries in search_queries.items():
-            for query in queries[:2]:  # Limit to 2 queries per engine for efficiency
+        for engine, query in planned:
+            result_set = await self._run_search(
+                engine,
+                query,
+                max_results,
+                include_raw_content,
+                checkpoint,
+                deadline,
+                cut_off,
+                failed,
+            )
+            await progress.step("search", _search_progress(engine, query, result_set, cut_off))
+            if result_set is not None:
+                all_results.append(result_set)
+        return all_results
+
+    async def _execute_searches_concurrently(
+        self,
+        planned: List[Tuple[SearchEngine, str]],
+        max_results: int = 5,
+        include_raw_content: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        deadline: Optional[float] = None,
+        cut_off: Optional[List[Tuple[SearchEngine, str]]] = None,
+        failed: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run planned searches in parallel with a concurrency cap and per-query timeout.
+
+        Searches use the async Tavily client, so a timeout or cancellation
+        aborts the HTTP request. Results come back in the same order as
+        ``planned``; failed or timed-out queries are dropped.
+
+        Args:
+            planned: (engine, query) pairs to execute
+            max_results: Results requested per query
+            include_raw_content: Request full page content with each hit
+            checkpoint: Run checkpoint; searches it already holds are not repeated
+            progress: Reporter advanced once per finished (or failed) search
+            deadline: ``time.perf_counter()`` value capping every query's
+                timeout, so no search runs past the latency budget
+            cut_off: Receives the (engine, query) pairs stopped by ``deadline``
+            failed: Receives {"engine", "query", "error"} for every failed search
+
+        Returns:
+            Result sets in planned order
+        """
+        checkpoint = checkpoint or RunCheckpoint(None, None)
+        progress = progress or _ProgressReporter(None, len(planned))
+        cut_off = cut_off if cut_off is not None else []
+        failed = failed if failed is not None else []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(engine: SearchEngine, query: str) -> Optional[Dict[str, Any]]:
+            result_set = await self._run_search(
+                engine,
+                query,
+                max_results,
+                include_raw_content,
+                checkpoint,
+                deadline,
+                cut_off,
+                failed,
+                # Local lookups run in a worker thread and need no provider slot
+                slot=None if engine == SearchEngine.LOCAL else semaphore,
+            )
+            await progress.step("search", _search_progress(engine, query, result_set, cut_off))
+            return result_set
+
+        outcomes = await asyncio.gather(*(run_one(engine, query) for engine, query in planned))
+        return [outcome for outcome in outcomes if outcome is not None]
+
+    async def _run_search(
+        self,
+        engine: SearchEngine,
+        query: str,
+        max_results: int,
+        include_raw_content: bool,
+        checkpoint: RunCheckpoint,
+        deadline: Optional[float],
+        cut_off: List[Tuple[SearchEngine, str]],
+        failed: List[Dict[str, Any]],
+        slot: Optional[asyncio.Semaphore] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run one planned search for both execution paths.
+
+        The local index is queried in a worker thread and web engines through
+        the async client, so neither blocks the event loop. Checkpoint I/O
+        also runs in a worker thread, and a search the checkpoint already
+        holds (local ones included) is returned without being repeated.
+
+        Args:
+            engine: Engine to search
+            query: Query string
+            max_results: Results requested
+            include_raw_content: Request full page content with each hit
+            checkpoint: Run checkpoint
+            deadline: ``time.perf_counter()`` value capping the timeout
+            cut_off: Receives (engine, query) when ``deadline`` stops the search
+            failed: Receives {"engine", "query", "error"} when the search fails
+            slot: Held while the search runs, once the checkpoint misses
+
+        Returns:
+            The result set with its "elapsed" seconds, the saved result set
+            (no "elapsed") when resumed, or None when cut off or failed
+        """
+        saved: Optional[Dict[str, Any]] = await checkpoint.aget(
+            "search", engine.value, query, max_results, include_raw_content
+        )
+        if saved is not None:
+            return saved
+        async with slot or nullcontext():
+            # The budget may have run out while waiting for a slot
+            timeout, budget_bound = _capped_timeout(self.search_timeout, deadline)
+            if budget_bound and timeout == 0 and engine != SearchEngine.LOCAL:
+                cut_off.append((engine, query))
+                return None
+            started = time.perf_counter()
+            try:
+                if engine == SearchEngine.LOCAL:
+                    results = await asyncio.to_thread(
+                        self.local_search, query, max_results=max_results
+                    )
+                else:
+                    results = await asyncio.wait_for(
+                        self.ainternet_search(
+                            query, max_results=max_results, include_raw_content=include_raw_content
+                        ),
+                        timeout=timeout,
+                    )
+            except CassetteMissError:
+                raise  # replay must fail loudly, not look like a failed search
+            except asyncio.TimeoutError:
+                if budget_bound:
+                    cut_off.append((engine, query))
+                    return None
+                logger.warning(
+                    "Search timed out for %s after %ss", engine.value, self.search_timeout
+                )
+                failed.append(
+                    _search_failure(engine, query, f"timed out after {self.search_timeout}s")
+                )
+                return None
+            except Exception as e:
+                logger.warning("Search failed for %s: %s", engine.value, e)
+                failed.append(_search_failure(engine, query, e))
+                return None
+            elapsed = time.perf_counter() - started
+        result_set = {"engine": engine.value, "query": query, "results": results}
+        await checkpoint.aset(
+            "search", result_set, engine.value, query, max_results, include_raw_content
+        )
+        return {**result_set, "elapsed": elapsed}
+
+    async def _fetch_top_content(
+        self,
+        criteria: GrantSearchCriteria,
+        search_results: List[Dict[str, Any]],
+        top_k: int,
+        checkpoint: Optional[RunCheckpoint] = None,
+        spill: Optional[ResultSpill] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch full page content for the top-ranked hits only.
+
+        Hits are ranked on their snippets and engine ranks; the ``top_k`` best URLs are fetched
+        in concurrent batches of EXTRACT_BATCH_SIZE (bounded by
+        max_concurrency and search_timeout). A failed batch just leaves those
+        hits with their snippet.
+
+        Args:
+            criteria: Search criteria supplying the ranking terms
+            search_results: Result sets fetched without raw content
+            top_k: Number of pages to fetch
+            checkpoint: Run checkpoint; pages it already holds are not refetched
+            spill: Receives every fetched page
+
+        Returns:
+            Result sets whose top hits carry ``raw_content`` (hits are copied,
+            never modified in place)
+        """
+        wanted = {
+            snippet.url for snippet in self._ranked_snippets(criteria, search_results)[:top_k]
+        }
+        fetch_urls: Dict[str, str] = {}  # ranking URL -> URL to fetch
+        for result_set in search_results:
+            for hit in result_set.get("results", {}).get("results", []):
+                key = hit.get("canonical_url") or hit.get("url", "")
+                if key in wanted and not hit.get("raw_content"):
+                    fetch_urls.setdefault(key, hit.get("url") or key)
+        if not fetch_urls:
+            return search_results
+
+        checkpoint = checkpoint or RunCheckpoint(None, None)
+        contents: Dict[str, str] = {}
+        urls = []
+        for url in dict.fromkeys(fetch_urls.values()):
+            saved = await checkpoint.aget("fetch", url)
+            if saved is not None:
+                contents[url] = saved
+            else:
+                urls.append(url)
+        batches = [
+            urls[i : i + EXTRACT_BATCH_SIZE] for i in range(0, len(urls), EXTRACT_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(batch: List[str]) -> Dict[str, str]:
+            async with semaphore:
                 try:
-                    results = self.internet_search(
-                        query,
-                        max_results=5,
-                        include_raw_content=True
+                    return await asyncio.wait_for(
+                        self.aextract_content(batch), timeout=self.search_timeout
                     )
-                    all_results.append({
-                        "engine": engine.value,
-                        "query": query,
-                        "results": results
-                    })
+                except asyncio.TimeoutError:
+                    logger.warning("Content fetch timed out after %ss", self.search_timeout)
                 except Exception as e:
-                    print(f"Search failed for {engine.value}: {e}")
+                    logger.warning("Content fetch failed: %s", e)
+                return {}
         
-        if depth == "basic":
-            return {
-                "criteria": criteria,
-                "search_results": all_results,
-                "total_results": sum(len(r.get("results", {}).get("results", [])) for r in all_results)
-            }
+        for fetched in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+            contents.update(fetched)
+            for url, content in fetched.items():
+                await checkpoint.aset("fetch", content, url)
+        if spill is not None:
+            for key, url in fetch_urls.items():
+                if url in contents:
+                    await asyncio.to_thread(spill.append_content, url, contents[url], key)
         
-        # Deep research: Use AI to analyze and synthesize results
-        return await self._deep_analysis(criteria, all_results)
+        enriched = []
+        for result_set in search_results:
+            hits = []
+            for hit in result_set.get("results", {}).get("results", []):
+                key = hit.get("canonical_url") or hit.get("url", "")
+                page = contents.get(fetch_urls.get(key, ""))
+                hits.append({**hit, "raw_content": page} if page else hit)
+            enriched.append(
+                {**result_set, "results": {**result_set.get("results", {}), "results": hits}}
+            )
+        return enriched
     
     async def _deep_analysis(
         self,
         criteria: GrantSearchCriteria,
-        search_results: List[Dict[str, Any]]
+        search_results: List[Dict[str, Any]],
+        on_token: Optional[TokenCallback] = None,
+        use_llm_cache: bool = True,
+        analysis_mode: Literal["single", "map_reduce", "auto"] = "auto",
+        records: Optional[Dict[str, GrantRecord]] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        ranked: Optional[List[ContextSnippet]] = None,
+        fast: bool = False,
+        triage: bool = False,
+        usage: Optional[ModelUsage] = None,
     ) -> Dict[str, Any]:
         """
         Perform deep analysis of search results using AI.
@@ -136,34 +1521,271 @@ class GrantResearchAgent:
         Args:
             criteria: Original search criteria
             search_results: Raw search results from multiple engines
+            on_token: Optional callback for streamed analysis tokens
+            use_llm_cache: Reuse a cached analysis for an identical prompt
+            analysis_mode: "single" packs one prompt, "map_reduce" analyzes
+                chunks in parallel and synthesizes them, "auto" switches to
+                map-reduce when relevant results overflow the context budget
+            records: Locally extracted facts keyed by URL
+            checkpoint: Run checkpoint for LLM responses
+            progress: Reporter for per-batch status messages (map-reduce)
+            ranked: Snippets already ranked (and annotated with facts)
+            fast: Synthesize with the fast model
+            triage: Screen the best-ranked results with the triage tier first;
+                synthesis only sees the ones it keeps
+            usage: Per-run model tier accounting
         
         Returns:
             Analyzed and synthesized grant opportunities
         """
+        records = records or {}
+        if ranked is None:
+            ranked = self._ranked_snippets(criteria, search_results, records)
+
+        triage_stats = None
+        if triage:
+            ranked, triage_stats = await self._triage(
+                criteria,
+                ranked,
+                use_llm_cache=use_llm_cache,
+                checkpoint=checkpoint,
+                progress=progress,
+                usage=usage,
+            )
+
         # Prepare context for AI analysis
-        context = self._prepare_analysis_context(criteria, search_results)
+        context = self._prepare_analysis_context(criteria, search_results, ranked=ranked)
         
-        system_prompt = """You are an expert grant research analyst. Your job is to:
+        if analysis_mode == "map_reduce" or (analysis_mode == "auto" and context.overflow > 0):
+            result = await self._map_reduce_analysis(
+                criteria,
+                search_results,
+                on_token=on_token,
+                use_llm_cache=use_llm_cache,
+                ranked=ranked,
+                records=records,
+                checkpoint=checkpoint,
+                progress=progress,
+                fast=fast,
+                usage=usage,
+            )
+            result["triage_stats"] = triage_stats
+            return result
 
-1. Analyze grant opportunities from search results
-2. Identify the most relevant and promising grants
-3. Extract key information: deadline, amount, eligibility, requirements
-4. Assess fit with the user's criteria
-5. Provide strategic recommendations
+        messages = self._analysis_messages(
+            criteria, "SEARCH RESULTS (ranked by relevance)", context.text
+        )
 
-Be thorough, accurate, and prioritize actionable information."""
+        analysis = await self._checkpointed_model_call(
+            checkpoint, messages, on_token=on_token, use_cache=use_llm_cache, fast=fast, usage=usage
+        )
+
+        return {
+            "criteria": criteria,
+            "analysis": analysis,
+            "analysis_mode": "single",
+            "analysis_model": self._select_model(fast)[0],
+            "triage_stats": triage_stats,
+            "total_sources_searched": len(search_results),
+            "context_tokens": context.token_count,
+            "context_snippets": len(context.snippets),
+            "opportunities": [record.to_dict() for record in rank_records(records, ranked)],
+            "raw_results": search_results,
+        }
+
+    async def _triage(
+        self,
+        criteria: GrantSearchCriteria,
+        ranked: List[ContextSnippet],
+        use_llm_cache: bool = True,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        usage: Optional[ModelUsage] = None,
+    ) -> Tuple[List[ContextSnippet], Dict[str, int]]:
+        """
+        Screen the best-ranked snippets for relevance on the triage tier.
+
+        The top ``triage_candidates`` snippets are split into context-budget
+        batches and judged KEEP/DROP in parallel (bounded by llm_concurrency).
+        A batch whose call fails keeps all of its snippets.
+
+        Args:
+            criteria: Search criteria
+            ranked: Snippets in rank order
+            use_llm_cache: Reuse cached responses for identical prompts
+            checkpoint: Run checkpoint for triage responses
+            progress: Reporter receiving a status message per finished batch
+            usage: Per-run model tier accounting
 
+        Returns:
+            Tuple of (kept snippets in rank order, triage stats)
+        """
+        candidates = ranked[: self.triage_candidates]
+        batches = chunk_snippets(candidates, token_budget=self.context_token_budget)
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+        progress = progress or _ProgressReporter(None, 0)
+        failed = 0
+
+        async def screen(index: int, batch: PackedContext) -> List[ContextSnippet]:
+            nonlocal failed
+            messages = [
+                SystemMessage(content=TRIAGE_SYSTEM_PROMPT),
+                HumanMessage(content=f"""SEARCH CRITERIA:
+{_criteria_summary(criteria)}
+
+SEARCH RESULTS:
+{batch.text}"""),
+            ]
+            async with semaphore:
+                try:
+                    verdicts = await self._checkpointed_model_call(
+                        checkpoint,
+                        messages,
+                        use_cache=use_llm_cache,
+                        fast=True,
+                        tier=TRIAGE,
+                        usage=usage,
+                    )
+                except Exception as e:
+                    logger.warning("Triage failed for batch %s: %s", index, e)
+                    failed += 1
+                    return batch.snippets
+            await progress.step("analysis", f"Triaged batch {index} of {len(batches)}", advance=0)
+            kept = parse_triage(verdicts, len(batch.snippets))
+            return [snippet for number, snippet in enumerate(batch.snippets, 1) if number in kept]
+
+        kept_batches = await asyncio.gather(
+            *(screen(index, batch) for index, batch in enumerate(batches, 1))
+        )
+        kept = [snippet for batch in kept_batches for snippet in batch]
+        return kept, {
+            "candidates": len(candidates),
+            "kept": len(kept),
+            "dropped": len(candidates) - len(kept),
+            "batches": len(batches),
+            "failed_batches": failed,
+        }
+
+    async def _map_reduce_analysis(
+        self,
+        criteria: GrantSearchCriteria,
+        search_results: List[Dict[str, Any]],
+        on_token: Optional[TokenCallback] = None,
+        use_llm_cache: bool = True,
+        ranked: Optional[List[ContextSnippet]] = None,
+        records: Optional[Dict[str, GrantRecord]] = None,
+        checkpoint: Optional[RunCheckpoint] = None,
+        progress: Optional[_ProgressReporter] = None,
+        fast: bool = False,
+        usage: Optional[ModelUsage] = None,
+    ) -> Dict[str, Any]:
+        """
+        Analyze large result sets with parallel map calls and one reduce call.
+
+        Ranked snippets are split into chunks that each fit the context budget.
+        Each chunk is summarized into structured opportunity notes concurrently
+        (bounded by llm_concurrency) on the triage tier; a final synthesis call
+        ranks and synthesizes the notes into the report. Wall-clock time stays
+        close to two LLM latencies.
+
+        Args:
+            criteria: Original search criteria
+            search_results: Raw search results from multiple engines
+            on_token: Optional callback for streamed tokens of the final report
+            use_llm_cache: Reuse cached responses for identical prompts
+            ranked: Snippets already ranked (and annotated with facts)
+            records: Locally extracted facts keyed by URL
+            checkpoint: Run checkpoint; completed map and reduce calls are
+                not repeated on resume
+            progress: Reporter receiving a status message per finished batch
+            fast: Run the reduce call on the fast model too
+            usage: Per-run model tier accounting
+
+        Returns:
+            Analyzed and synthesized grant opportunities
+        """
+        records = records or {}
+        if ranked is None:
+            ranked = self._ranked_snippets(criteria, search_results, records)
+        chunks = chunk_snippets(
+            ranked, token_budget=self.context_token_budget, max_chunks=self.max_map_chunks
+        )
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+        reporter = progress or _ProgressReporter(None, 0)
+        finished = 0
+
+        async def map_chunk(index: int, chunk: PackedContext) -> str:
+            messages = [
+                SystemMessage(content=MAP_SYSTEM_PROMPT),
+                HumanMessage(content=f"""SEARCH CRITERIA:
+{_criteria_summary(criteria)}
+
+SEARCH RESULTS (batch {index} of {len(chunks)}):
+{chunk.text}"""),
+            ]
+            async with semaphore:
+                try:
+                    note = await self._checkpointed_model_call(
+                        checkpoint,
+                        messages,
+                        use_cache=use_llm_cache,
+                        fast=True,
+                        tier=TRIAGE,
+                        usage=usage,
+                    )
+                except Exception as e:
+                    logger.warning("Map analysis failed for batch %s: %s", index, e)
+                    note = ""
+            nonlocal finished
+            finished += 1
+            await reporter.step(
+                "analysis", f"Analyzed batch {finished} of {len(chunks)}", advance=0
+            )
+            return note
+
+        notes = await asyncio.gather(
+            *(map_chunk(index, chunk) for index, chunk in enumerate(chunks, 1))
+        )
+        extracted = "\n\n".join(
+            f"--- Batch {index} ---\n{note}" for index, note in enumerate(notes, 1) if note.strip()
+        )
+
+        messages = self._analysis_messages(
+            criteria,
+            f"EXTRACTED OPPORTUNITIES ({len(ranked)} ranked results in {len(chunks)} batches)",
+            extracted,
+        )
+        analysis = await self._checkpointed_model_call(
+            checkpoint, messages, on_token=on_token, use_cache=use_llm_cache, fast=fast, usage=usage
+        )
+
+        return {
+            "criteria": criteria,
+            "analysis": analysis,
+            "analysis_mode": "map_reduce",
+            "analysis_model": self._select_model(fast)[0],
+            "map_chunks": len(chunks),
+            "total_sources_searched": len(search_results),
+            "context_tokens": sum(chunk.token_count for chunk in chunks),
+            "context_snippets": sum(len(chunk.snippets) for chunk in chunks),
+            "opportunities": [record.to_dict() for record in rank_records(records, ranked)],
+            "raw_results": search_results,
+        }
+
+    def _analysis_messages(
+        self, criteria: GrantSearchCriteria, results_heading: str, results_text: str
+    ) -> List[BaseMessage]:
+        """Build the synthesis prompt shared by single-pass and map-reduce analysis."""
         user_prompt = f"""Analyze these grant search results based on the following criteria:
 
 SEARCH CRITERIA:
-- Keywords: {', '.join(criteria.keywords)}
-- Organization Type: {criteria.organization_type or 'Any'}
-- Sector: {criteria.sector or 'Any'}
-- Location: {criteria.location or 'Any'}
-- Funding Range: ${criteria.funding_range_min or 0:,} - ${criteria.funding_range_max or 'unlimited':,}
+{_criteria_summary(criteria)}
 
-SEARCH RESULTS:
-{context}
+{results_heading}:
+{results_text}
+
+"Facts" lines were extracted locally from the full pages; use them for amounts,
+deadlines and eligibility and only flag ones that look wrong.
 
 Please provide:
 1. Top 5-10 most relevant grant opportunities
@@ -178,47 +1800,251 @@ Please provide:
 4. Any red flags or concerns
 
 Format as a structured report."""
-
-        messages = [
-            SystemMessage(content=system_prompt),
+        
+        return [
+            SystemMessage(content=ANALYSIS_SYSTEM_PROMPT),
             HumanMessage(content=user_prompt)
         ]
+    
+    def _record_cached(self, tier: str, usage: Optional[ModelUsage]) -> None:
+        """Count an LLM call answered from a cache, checkpoint or cassette."""
+        for accounting in (self.model_usage, usage):
+            if accounting is not None:
+                accounting.record_cached(tier)
+
+    @property
+    def model(self) -> ChatOpenAI:
+        """Default chat model on the shared pools of the current event loop."""
+        return get_chat_model(self.model_name, **self._chat_settings)
+
+    @property
+    def fast_model(self) -> Optional[ChatOpenAI]:
+        """Fast (triage) chat model, or None when none is configured."""
+        if not self.fast_model_name:
+            return None
+        return get_chat_model(self.fast_model_name, **self._chat_settings)
+
+    def _select_model(self, fast: bool = False) -> Tuple[str, Any]:
+        """Name and client of the fast model when requested and configured, else the default."""
+        if fast and self.fast_model_name:
+            return self.fast_model_name, self.fast_model
+        return self.model_name, self.model
+
+    async def ainvoke_model(
+        self,
+        messages: List[BaseMessage],
+        on_token: Optional[TokenCallback] = None,
+        use_cache: bool = True,
+        fast: bool = False,
+        tier: str = SYNTHESIS,
+        usage: Optional[ModelUsage] = None,
+    ) -> str:
+        """
+        Call the LLM without blocking the event loop.
         
-        response = self.model.invoke(messages)
+        Uses ``ainvoke`` by default. When ``on_token`` is given the response is
+        streamed with ``astream`` and each partial token is passed to the
+        callback as it arrives. Identical prompts for the same model and
+        temperature are answered from the LLM response cache; a cached answer
+        is delivered to ``on_token`` in one piece. Live calls go through the
+        shared OpenRouter guard (rate limit, retry with backoff, circuit breaker).
         
-        return {
-            "criteria": criteria,
-            "analysis": response.content,
-            "total_sources_searched": len(search_results),
-            "raw_results": search_results
+        Args:
+            messages: Chat messages to send
+            on_token: Optional callback (sync or async) for streamed tokens
+            use_cache: Read and write the LLM response cache for this call
+            fast: Use ``fast_model_name`` (if configured) instead of the
+                default model
+            tier: Accounting tier (SYNTHESIS or TRIAGE)
+            usage: Per-run accounting, in addition to ``self.model_usage``
+
+        Returns:
+            Full response text
+        """
+        cache = self.llm_cache if use_cache else None
+        if cache is not None:
+            key = cache.response_key(messages, self._select_model(fast)[0], self.temperature)
+            cached: Optional[str] = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                self._record_cached(tier, usage)
+                if on_token is not None:
+                    await _emit_token(on_token, cached)
+                return cached
+
+        text = await self._live_model_call(messages, on_token, fast=fast, tier=tier, usage=usage)
+
+        if cache is not None and text:
+            await asyncio.to_thread(cache.set, key, text)
+        return text
+
+    async def _checkpointed_model_call(
+        self,
+        checkpoint: Optional[RunCheckpoint],
+        messages: List[BaseMessage],
+        on_token: Optional[TokenCallback] = None,
+        use_cache: bool = True,
+        fast: bool = False,
+        tier: str = SYNTHESIS,
+        usage: Optional[ModelUsage] = None,
+    ) -> str:
+        """
+        ``ainvoke_model`` that first checks, then fills, the run checkpoint.
+
+        A response restored from the checkpoint is delivered to ``on_token``
+        in one piece, as with cached responses.
+        """
+        call: Dict[str, Any] = {
+            "on_token": on_token,
+            "use_cache": use_cache,
+            "fast": fast,
+            "tier": tier,
+            "usage": usage,
         }
+        if checkpoint is None:
+            return await self.ainvoke_model(messages, **call)
+        parts = (
+            self._select_model(fast)[0],
+            self.temperature,
+            LLMResponseCache.normalize_prompt(messages),
+        )
+        saved: Optional[str] = await checkpoint.aget("llm", *parts)
+        if saved is not None:
+            self._record_cached(tier, usage)
+            if on_token is not None:
+                await _emit_token(on_token, saved)
+            return saved
+        text = await self.ainvoke_model(messages, **call)
+        if text:
+            await checkpoint.aset("llm", text, *parts)
+        return text
     
-    def _prepare_analysis_context(
+    async def _live_model_call(
         self,
-        criteria: GrantSearchCriteria,
-        search_results: List[Dict[str, Any]]
+        messages: List[BaseMessage],
+        on_token: Optional[TokenCallback] = None,
+        fast: bool = False,
+        tier: str = SYNTHESIS,
+        usage: Optional[ModelUsage] = None,
     ) -> str:
-        """Prepare search results context for AI analysis."""
-        context_parts = []
+        """Call the LLM through the provider guard, or replay/record via the cassette."""
+        model_name, model = self._select_model(fast)
+        request = {
+            "model": model_name,
+            "temperature": self.temperature,
+            "messages": LLMResponseCache.normalize_prompt(messages),
+        }
+        if self.cassette is not None:
+            replayed: Optional[str] = await self.cassette.areplay("llm", request)
+            if replayed is not None:
+                self._record_cached(tier, usage)
+                if on_token is not None:
+                    await _emit_token(on_token, replayed)
+                return replayed
         
-        for i, result_set in enumerate(search_results[:10], 1):  # Limit to 10 result sets
-            engine = result_set.get("engine", "unknown")
-            query = result_set.get("query", "")
-            results = result_set.get("results", {}).get("results", [])
+        started = time.perf_counter()
+        if on_token is None:
+            response = await self.llm_guard.acall(lambda: model.ainvoke(messages))
+            text: str = response.content
+        else:
+            parts: List[str] = []
+            response = None
             
-            context_parts.append(f"\n--- Search {i} ({engine}) ---")
-            context_parts.append(f"Query: {query}\n")
+            async def stream() -> str:
+                nonlocal response
+                # aclosing releases the HTTP stream promptly if we are cancelled
+                async with aclosing(model.astream(messages)) as chunks:
+                    async for chunk in chunks:
+                        if getattr(chunk, "usage_metadata", None):
+                            response = chunk  # usage arrives on the final chunk
+                        token = chunk.content
+                        if not token:
+                            continue
+                        parts.append(token)
+                        await _emit_token(on_token, token)
+                return "".join(parts)
             
-            for j, result in enumerate(results[:3], 1):  # Top 3 results per search
-                title = result.get("title", "No title")
-                url = result.get("url", "")
-                content = result.get("content", "")[:500]  # First 500 chars
-                
-                context_parts.append(f"\nResult {i}.{j}: {title}")
-                context_parts.append(f"URL: {url}")
-                context_parts.append(f"Content: {content}...")
+            # Once tokens reached the caller a retry would repeat them
+            text = await self.llm_guard.acall(stream, should_retry=lambda exc: not parts)
+
+        elapsed = time.perf_counter() - started
+        self.stage_latency.record(
+            "llm_call_fast" if fast and self.fast_model_name else "llm_call", elapsed
+        )
+        tokens = response_tokens(response, "\n".join(str(m.content) for m in messages), text)
+        for accounting in (self.model_usage, usage):
+            if accounting is not None:
+                accounting.record(tier, model_name, elapsed, *tokens)
+        if self.cassette is not None:
+            await self.cassette.arecord("llm", request, text, elapsed)
+        return text
+
+    def _ranked_snippets(
+        self,
+        criteria: GrantSearchCriteria,
+        search_results: List[Dict[str, Any]],
+        records: Optional[Dict[str, GrantRecord]] = None,
+        fused: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[ContextSnippet]:
+        """
+        Rank snippets with BM25 fused with the engines' own rankings, then
+        by fit of their extracted facts.
+
+        Args:
+            criteria: Search criteria supplying the ranking terms
+            search_results: Result sets from all engines
+            records: Locally extracted facts keyed by URL
+            fused: Output of fuse_results for these result sets (computed
+                when omitted)
         
-        return "\n".join(context_parts)
+        Returns:
+            Ranked snippets, annotated with facts where available
+        """
+        ranked = rank_snippets(criteria, search_results)
+        if self.rank_fusion:
+            if not fused:
+                fused = fuse_results(search_results, self.engine_weights, self.rrf_k)
+            ranked = fuse_snippets(ranked, fused, k=self.rrf_k)
+        if records:
+            ranked = apply_records(ranked, records)
+        return ranked
+
+    def _prepare_analysis_context(
+        self,
+        criteria: GrantSearchCriteria,
+        search_results: List[Dict[str, Any]],
+        ranked: Optional[List[ContextSnippet]] = None,
+    ) -> PackedContext:
+        """
+        Pack the most relevant search snippets into the context token budget.
+
+        Every snippet is ranked against the criteria with BM25 and added
+        best-first until ``context_token_budget`` is used up.
+
+        Args:
+            criteria: Search criteria supplying the ranking terms
+            search_results: Result sets from all engines
+            ranked: Snippets already ranked (and annotated with facts)
+
+        Returns:
+            Packed context with its estimated token count
+        """
+        if ranked is None:
+            ranked = self._ranked_snippets(criteria, search_results)
+        return pack_snippets(ranked, token_budget=self.context_token_budget)
+
+    def save_grant_report(self, research_results: Dict[str, Any], path: str) -> None:
+        """
+        Stream research results to a JSON file.
+
+        Spilled search payloads are copied from the run's spill file one
+        result set at a time, so the report never sits in memory whole.
+
+        Args:
+            research_results: Results from research_grants()
+            path: Output file path
+        """
+        with open(path, "w", encoding="utf-8") as fp:
+            write_json_report(research_results, fp)
     
     def generate_grant_report(
         self,
@@ -230,18 +2056,37 @@ Format as a structured report."""
         
         Args:
             research_results: Results from research_grants()
-            format: Output format
+            format: Output format; "json" includes the full spilled search
+                payloads
         
         Returns:
-            Formatted report string
+            Formatted report string. A string holds the whole report, so the
+            "json" format is built in memory even though spilled payloads are
+            read one at a time; use save_grant_report to stream large
+            reports straight to a file instead.
         """
         if format == "json":
-            import json
-            return json.dumps(research_results, indent=2, default=str)
+            buffer = io.StringIO()
+            write_json_report(research_results, buffer)
+            return buffer.getvalue()
         
         elif format == "markdown":
             criteria = research_results.get("criteria")
             analysis = research_results.get("analysis", "")
+            if not analysis and research_results.get("opportunities"):
+                analysis = _format_opportunities(research_results["opportunities"])
+            run_id = research_results.get("run_id")
+            run_note = f"\n*Run ID: `{run_id}`*" if run_id else ""
+            failed_searches = research_results.get("failed_searches")
+            if failed_searches:
+                engines = sorted({failure["engine"] for failure in failed_searches})
+                run_note += f"\n*{len(failed_searches)} searches failed ({', '.join(engines)}); results may be incomplete*"
+            latency_budget = research_results.get("latency_budget")
+            if latency_budget and latency_budget["skipped"]:
+                run_note += (
+                    f"\n*Latency budget {latency_budget['budget_ms']} ms: skipped "
+                    f"{', '.join(latency_budget['skipped'])}*"
+                )
             
             report = f"""# Grant Research Report
 
@@ -250,14 +2095,14 @@ Format as a structured report."""
 - **Organization Type**: {criteria.organization_type if criteria else 'N/A'}
 - **Sector**: {criteria.sector if criteria else 'N/A'}
 - **Location**: {criteria.location if criteria else 'N/A'}
-- **Funding Range**: ${criteria.funding_range_min or 0:,} - ${criteria.funding_range_max or 'unlimited':,}
+- **Funding Range**: {_format_amount_range(criteria)}
 
 ## Analysis
 
 {analysis}
 
 ---
-*Generated by MAI Advisor MCP - AI-Powered Grant Research*
+*Generated by MAI Advisor MCP - AI-Powered Grant Research*{run_note}
 """
             return report
         
@@ -283,6 +2128,9 @@ Search for grants using AI-powered research. Provide search criteria including:
 - Location
 - Funding range
 
+### `search_stored_grants`
+Answer repeat questions instantly from opportunities found by earlier searches (no web search). Filters by keywords, location, sector, deadline window and funding range.
+
 ### `generate_search_operators`
 Generate advanced search engine queries optimized for:
 - Google (with advanced operators)
@@ -0,0 +1,576 @@
+"""
+Local structured extraction of grant facts from search results.
+
+The analysis prompt used to make the LLM pull the deadline, award amount and
+eligibility out of every raw page. This module does that work locally with
+precompiled regular expressions and a small date parser over each hit's
+``raw_content`` (falling back to the snippet ``content``). The records it
+produces are used to:
+
+- re-rank snippets by how well the facts fit the search criteria
+- replace long page excerpts in the prompt with one compact "Facts" line
+- let ``depth="basic"`` return structured opportunities without an LLM call
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from search_operators import GrantSearchCriteria
+from context_builder import ContextSnippet
+
+# How much page text to scan per hit; deadlines and amounts sit near the top
+MAX_SCAN_CHARS = 20000
+
+_MONTHS = {
+    "jan": 1,
+    "january": 1,
+    "feb": 2,
+    "february": 2,
+    "mar": 3,
+    "march": 3,
+    "apr": 4,
+    "april": 4,
+    "may": 5,
+    "jun": 6,
+    "june": 6,
+    "jul": 7,
+    "july": 7,
+    "aug": 8,
+    "august": 8,
+    "sep": 9,
+    "sept": 9,
+    "september": 9,
+    "oct": 10,
+    "october": 10,
+    "nov": 11,
+    "november": 11,
+    "dec": 12,
+    "december": 12,
+}
+_MONTH_NAMES = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+_MONEY = r"\$\s?(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)\s*(k|m|mm|thousand|million|billion)?\b"
+_MONEY_RE = re.compile(_MONEY, re.IGNORECASE)
+_RANGE_RE = re.compile(rf"(?:between\s+)?{_MONEY}\s*(?:-|–|—|to|and)\s*{_MONEY}", re.IGNORECASE)
+_UP_TO_RE = re.compile(
+    rf"(?:up\s+to|maximum(?:\s+of)?|max\.?|not\s+to\s+exceed|no\s+more\s+than|as\s+much\s+as)\s+{_MONEY}",
+    re.IGNORECASE,
+)
+_AT_LEAST_RE = re.compile(
+    rf"(?:at\s+least|minimum(?:\s+of)?|min\.?|starting\s+at|no\s+less\s+than)\s+{_MONEY}",
+    re.IGNORECASE,
+)
+_MULTIPLIERS = {
+    "k": 1_000,
+    "thousand": 1_000,
+    "m": 1_000_000,
+    "mm": 1_000_000,
+    "million": 1_000_000,
+    "billion": 1_000_000_000,
+}
+
+_DATE_RES = [
+    # March 15, 2025 / Mar. 15 2025 / March 15th, 2025
+    (
+        re.compile(
+            rf"\b({_MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE
+        ),
+        "mdy_name",
+    ),
+    # 15 March 2025
+    (
+        re.compile(
+            rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_NAMES})\.?,?\s+(\d{{4}})\b", re.IGNORECASE
+        ),
+        "dmy_name",
+    ),
+    # 2025-03-15
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), "iso"),
+    # 03/15/2025 (US order)
+    (re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b"), "us"),
+]
+_DEADLINE_CUE_RE = re.compile(
+    r"(deadline|due(?:\s+date)?|apply\s+by|applications?\s+(?:are\s+|must\s+be\s+)?(?:due|accepted\s+(?:through|until))|"
+    r"submit(?:ted)?\s+by|closing\s+date|closes?|close\s+on|no\s+later\s+than)",
+    re.IGNORECASE,
+)
+# Letter-of-intent and info-session dates are not the application deadline
+_SECONDARY_CUE_RE = re.compile(
+    r"letters?\s+of\s+intent|\bloi\b|pre-?application|webinar|information(?:al)?\s+session",
+    re.IGNORECASE,
+)
+_ROLLING_RE = re.compile(
+    r"rolling\s+(?:basis|deadline|applications?)|accepted\s+year[- ]round|open\s+until\s+(?:funds|filled)",
+    re.IGNORECASE,
+)
+# Characters before a date that may hold its deadline cue
+_CUE_WINDOW = 80
+
+_ELIGIBILITY_PATTERNS = {
+    "501(c)(3)": re.compile(r"501\s*\(?\s*c\s*\)?\s*\(?\s*3\s*\)?", re.IGNORECASE),
+    "nonprofit": re.compile(r"\bnon-?profits?\b|\bnot-for-profit\b", re.IGNORECASE),
+    "tribal": re.compile(
+        r"\b(?:federally[- ]recognized\s+tribes?|tribal\s+(?:governments?|nations?|organizations?|colleges?|entities)|"
+        r"tribes?|native\s+american|alaska\s+natives?|native\s+hawaiian|indigenous|first\s+nations?)\b",
+        re.IGNORECASE,
+    ),
+    "government": re.compile(
+        r"\b(?:state|local|county|city|municipal)\s+governments?\b|\bmunicipalities\b|\bpublic\s+agenc(?:y|ies)\b",
+        re.IGNORECASE,
+    ),
+    "education": re.compile(
+        r"\b(?:institutions?\s+of\s+higher\s+education|universit(?:y|ies)|colleges?|school\s+districts?|k-12)\b",
+        re.IGNORECASE,
+    ),
+    "business": re.compile(
+        r"\b(?:small\s+business(?:es)?|for-profit|startups?|companies)\b", re.IGNORECASE
+    ),
+    "individual": re.compile(
+        r"\bindividuals?\b|\bartists?\b|\bresearchers?\b|\bfellows?\b", re.IGNORECASE
+    ),
+}
+US_STATES = [
+    "alabama",
+    "alaska",
+    "arizona",
+    "arkansas",
+    "california",
+    "colorado",
+    "connecticut",
+    "delaware",
+    "florida",
+    "georgia",
+    "hawaii",
+    "idaho",
+    "illinois",
+    "indiana",
+    "iowa",
+    "kansas",
+    "kentucky",
+    "louisiana",
+    "maine",
+    "maryland",
+    "massachusetts",
+    "michigan",
+    "minnesota",
+    "mississippi",
+    "missouri",
+    "montana",
+    "nebraska",
+    "nevada",
+    "new hampshire",
+    "new jersey",
+    "new mexico",
+    "new york",
+    "north carolina",
+    "north dakota",
+    "ohio",
+    "oklahoma",
+    "oregon",
+    "pennsylvania",
+    "rhode island",
+    "south carolina",
+    "south dakota",
+    "tennessee",
+    "texas",
+    "utah",
+    "vermont",
+    "virginia",
+    "washington",
+    "west virginia",
+    "wisconsin",
+    "wyoming",
+    "puerto rico",
+    "district of columbia",
+]
+_STATE_RE = re.compile(
+    r"\b(" + "|".join(sorted(US_STATES, key=len, reverse=True)) + r")\b", re.IGNORECASE
+)
+_NATIONWIDE_RE = re.compile(
+    r"\bnationwide\b|\ball\s+50\s+states\b|\bany\s+(?:u\.?s\.?\s+)?state\b|"
+    r"\bacross\s+the\s+(?:united\s+states|u\.s\.|country)\b",
+    re.IGNORECASE,
+)
+NATIONWIDE = "nationwide"
+
+ELIGIBILITY_LABELS = list(_ELIGIBILITY_PATTERNS)
+_ELIGIBILITY_SENTENCE_RE = re.compile(r"[^.\n]*\beligib[^.\n]*[.\n]?", re.IGNORECASE)
+
+# organization_type keywords -> eligibility labels that satisfy them
+_ORG_TYPE_LABELS = {
+    "nonprofit": {"nonprofit", "501(c)(3)"},
+    "non-profit": {"nonprofit", "501(c)(3)"},
+    "501": {"nonprofit", "501(c)(3)"},
+    "tribe": {"tribal"},
+    "tribal": {"tribal"},
+    "native": {"tribal"},
+    "indigenous": {"tribal"},
+    "government": {"government"},
+    "municipal": {"government"},
+    "university": {"education"},
+    "college": {"education"},
+    "school": {"education"},
+    "business": {"business"},
+    "company": {"business"},
+    "startup": {"business"},
+    "individual": {"individual"},
+    "artist": {"individual"},
+    "researcher": {"individual", "education"},
+}
+
+
+@dataclass
+class GrantRecord:
+    """Facts extracted locally from one search hit."""
+
+    title: str
+    url: str
+    engines: List[str] = field(default_factory=list)
+    amount_min: Optional[int] = None
+    amount_max: Optional[int] = None
+    amount_text: str = ""
+    deadline: Optional[str] = None  # ISO date
+    deadline_text: str = ""
+    rolling: bool = False
+    expired: bool = False
+    eligibility: List[str] = field(default_factory=list)
+    eligibility_text: str = ""
+    locations: List[str] = field(default_factory=list)  # US states named, or "nationwide"
+    fit: float = 1.0  # multiplier applied to the snippet's relevance score
+
+    @property
+    def has_facts(self) -> bool:
+        """Whether anything beyond title and URL was extracted."""
+        return bool(
+            self.amount_min or self.amount_max or self.deadline or self.rolling or self.eligibility
+        )
+
+    def facts_line(self) -> str:
+        """One-line summary used in prompts and basic reports."""
+        parts = []
+        if self.amount_min or self.amount_max:
+            parts.append(f"amount {format_amount(self.amount_min, self.amount_max)}")
+        if self.deadline:
+            parts.append(f"deadline {self.deadline}{' (passed)' if self.expired else ''}")
+        elif self.rolling:
+            parts.append("deadline rolling")
+        if self.eligibility:
+            parts.append(f"eligible: {', '.join(self.eligibility)}")
+        return "; ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form."""
+        return asdict(self)
+
+
+def _money_value(number: str, suffix: Optional[str]) -> Optional[int]:
+    try:
+        value = float(number.replace(",", ""))
+    except ValueError:
+        return None
+    value *= _MULTIPLIERS.get((suffix or "").lower(), 1)
+    return int(value) if value >= 100 else None  # "$5" is never a grant amount
+
+
+def format_amount(amount_min: Optional[int], amount_max: Optional[int]) -> str:
+    """Render an extracted amount range."""
+    if amount_min and amount_max and amount_min != amount_max:
+        return f"${amount_min:,} - ${amount_max:,}"
+    if amount_max and not amount_min:
+        return f"up to ${amount_max:,}"
+    if amount_min and not amount_max:
+        return f"${amount_min:,}+"
+    return f"${(amount_min or amount_max):,}"
+
+
+def parse_amounts(text: str) -> Tuple[Optional[int], Optional[int], str]:
+    """
+    Extract an award range from text.
+
+    Explicit ranges win over "up to" / "at least" phrases, which win over bare
+    dollar figures.
+
+    Args:
+        text: Page text
+
+    Returns:
+        Tuple of (amount_min, amount_max, matched text)
+    """
+    match = _RANGE_RE.search(text)
+    if match:
+        low = _money_value(match.group(1), match.group(2))
+        high = _money_value(match.group(3), match.group(4))
+        if low and high:
+            return min(low, high), max(low, high), match.group(0)
+
+    match = _UP_TO_RE.search(text)
+    if match:
+        value = _money_value(match.group(1), match.group(2))
+        if value:
+            return None, value, match.group(0)
+
+    match = _AT_LEAST_RE.search(text)
+    if match:
+        value = _money_value(match.group(1), match.group(2))
+        if value:
+            return value, None, match.group(0)
+
+    values = []
+    for match in _MONEY_RE.finditer(text):
+        value = _money_value(match.group(1), match.group(2))
+        if value:
+            values.append(value)
+        if len(values) >= 5:
+            break
+    if values:
+        return min(values), max(values), ", ".join(f"${v:,}" for v in values)
+    return None, None, ""
+
+
+def _to_date(kind: str, groups: Tuple[str, ...]) -> Optional[date]:
+    try:
+        if kind == "mdy_name":
+            return date(int(groups[2]), _MONTHS[groups[0].lower()], int(groups[1]))
+        if kind == "dmy_name":
+            return date(int(groups[2]), _MONTHS[groups[1].lower()], int(groups[0]))
+        if kind == "iso":
+            return date(int(groups[0]), int(groups[1]), int(groups[2]))
+        return date(int(groups[2]), int(groups[0]), int(groups[1]))
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_deadline(text: str, today: Optional[date] = None) -> Tuple[Optional[date], str, bool]:
+    """
+    Find the application deadline in text.
+
+    Only dates preceded (within a short window) by a deadline cue such as
+    "apply by" or "due" count, and letter-of-intent dates only when nothing
+    else matched. The earliest upcoming one is returned; if every cued date
+    has passed, the latest is returned so the caller can flag it.
+
+    Args:
+        text: Page text
+        today: Reference date (defaults to today)
+
+    Returns:
+        Tuple of (deadline, matched text, rolling)
+    """
+    today = today or date.today()
+    rolling = bool(_ROLLING_RE.search(text))
+
+    cued: List[Tuple[date, str]] = []
+    secondary: List[Tuple[date, str]] = []
+    for pattern, kind in _DATE_RES:
+        for match in pattern.finditer(text):
+            cue_start = max(0, match.start() - _CUE_WINDOW)
+            # Only look back to the start of the date's own sentence
+            window = re.split(r"[.;\n]", text[cue_start : match.start()])[-1]
+            if not _DEADLINE_CUE_RE.search(window):
+                continue
+            parsed = _to_date(kind, match.groups())
+            if parsed:
+                found = (parsed, " ".join(f"{window}{match.group(0)}".split())[-120:])
+                (secondary if _SECONDARY_CUE_RE.search(window) else cued).append(found)
+
+    cued = cued or secondary
+    if not cued:
+        return None, "", rolling
+    upcoming = [item for item in cued if item[0] >= today]
+    deadline, snippet = min(upcoming) if upcoming else max(cued)
+    return deadline, snippet, rolling
+
+
+def find_eligibility(text: str) -> Tuple[List[str], str]:
+    """
+    Detect eligible applicant types.
+
+    Args:
+        text: Page text
+
+    Returns:
+        Tuple of (labels such as "501(c)(3)" or "tribal", first sentence
+        mentioning eligibility)
+    """
+    labels = [label for label, pattern in _ELIGIBILITY_PATTERNS.items() if pattern.search(text)]
+    sentence = _ELIGIBILITY_SENTENCE_RE.search(text)
+    return labels, " ".join(sentence.group(0).split())[:240] if sentence else ""
+
+
+def find_locations(text: str) -> List[str]:
+    """
+    Detect the geographic scope of a listing.
+
+    Args:
+        text: Page text
+
+    Returns:
+        Lowercase US state names mentioned, plus "nationwide" when the text
+        says the program is open across the country (empty when unknown)
+    """
+    states = dict.fromkeys(match.lower() for match in _STATE_RE.findall(text))
+    locations = list(states)
+    if _NATIONWIDE_RE.search(text):
+        locations.append(NATIONWIDE)
+    return locations
+
+
+def org_type_labels(organization_type: Optional[str]) -> Set[str]:
+    """Eligibility labels that satisfy an organization type ("nonprofit" -> {"nonprofit", "501(c)(3)"})."""
+    org = (organization_type or "").lower()
+    wanted: Set[str] = set()
+    for keyword, labels in _ORG_TYPE_LABELS.items():
+        if keyword in org:
+            wanted |= labels
+    return wanted
+
+
+def _fit(record: GrantRecord, criteria: Optional[GrantSearchCriteria], today: date) -> float:
+    """Score multiplier for how well extracted facts match the criteria."""
+    fit = 1.0
+    if record.expired:
+        fit *= 0.3
+    if criteria is None:
+        return fit
+
+    if criteria.deadline_months and record.deadline and not record.expired:
+        horizon = today + timedelta(days=30 * criteria.deadline_months)
+        if date.fromisoformat(record.deadline) > horizon:
+            fit *= 0.7
+
+    if record.amount_min or record.amount_max:
+        low = record.amount_min or 0
+        high = record.amount_max or low
+        if criteria.amount_min and high and high < criteria.amount_min:
+            fit *= 0.5
+        elif criteria.amount_max and low > criteria.amount_max:
+            fit *= 0.5
+        else:
+            fit *= 1.1
+
+    if criteria.organization_type and record.eligibility:
+        wanted = org_type_labels(criteria.organization_type)
+        if wanted:
+            fit *= 1.2 if wanted & set(record.eligibility) else 0.8
+    return fit
+
+
+def extract_record(
+    result: Dict[str, Any],
+    criteria: Optional[GrantSearchCriteria] = None,
+    engine: str = "unknown",
+    today: Optional[date] = None,
+) -> GrantRecord:
+    """
+    Extract a structured record from one search hit.
+
+    Args:
+        result: One Tavily result (``raw_content`` preferred over ``content``)
+        criteria: Search criteria used to compute ``fit``
+        engine: Engine that produced the hit when it carries no ``engines``
+        today: Reference date for deadline checks
+
+    Returns:
+        Extracted record
+    """
+    today = today or date.today()
+    raw = result.get("raw_content") or ""
+    content = result.get("content") or ""
+    text = f"{result.get('title') or ''}\n{content}\n{raw[:MAX_SCAN_CHARS]}"
+
+    amount_min, amount_max, amount_text = parse_amounts(text)
+    deadline, deadline_text, rolling = parse_deadline(text, today)
+    eligibility, eligibility_text = find_eligibility(text)
+    locations = find_locations(text)
+
+    record = GrantRecord(
+        title=result.get("title") or "No title",
+        url=result.get("canonical_url") or result.get("url", ""),
+        engines=list(result.get("engines") or [engine]),
+        amount_min=amount_min,
+        amount_max=amount_max,
+        amount_text=amount_text,
+        deadline=deadline.isoformat() if deadline else None,
+        deadline_text=deadline_text,
+        rolling=rolling,
+        expired=bool(deadline and deadline < today),
+        eligibility=eligibility,
+        eligibility_text=eligibility_text,
+        locations=locations,
+    )
+    record.fit = round(_fit(record, criteria, today), 3)
+    return record
+
+
+def extract_records(
+    search_results: List[Dict[str, Any]],
+    criteria: Optional[GrantSearchCriteria] = None,
+    today: Optional[date] = None,
+) -> Dict[str, GrantRecord]:
+    """
+    Extract records for every hit, keyed by (canonical) URL.
+
+    Args:
+        search_results: Result sets as produced by research_grants
+        criteria: Search criteria used to compute ``fit``
+        today: Reference date for deadline checks
+
+    Returns:
+        URL -> record (first occurrence wins)
+    """
+    records: Dict[str, GrantRecord] = {}
+    for result_set in search_results:
+        engine = result_set.get("engine", "unknown")
+        for result in result_set.get("results", {}).get("results", []):
+            url = result.get("canonical_url") or result.get("url", "")
+            if url in records:
+                continue
+            records[url] = extract_record(result, criteria, engine=engine, today=today)
+    return records
+
+
+def apply_records(
+    ranked: List[ContextSnippet], records: Dict[str, GrantRecord], max_content_chars: int = 300
+) -> List[ContextSnippet]:
+    """
+    Re-rank snippets by extracted fit and attach their facts.
+
+    Snippets with extracted facts keep a shorter excerpt, since the facts line
+    already carries what the LLM used to dig out of the page.
+
+    Args:
+        ranked: Snippets from rank_snippets
+        records: Records from extract_records
+        max_content_chars: Excerpt length kept for snippets that have facts
+
+    Returns:
+        Snippets sorted by relevance score times fit
+    """
+    for snippet in ranked:
+        record = records.get(snippet.url)
+        if record is None:
+            continue
+        snippet.score *= record.fit
+        if record.has_facts:
+            snippet.facts = record.facts_line()
+            snippet.content = snippet.content[:max_content_chars]
+    return sorted(ranked, key=lambda s: s.score, reverse=True)
+
+
+def rank_records(
+    records: Dict[str, GrantRecord], ranked: List[ContextSnippet]
+) -> List[GrantRecord]:
+    """
+    Order records for a basic (LLM-free) result.
+
+    Args:
+        records: Records from extract_records
+        ranked: Snippets already re-ranked by apply_records
+
+    Returns:
+        Records of relevant hits in rank order, those with facts first
+    """
+    ordered = [records[s.url] for s in ranked if s.url in records]
+    return sorted(ordered, key=lambda r: not r.has_facts)
@@ -0,0 +1,262 @@
+"""
+Hedged requests for tail-latency control.
+
+One slow search call sets the latency of a whole research run. A hedge
+policy watches each call: if it has not answered within an adaptive delay
+(a high percentile of recent call latencies), an identical duplicate is
+sent and whichever answers first wins; the loser is cancelled (async) or
+its answer discarded (blocking calls cannot be interrupted).
+
+Extra load is capped with a budget in the style of gRPC retry throttling:
+every call earns ``max_extra_load`` hedge tokens (up to ``burst``) and every
+hedge spends one, so at most ~10% more requests are sent by default, even
+while the provider is uniformly slow.
+
+Policies are shared per provider like the resilience guards, via
+``get_hedge_policy(name)``; ``hedging_stats()`` reports hedge rate and wins.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from latency_stats import percentile
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Worker pool that runs blocking primary and hedge attempts."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        return _executor
+
+
+class HedgePolicy:
+    """Adaptive-delay request hedging with a cap on extra load."""
+
+    def __init__(
+        self,
+        name: str,
+        quantile: float = 95,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.05,
+        max_delay: float = 10.0,
+        max_extra_load: float = 0.1,
+        burst: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            name: Provider name used in metrics
+            quantile: Latency percentile after which a hedge is sent
+            initial_delay: Delay used until ``min_samples`` latencies are known
+            min_delay: Lower bound on the hedge delay (seconds)
+            max_delay: Upper bound on the hedge delay (seconds)
+            max_extra_load: Hedge tokens earned per call (0.1 = at most ~10%
+                extra requests)
+            burst: Most hedge tokens that can be saved up
+            window: Recent latencies kept for the percentile
+            min_samples: Latencies needed before the percentile is trusted
+        """
+        self.name = name
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_extra_load = max_extra_load
+        self.burst = max(1.0, burst)
+        self.min_samples = max(1, min_samples)
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._tokens = self.burst
+        self._lock = threading.Lock()
+        self.metrics = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "budget_denied": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+
+    def delay(self) -> float:
+        """Seconds a call may run before it is hedged."""
+        with self._lock:
+            samples = list(self._latencies)
+        observed = percentile(samples, self.quantile) if len(samples) >= self.min_samples else None
+        if observed is None:
+            return self.initial_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    def _start_call(self) -> float:
+        """Count a call, earn its share of hedge budget and return its hedge delay."""
+        with self._lock:
+            self.metrics["calls"] += 1
+            self._tokens = min(self.burst, self._tokens + self.max_extra_load)
+        return self.delay()
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.metrics["hedged"] += 1
+                return True
+            self.metrics["budget_denied"] += 1
+            return False
+
+    def _observe(self, seconds: float) -> None:
+        # When a hedge wins, the primary's elapsed time is recorded as a lower
+        # bound of its latency, which keeps the percentile from drifting down
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def run(self, fn: Callable[[], T]) -> T:
+        """
+        Run a blocking call, hedging it once if it is slow.
+
+        Args:
+            fn: Zero-argument callable performing one request
+
+        Returns:
+            The first successful answer
+
+        Raises:
+            Exception: The primary's error when every attempt failed
+        """
+        delay = self._start_call()
+        started = time.perf_counter()
+        primary = _get_executor().submit(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_token():
+            result = primary.result()
+            self._observe(time.perf_counter() - started)
+            return result
+
+        hedge = _get_executor().submit(fn)
+        winner = self._first_success([primary, hedge])
+        self._observe(time.perf_counter() - started)
+        if winner is None:
+            return primary.result()  # both failed; raise the primary's error
+        self._count("hedge_wins" if winner is hedge else "primary_wins")
+        # The loser cannot be interrupted; its answer is dropped
+        (primary if winner is hedge else hedge).cancel()
+        return winner.result()
+
+    @staticmethod
+    def _first_success(futures: List["Future[T]"]) -> Optional["Future[T]"]:
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future in done and future.exception() is None:
+                    return future
+        return None
+
+    async def arun(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run an async call, hedging it once if it is slow.
+
+        Args:
+            factory: Zero-argument callable returning a fresh awaitable per attempt
+
+        Returns:
+            The first successful answer; the other attempt is cancelled
+
+        Raises:
+            Exception: The primary's error when every attempt failed
+        """
+        delay = self._start_call()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(factory())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._take_token():
+                result = await primary
+                self._observe(time.perf_counter() - started)
+                return result
+
+            hedge = asyncio.ensure_future(factory())
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        self._observe(time.perf_counter() - started)
+                        self._count("hedge_wins" if task is hedge else "primary_wins")
+                        return task.result()
+            self._observe(time.perf_counter() - started)
+            return primary.result()  # both failed; raise the primary's error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # Retrieve losers' exceptions so they are not logged as unhandled
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counters, hedge rate, win rate and the current delay."""
+        with self._lock:
+            metrics: Dict[str, Any] = dict(self.metrics)
+        metrics["hedge_rate"] = (
+            round(metrics["hedged"] / metrics["calls"], 4) if metrics["calls"] else 0.0
+        )
+        metrics["hedge_win_rate"] = (
+            round(metrics["hedge_wins"] / metrics["hedged"], 4) if metrics["hedged"] else 0.0
+        )
+        metrics["delay_seconds"] = round(self.delay(), 4)
+        return metrics
+
+
+_policies: Dict[str, HedgePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_hedge_policy(name: str) -> HedgePolicy:
+    """Return the process-wide hedge policy for a provider, creating it on first use."""
+    with _policies_lock:
+        policy = _policies.get(name)
+        if policy is None:
+            policy = _policies[name] = HedgePolicy(name)
+        return policy
+
+
+def configure_hedging(name: str, **settings: Any) -> HedgePolicy:
+    """
+    Replace a provider's hedge policy with one using the given settings.
+
+    Args:
+        name: Provider name ("tavily", ...)
+        **settings: HedgePolicy keyword arguments
+
+    Returns:
+        The new policy
+    """
+    policy = HedgePolicy(name, **settings)
+    with _policies_lock:
+        _policies[name] = policy
+    return policy
+
+
+def hedging_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every hedge policy created so far."""
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {policy.name: policy.stats() for policy in policies}
@@ -0,0 +1,108 @@
+"""
+Per-stage latency tracking for the research pipeline.
+
+GrantResearchAgent records how long each pipeline stage (query planning,
+individual searches, dedup, LLM calls, analysis) takes. Each research run
+returns its own stage timings, and the agent keeps a rolling window per stage
+so load tests and adaptive features can read live p50/p95/p99 estimates.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile.
+
+    Args:
+        values: Samples (any order)
+        q: Percentile in [0, 100]
+
+    Returns:
+        The percentile, or None for an empty sample
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Count, mean and p50/p95/p99 of a sample, in the sample's units."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+class LatencyRecorder:
+    """Thread-safe rolling window of latency samples per stage (seconds)."""
+
+    def __init__(self, window: int = 500):
+        """
+        Initialize an empty recorder.
+
+        Args:
+            window: Samples kept per stage; older samples roll off
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one sample for a stage."""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    @contextmanager
+    def time(self, stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+        """
+        Time a block, recording it here and optionally into a per-run dict.
+
+        Args:
+            stage: Stage name
+            timings: Per-run dict that receives the elapsed seconds (summed
+                if the stage runs more than once)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.record(stage, elapsed)
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+
+    def samples(self, stage: str) -> List[float]:
+        """Current window of samples for a stage."""
+        with self._lock:
+            return list(self._samples.get(stage, ()))
+
+    def percentile(self, stage: str, q: float) -> Optional[float]:
+        """Percentile of a stage's current window, or None without samples."""
+        return percentile(self.samples(stage), q)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Summary statistics for every stage."""
+        with self._lock:
+            stages = {stage: list(samples) for stage, samples in self._samples.items()}
+        return {stage: summarize(samples) for stage, samples in stages.items()}
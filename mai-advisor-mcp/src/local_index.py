@@ -0,0 +1,532 @@
+"""
+Offline grant index for SearchEngine.LOCAL.
+
+Bulk grant-listing exports (the Grants.gov XML extract, or JSON Lines with
+the same fields) are ingested in streaming fashion into a SQLite file with
+an FTS5 full-text index. FTS5 keeps an on-disk inverted index and ranks
+matches with BM25, so a query is answered locally in well under a
+millisecond for typical corpora: no network, no rate limits, no quota.
+
+Hits are returned in the same shape as a Tavily search response, with the
+full listing (deadline, award range, eligible applicants, description) as
+``raw_content``, so they flow through deduplication, fact extraction and
+analysis exactly like web results.
+
+Usage:
+    python src/local_index.py ingest GrantsDBExtract20261017v2.zip
+    python src/local_index.py search '("tribal" OR "health") deadline_months:6'
+"""
+
+import argparse
+import html
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from caching import default_cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS grants (
+    id INTEGER PRIMARY KEY,
+    source_id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    agency TEXT NOT NULL DEFAULT '',
+    number TEXT NOT NULL DEFAULT '',
+    eligibility TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    close_date TEXT,
+    post_date TEXT,
+    award_floor INTEGER,
+    award_ceiling INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_grants_close ON grants(close_date);
+CREATE INDEX IF NOT EXISTS idx_grants_award ON grants(award_floor, award_ceiling);
+CREATE VIRTUAL TABLE IF NOT EXISTS grants_fts USING fts5(
+    title, agency, eligibility, description,
+    content='grants', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS grants_ai AFTER INSERT ON grants BEGIN
+    INSERT INTO grants_fts(rowid, title, agency, eligibility, description)
+    VALUES (new.id, new.title, new.agency, new.eligibility, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS grants_ad AFTER DELETE ON grants BEGIN
+    INSERT INTO grants_fts(grants_fts, rowid, title, agency, eligibility, description)
+    VALUES ('delete', old.id, old.title, old.agency, old.eligibility, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS grants_au AFTER UPDATE ON grants BEGIN
+    INSERT INTO grants_fts(grants_fts, rowid, title, agency, eligibility, description)
+    VALUES ('delete', old.id, old.title, old.agency, old.eligibility, old.description);
+    INSERT INTO grants_fts(rowid, title, agency, eligibility, description)
+    VALUES (new.id, new.title, new.agency, new.eligibility, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO grants (source_id, url, title, agency, number, eligibility, description,
+                    close_date, post_date, award_floor, award_ceiling)
+VALUES (:source_id, :url, :title, :agency, :number, :eligibility, :description,
+        :close_date, :post_date, :award_floor, :award_ceiling)
+ON CONFLICT(source_id) DO UPDATE SET
+    url = excluded.url, title = excluded.title, agency = excluded.agency,
+    number = excluded.number, eligibility = excluded.eligibility,
+    description = excluded.description, close_date = excluded.close_date,
+    post_date = excluded.post_date, award_floor = excluded.award_floor,
+    award_ceiling = excluded.award_ceiling
+"""
+
+# BM25 column weights: title, agency, eligibility, description
+_BM25_WEIGHTS = "10.0, 2.0, 3.0, 1.0"
+
+# Grants.gov eligible applicant codes
+_ELIGIBILITY_CODES = {
+    "00": "State governments",
+    "01": "County governments",
+    "02": "City or township governments",
+    "04": "Special district governments",
+    "05": "Independent school districts",
+    "06": "Public and State controlled institutions of higher education",
+    "07": "Native American tribal governments (Federally recognized)",
+    "08": "Public and Indian housing authorities",
+    "11": "Native American tribal organizations (other than Federally recognized tribal governments)",
+    "12": "Nonprofits having a 501(c)(3) status with the IRS, other than institutions of higher education",
+    "13": "Nonprofits that do not have a 501(c)(3) status with the IRS, other than institutions of higher education",
+    "20": "Private institutions of higher education",
+    "21": "Individuals",
+    "22": "For profit organizations other than small businesses",
+    "23": "Small businesses",
+    "25": 'Others (see text field entitled "Additional Information on Eligibility" for clarification)',
+    "99": 'Unrestricted (i.e., open to any type of entity above), subject to any clarification in text field entitled "Additional Information on Eligibility"',
+}
+
+_FILTER_RE = re.compile(r"\b(deadline_months|amount_min|amount_max):(\d+)\b")
+_WORD_RE = re.compile(r"\w+")
+# One dork term: optional "-" exclusion, optional "operator:", then a phrase or word
+_DORK_TERM_RE = re.compile(r'(-?)(?:([A-Za-z]+):)?("[^"]*"|[^\s()"]+)')
+_URL_OPERATORS = {"site", "inurl", "allinurl", "filetype", "ext", "cache", "related", "link"}
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def parse_query(query: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Split a local index query into its FTS5 match expression and filters.
+
+    Args:
+        query: Query from LocalIndexQueryGenerator (or typed by hand)
+
+    Returns:
+        Tuple of (match expression, {filter name: value})
+    """
+    filters = {name: int(value) for name, value in _FILTER_RE.findall(query)}
+    return " ".join(_FILTER_RE.sub(" ", query).split()), filters
+
+
+def _fallback_match(expression: str) -> str:
+    """
+    FTS5 query for input that is not valid FTS5 syntax, such as a web dork.
+
+    Quoted phrases stay phrases, other words become OR terms and ``-term``
+    exclusions become a NOT clause. Operators that target URLs or file types
+    (``site:``, ``filetype:``, ...) have no counterpart in the index and are
+    dropped; ``intitle:word`` and similar keep their word.
+
+    Args:
+        expression: Match expression that FTS5 rejected
+
+    Returns:
+        FTS5 match expression, or "" if nothing searchable is left
+    """
+    included: List[str] = []
+    excluded: List[str] = []
+    for negated, operator, value in _DORK_TERM_RE.findall(expression):
+        if operator.lower() in _URL_OPERATORS:
+            continue
+        words = [w for w in _WORD_RE.findall(value) if w not in ("AND", "OR", "NOT", "NEAR")]
+        if not words:
+            continue
+        terms = [f'"{" ".join(words)}"'] if value.startswith('"') else [f'"{w}"' for w in words]
+        (excluded if negated else included).extend(terms)
+    if not included:
+        return ""
+    match = " OR ".join(included)
+    if excluded:
+        match = f"({match}) NOT ({' OR '.join(excluded)})"
+    return match
+
+
+def _clean_text(text: str) -> str:
+    return " ".join(html.unescape(_TAG_RE.sub(" ", text or "")).split())
+
+
+def _parse_date(value: Optional[str]) -> Optional[str]:
+    """ISO date from Grants.gov MMDDYYYY or an ISO string."""
+    value = (value or "").strip()
+    for fmt in ("%m%d%Y", "%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(value[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value: Any) -> Optional[int]:
+    try:
+        amount = int(float(str(value).replace(",", "").replace("$", "")))
+    except (TypeError, ValueError):
+        return None
+    return amount if amount > 0 else None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _normalize(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fill defaults and clean one record; None if it has no title or URL."""
+    title = _clean_text(record.get("title", ""))
+    url = (record.get("url") or "").strip()
+    if not title or not url:
+        return None
+    eligibility = record.get("eligibility") or ""
+    if isinstance(eligibility, list):
+        eligibility = "; ".join(eligibility)
+    return {
+        "source_id": str(record.get("source_id") or url),
+        "url": url,
+        "title": title,
+        "agency": _clean_text(record.get("agency", "")),
+        "number": (record.get("number") or "").strip(),
+        "eligibility": _clean_text(eligibility),
+        "description": _clean_text(record.get("description", "")),
+        "close_date": _parse_date(record.get("close_date")),
+        "post_date": _parse_date(record.get("post_date")),
+        "award_floor": _parse_amount(record.get("award_floor")),
+        "award_ceiling": _parse_amount(record.get("award_ceiling")),
+    }
+
+
+def iter_grants_gov_xml(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream opportunities out of a Grants.gov XML extract.
+
+    Each synopsis or forecast element is converted as soon as it closes and
+    then discarded, so memory stays flat however large the extract is.
+
+    Args:
+        stream: Binary file object with the XML
+
+    Yields:
+        Raw records in the shape accepted by LocalGrantIndex.add
+    """
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end":
+            continue
+        tag = _local_name(elem.tag)
+        if not (tag.startswith("Opportunity") and tag.endswith("Detail_1_0")):
+            continue
+        fields: Dict[str, str] = {}
+        eligible: List[str] = []
+        for child in elem:
+            name = _local_name(child.tag)
+            text = (child.text or "").strip()
+            if name == "EligibleApplicants":
+                eligible.append(_ELIGIBILITY_CODES.get(text, text))
+            elif text:
+                fields[name] = text
+        root.clear()
+
+        opportunity_id = fields.get("OpportunityID")
+        if not opportunity_id:
+            continue
+        extra = fields.get("AdditionalInformationOnEligibility")
+        yield {
+            "source_id": f"grants.gov:{opportunity_id}",
+            "url": f"https://www.grants.gov/search-results-detail/{opportunity_id}",
+            "title": fields.get("OpportunityTitle", ""),
+            "agency": fields.get("AgencyName", ""),
+            "number": fields.get("OpportunityNumber", ""),
+            "eligibility": eligible + ([extra] if extra else []),
+            "description": fields.get("Description") or fields.get("Synopsis", ""),
+            "close_date": fields.get("CloseDate") or fields.get("EstimatedApplicationDueDate"),
+            "post_date": fields.get("PostDate") or fields.get("EstimatedSynopsisPostDate"),
+            "award_floor": fields.get("AwardFloor"),
+            "award_ceiling": fields.get("AwardCeiling"),
+        }
+
+
+def iter_jsonl(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSON Lines export.
+
+    Each line is an object with ``title`` and ``url`` and optionally
+    ``source_id``, ``agency``, ``number``, ``eligibility`` (string or list),
+    ``description``, ``close_date``, ``post_date``, ``award_floor`` and
+    ``award_ceiling``.
+    """
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class LocalGrantIndex:
+    """On-disk BM25 full-text index of bulk grant listings."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: SQLite file path (defaults to MAI_ADVISOR_LOCAL_INDEX or
+                <cache dir>/grant_index.sqlite)
+        """
+        self.path = Path(path) if path else self.default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def default_path() -> Path:
+        """Index location used when no path is given."""
+        env_path = os.environ.get("MAI_ADVISOR_LOCAL_INDEX")
+        return Path(env_path) if env_path else default_cache_dir() / "grant_index.sqlite"
+
+    @classmethod
+    def open_default(cls) -> Optional["LocalGrantIndex"]:
+        """Open the default index if one has been built, else return None."""
+        return cls() if cls.default_path().exists() else None
+
+    def add(self, records: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Insert or update records, committing in batches.
+
+        Args:
+            records: Raw records (see iter_jsonl for the fields); a record
+                with a known ``source_id`` replaces the stored one
+            batch_size: Records per transaction
+
+        Returns:
+            Number of records stored
+        """
+        stored = 0
+        batch: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            with self._lock:
+                self._conn.executemany(_UPSERT, batch)
+                self._conn.commit()
+            batch.clear()
+
+        for record in records:
+            normalized = _normalize(record)
+            if normalized is None:
+                continue
+            batch.append(normalized)
+            stored += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return stored
+
+    def ingest(self, source: str, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Stream a bulk export file into the index.
+
+        Supports the Grants.gov XML extract (``.xml``, or the ``.zip`` it is
+        published as) and JSON Lines (``.jsonl``). The full-text index is
+        merged afterwards so later queries touch as few b-trees as possible.
+
+        Args:
+            source: Path to the export file
+            batch_size: Records per transaction
+
+        Returns:
+            Number of records stored, elapsed seconds and index size
+        """
+        started = time.perf_counter()
+        path = Path(source)
+        suffix = path.suffix.lower()
+        if suffix == ".zip":
+            with zipfile.ZipFile(path) as archive:
+                members = [m for m in archive.namelist() if m.lower().endswith((".xml", ".jsonl"))]
+                if not members:
+                    raise ValueError(f"No .xml or .jsonl file inside {path}")
+                stored = 0
+                for member in members:
+                    with archive.open(member) as stream:
+                        records = (
+                            iter_jsonl(stream)
+                            if member.lower().endswith(".jsonl")
+                            else iter_grants_gov_xml(stream)
+                        )
+                        stored += self.add(records, batch_size)
+        elif suffix == ".xml":
+            with open(path, "rb") as stream:
+                stored = self.add(iter_grants_gov_xml(stream), batch_size)
+        elif suffix in (".jsonl", ".ndjson"):
+            with open(path, "rb") as stream:
+                stored = self.add(iter_jsonl(stream), batch_size)
+        else:
+            raise ValueError(f"Unsupported export format: {path.suffix or path.name}")
+
+        with self._lock:
+            self._conn.execute("INSERT INTO grants_fts(grants_fts) VALUES ('optimize')")
+            self._conn.commit()
+        return {
+            "stored": stored,
+            "seconds": round(time.perf_counter() - started, 2),
+            **self.stats(),
+        }
+
+    def search(
+        self, query: str, max_results: int = 5, today: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Query the index.
+
+        Listings whose close date has passed are never returned.
+
+        Args:
+            query: FTS5 match expression plus optional ``deadline_months:N``,
+                ``amount_min:N`` and ``amount_max:N`` filters
+            max_results: Maximum hits
+            today: Reference date for deadline filters (defaults to today)
+
+        Returns:
+            Tavily-shaped response: {"query", "results": [{title, url,
+            content, score, raw_content}], "response_time"}; ``score`` is
+            the BM25 relevance (higher is better, not bounded to 0-1)
+        """
+        started = time.perf_counter()
+        today = today or date.today()
+        expression, filters = parse_query(query)
+
+        clauses = ["(g.close_date IS NULL OR g.close_date >= ?)"]
+        params: List[Any] = [today.isoformat()]
+        if "deadline_months" in filters:
+            clauses.append("g.close_date <= ?")
+            params.append((today + timedelta(days=30 * filters["deadline_months"])).isoformat())
+        if "amount_min" in filters:
+            clauses.append("(g.award_ceiling IS NULL OR g.award_ceiling >= ?)")
+            params.append(filters["amount_min"])
+        if "amount_max" in filters:
+            clauses.append("(g.award_floor IS NULL OR g.award_floor <= ?)")
+            params.append(filters["amount_max"])
+
+        with self._lock:
+            if expression:
+                sql = (
+                    f"SELECT g.*, bm25(grants_fts, {_BM25_WEIGHTS}) AS rank FROM grants_fts "
+                    f"JOIN grants g ON g.id = grants_fts.rowid WHERE grants_fts MATCH ? "
+                    f"AND {' AND '.join(clauses)} ORDER BY rank LIMIT ?"
+                )
+                try:
+                    rows = self._conn.execute(sql, [expression, *params, max_results]).fetchall()
+                except sqlite3.OperationalError:
+                    # Not valid FTS5 syntax (e.g. a web-style dork); match its words instead
+                    fallback = _fallback_match(expression)
+                    rows = (
+                        self._conn.execute(sql, [fallback, *params, max_results]).fetchall()
+                        if fallback
+                        else []
+                    )
+            else:
+                sql = (
+                    f"SELECT g.*, 0.0 AS rank FROM grants g WHERE {' AND '.join(clauses)} "
+                    "ORDER BY g.close_date IS NULL, g.close_date LIMIT ?"
+                )
+                rows = self._conn.execute(sql, [*params, max_results]).fetchall()
+
+        return {
+            "query": query,
+            "results": [self._to_hit(row) for row in rows],
+            "response_time": round(time.perf_counter() - started, 6),
+        }
+
+    @staticmethod
+    def _to_hit(row: sqlite3.Row) -> Dict[str, Any]:
+        """Render a listing as a search hit whose raw content states its facts."""
+        facts = []
+        if row["agency"]:
+            facts.append(f"Agency: {row['agency']}")
+        if row["number"]:
+            facts.append(f"Opportunity number: {row['number']}")
+        if row["close_date"]:
+            closes = date.fromisoformat(row["close_date"])
+            facts.append(
+                f"Application deadline: {closes.strftime('%B')} {closes.day}, {closes.year}"
+            )
+        if row["award_floor"]:
+            facts.append(f"Award floor: ${row['award_floor']:,}")
+        if row["award_ceiling"]:
+            facts.append(f"Award ceiling: ${row['award_ceiling']:,}")
+        if row["eligibility"]:
+            facts.append(f"Eligible applicants: {row['eligibility']}")
+        summary = ". ".join(facts[:3])
+        description = row["description"]
+        return {
+            "title": row["title"],
+            "url": row["url"],
+            "content": f"{summary}. {description[:400]}" if summary else description[:400],
+            # FTS5 bm25() is lower-is-better; negate it so higher is more relevant
+            "score": -row["rank"] or 0.0,
+            "raw_content": "\n".join([row["title"], *facts, "", description]),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of indexed listings and the index file location."""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM grants").fetchone()[0]
+        return {"path": str(self.path), "listings": total}
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query the offline grant index")
+    parser.add_argument(
+        "--index", help="index file (defaults to MAI_ADVISOR_LOCAL_INDEX or the cache dir)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser(
+        "ingest", help="stream a Grants.gov XML/zip or JSON Lines export into the index"
+    )
+    ingest.add_argument("source")
+    ingest.add_argument("--batch-size", type=int, default=1000)
+    search = commands.add_parser("search", help="run a local index query")
+    search.add_argument("query")
+    search.add_argument("--max-results", type=int, default=5)
+    args = parser.parse_args()
+
+    index = LocalGrantIndex(args.index)
+    if args.command == "ingest":
+        print(json.dumps(index.ingest(args.source, batch_size=args.batch_size), indent=2))
+    else:
+        response = index.search(args.query, max_results=args.max_results)
+        for hit in response["results"]:
+            print(f"{hit['score']:>10.4g}  {hit['title']}\n            {hit['url']}")
+        print(f"{len(response['results'])} results in {response['response_time'] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
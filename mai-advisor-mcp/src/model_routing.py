@@ -0,0 +1,154 @@
+"""
+Two-tier model routing and per-tier accounting.
+
+LLM work in a deep research run splits into two tiers:
+
+- **triage**: many small, parallel calls over individual results -- the
+  per-result relevance check and map-reduce note extraction. They run on the
+  fast, cheap model (``fast_model_name``).
+- **synthesis**: one call over the results that survived triage, producing
+  the report. It runs on the strong model (``model_name``).
+
+Without a fast model both tiers use the strong model. ``ModelUsage`` counts
+calls, cache hits, latency and input/output tokens per tier so the split can
+be tuned; tokens come from the provider's usage metadata when it is returned
+and are estimated from the text otherwise.
+"""
+
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Set, Tuple
+
+from context_builder import estimate_tokens
+from latency_stats import LatencyRecorder, summarize
+
+TRIAGE = "triage"
+SYNTHESIS = "synthesis"
+
+TRIAGE_SYSTEM_PROMPT = """You screen grant search results for relevance before a detailed analysis.
+For every numbered result decide whether it describes a grant, funding program or
+funder that could plausibly fit the search criteria. Reply with exactly one line
+per result in the form "<number>: KEEP" or "<number>: DROP" and nothing else.
+When unsure, KEEP."""
+
+_TRIAGE_LINE_RE = re.compile(
+    r"^\W*(?:result\s*)?(\d+)\W+(keep|drop)\b", re.IGNORECASE | re.MULTILINE
+)
+
+
+def parse_triage(text: str, count: int) -> Set[int]:
+    """
+    Indices (1-based) of results to keep from a triage reply.
+
+    Fails open: results the reply does not mention are kept, and a reply with
+    no recognizable verdicts keeps everything.
+
+    Args:
+        text: Triage model response
+        count: Number of results in the batch
+
+    Returns:
+        Kept result numbers
+    """
+    dropped = {
+        int(number)
+        for number, verdict in _TRIAGE_LINE_RE.findall(text)
+        if verdict.lower() == "drop" and 1 <= int(number) <= count
+    }
+    return set(range(1, count + 1)) - dropped
+
+
+def response_tokens(message: Any, prompt_text: str, text: str) -> Tuple[int, int, bool]:
+    """
+    Input and output tokens of one response.
+
+    Args:
+        message: Final response message or chunk (may carry ``usage_metadata``)
+        prompt_text: Prompt sent, for estimation
+        text: Response text, for estimation
+
+    Returns:
+        Tuple of (input tokens, output tokens, whether they were estimated)
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("input_tokens") or usage.get("output_tokens"):
+        return int(usage.get("input_tokens") or 0), int(usage.get("output_tokens") or 0), False
+    return estimate_tokens(prompt_text), estimate_tokens(text), True
+
+
+@dataclass
+class TierUsage:
+    """Counters for one tier."""
+
+    calls: int = 0
+    cached: int = 0  # answered from the LLM cache or a run checkpoint
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated_calls: int = 0  # calls whose tokens were estimated, not reported
+
+
+class ModelUsage:
+    """Thread-safe per-tier call, latency and token accounting."""
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self._tiers: Dict[str, TierUsage] = {}
+        self._models: Dict[str, Set[str]] = {}
+        self.latency = LatencyRecorder()
+        self._lock = threading.Lock()
+
+    def _tier(self, tier: str) -> TierUsage:
+        usage = self._tiers.get(tier)
+        if usage is None:
+            usage = self._tiers[tier] = TierUsage()
+            self._models[tier] = set()
+        return usage
+
+    def record(
+        self,
+        tier: str,
+        model: str,
+        seconds: float,
+        input_tokens: int,
+        output_tokens: int,
+        estimated: bool = False,
+    ) -> None:
+        """
+        Count one live call.
+
+        Args:
+            tier: TRIAGE or SYNTHESIS
+            model: Model that answered
+            seconds: Call latency
+            input_tokens: Prompt tokens
+            output_tokens: Completion tokens
+            estimated: Token counts are estimates
+        """
+        with self._lock:
+            usage = self._tier(tier)
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.estimated_calls += int(estimated)
+            self._models[tier].add(model)
+        self.latency.record(tier, seconds)
+
+    def record_cached(self, tier: str) -> None:
+        """Count a call answered without the model."""
+        with self._lock:
+            self._tier(tier).cached += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per tier: models, counters and latency statistics (seconds)."""
+        with self._lock:
+            tiers = {tier: asdict(usage) for tier, usage in self._tiers.items()}
+            models = {tier: sorted(names) for tier, names in self._models.items()}
+        return {
+            tier: {
+                "models": models[tier],
+                **counters,
+                "latency": summarize(self.latency.samples(tier)),
+            }
+            for tier, counters in tiers.items()
+        }
@@ -0,0 +1,338 @@
+"""
+Persistent store of grant opportunities found by research runs.
+
+Every research run feeds the structured records from local extraction
+(amount, deadline, eligibility) into a SQLite database. An opportunity found
+again, at the same canonical URL or under the same funder and title, is
+updated in place rather than duplicated. Deadline, amount range, geographic
+scope, sector and keyword columns are indexed, so repeat questions can be
+answered straight from GrantSearchCriteria without any web search.
+
+Two kinds of tag describe where a grant applies: ``scope`` tags hold the
+states (or "nationwide") extracted from the listing itself, and ``location``
+tags the location searched for when it was found. Location queries use the
+extracted scope and fall back to the search tags only for opportunities
+whose scope could not be extracted.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from caching import default_cache_dir
+from search_operators import GrantSearchCriteria
+from grant_extraction import NATIONWIDE, GrantRecord, find_locations
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS opportunities (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT NOT NULL UNIQUE,
+    funder TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    amount_min INTEGER,
+    amount_max INTEGER,
+    deadline TEXT,
+    rolling INTEGER NOT NULL DEFAULT 0,
+    eligibility TEXT NOT NULL DEFAULT '[]',
+    eligibility_text TEXT NOT NULL DEFAULT '',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    times_seen INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_opp_funder_title ON opportunities(funder, title_key);
+CREATE INDEX IF NOT EXISTS idx_opp_deadline ON opportunities(deadline);
+CREATE INDEX IF NOT EXISTS idx_opp_amount ON opportunities(amount_min, amount_max);
+CREATE INDEX IF NOT EXISTS idx_opp_last_seen ON opportunities(last_seen);
+CREATE TABLE IF NOT EXISTS opportunity_tags (
+    opportunity_id INTEGER NOT NULL REFERENCES opportunities(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, value, opportunity_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_opportunity ON opportunity_tags(opportunity_id);
+"""
+
+_TITLE_NOISE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def funder_of(url: str) -> str:
+    """Funder identity used for deduplication: the host without ``www.``."""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def title_key(title: str) -> str:
+    """Title normalized for matching the same program across URLs."""
+    return _TITLE_NOISE_RE.sub(" ", title.lower()).strip()
+
+
+def _tag(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+class OpportunityStore:
+    """SQLite-backed, deduplicated store of grant opportunities."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/opportunities.sqlite)
+        """
+        self.path = Path(path) if path else default_cache_dir() / "opportunities.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _find_existing(self, canonical_url: str, funder: str, key: str) -> Optional[sqlite3.Row]:
+        row: Optional[sqlite3.Row] = self._conn.execute(
+            "SELECT * FROM opportunities WHERE canonical_url = ?", (canonical_url,)
+        ).fetchone()
+        if row is None and key:
+            row = self._conn.execute(
+                "SELECT * FROM opportunities WHERE funder = ? AND title_key = ?", (funder, key)
+            ).fetchone()
+        return row
+
+    def upsert(
+        self, records: Iterable[GrantRecord], criteria: Optional[GrantSearchCriteria] = None
+    ) -> Dict[str, int]:
+        """
+        Add or refresh opportunities.
+
+        A record matching a stored opportunity by canonical URL, or by funder
+        and normalized title, updates it: newly extracted facts fill in or
+        replace old ones, and missing facts keep the stored values. The
+        extracted locations are added as ``scope`` tags, and the criteria
+        that found the opportunity (keywords, location, sector, organization
+        type) as search tags for later queries.
+
+        Args:
+            records: Extracted records (``url`` is the canonical URL)
+            criteria: Criteria of the run that found them
+
+        Returns:
+            Counts of inserted and updated opportunities
+        """
+        tags: List[Tuple[str, str]] = []
+        if criteria is not None:
+            tags.extend(
+                ("keyword", _tag(keyword)) for keyword in criteria.keywords if keyword.strip()
+            )
+            for kind in ("location", "sector", "organization_type"):
+                value = getattr(criteria, kind)
+                if value and value.strip():
+                    tags.append((kind, _tag(value)))
+
+        inserted = updated = 0
+        now = time.time()
+        with self._lock:
+            for record in records:
+                if not record.url:
+                    continue
+                funder = funder_of(record.url)
+                key = title_key(record.title)
+                existing = self._find_existing(record.url, funder, key)
+                if existing is None:
+                    cursor = self._conn.execute(
+                        "INSERT INTO opportunities (canonical_url, funder, title, title_key, amount_min, "
+                        "amount_max, deadline, rolling, eligibility, eligibility_text, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            record.url,
+                            funder,
+                            record.title,
+                            key,
+                            record.amount_min,
+                            record.amount_max,
+                            record.deadline,
+                            int(record.rolling),
+                            json.dumps(record.eligibility),
+                            record.eligibility_text,
+                            now,
+                            now,
+                        ),
+                    )
+                    opportunity_id = cursor.lastrowid
+                    inserted += 1
+                else:
+                    opportunity_id = existing["id"]
+                    eligibility = sorted(
+                        set(json.loads(existing["eligibility"])) | set(record.eligibility)
+                    )
+                    self._conn.execute(
+                        "UPDATE opportunities SET amount_min = ?, amount_max = ?, deadline = ?, rolling = ?, "
+                        "eligibility = ?, eligibility_text = ?, last_seen = ?, times_seen = times_seen + 1 "
+                        "WHERE id = ?",
+                        (
+                            (
+                                record.amount_min
+                                if record.amount_min is not None
+                                else existing["amount_min"]
+                            ),
+                            (
+                                record.amount_max
+                                if record.amount_max is not None
+                                else existing["amount_max"]
+                            ),
+                            record.deadline or existing["deadline"],
+                            int(record.rolling or existing["rolling"]),
+                            json.dumps(eligibility),
+                            record.eligibility_text or existing["eligibility_text"],
+                            now,
+                            opportunity_id,
+                        ),
+                    )
+                    updated += 1
+                scope = [("scope", location) for location in record.locations]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO opportunity_tags (opportunity_id, kind, value) VALUES (?, ?, ?)",
+                    [(opportunity_id, kind, value) for kind, value in tags + scope],
+                )
+            self._conn.commit()
+        return {"inserted": inserted, "updated": updated}
+
+    def find(
+        self,
+        criteria: GrantSearchCriteria,
+        today: Optional[date] = None,
+        include_expired: bool = False,
+        require_amount: bool = False,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query stored opportunities matching search criteria.
+
+        - Keywords: any keyword tag matches, or a keyword appears in the title
+        - Location: the extracted scope names a requested state or is
+          nationwide; opportunities with no extracted scope (and locations
+          that name no US state) match on the location searched for instead
+        - Sector: tag match (skipped when the criteria leave it empty)
+        - Deadline: not yet passed; with ``deadline_months``, due within that
+          window or rolling
+        - Amount: the stored range overlaps [amount_min, amount_max];
+          opportunities with an unknown amount pass unless ``require_amount``
+
+        Args:
+            criteria: Search criteria
+            today: Reference date (defaults to today)
+            include_expired: Also return opportunities whose deadline passed
+            require_amount: Drop opportunities with no extracted amount
+            limit: Maximum rows
+
+        Returns:
+            Opportunities ordered by soonest deadline, then most recently seen
+        """
+        today = today or date.today()
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        keywords = [_tag(k) for k in criteria.keywords if k.strip()]
+        if keywords:
+            title_terms = " OR ".join("o.title_key LIKE ?" for _ in keywords)
+            clauses.append(
+                "(EXISTS (SELECT 1 FROM opportunity_tags t WHERE t.opportunity_id = o.id "
+                f"AND t.kind = 'keyword' AND t.value IN ({', '.join('?' for _ in keywords)})) OR {title_terms})"
+            )
+            params.extend(keywords)
+            params.extend(f"%{title_key(k)}%" for k in keywords)
+
+        searched = (
+            "EXISTS (SELECT 1 FROM opportunity_tags t WHERE t.opportunity_id = o.id "
+            "AND t.kind = ? AND t.value = ?)"
+        )
+        if criteria.location and criteria.location.strip():
+            states = [state for state in find_locations(criteria.location) if state != NATIONWIDE]
+            if states:
+                scopes = [*states, NATIONWIDE]
+                clauses.append(
+                    "(EXISTS (SELECT 1 FROM opportunity_tags t WHERE t.opportunity_id = o.id "
+                    f"AND t.kind = 'scope' AND t.value IN ({', '.join('?' for _ in scopes)})) "
+                    "OR (NOT EXISTS (SELECT 1 FROM opportunity_tags t WHERE t.opportunity_id = o.id "
+                    f"AND t.kind = 'scope') AND {searched}))"
+                )
+                params.extend(scopes)
+            else:
+                # A city or region cannot be compared with extracted states
+                clauses.append(searched)
+            params.extend(["location", _tag(criteria.location)])
+        if criteria.sector and criteria.sector.strip():
+            clauses.append(searched)
+            params.extend(["sector", _tag(criteria.sector)])
+
+        if not include_expired:
+            clauses.append("(o.deadline IS NULL OR o.deadline >= ?)")
+            params.append(today.isoformat())
+        if criteria.deadline_months:
+            horizon = today + timedelta(days=30 * criteria.deadline_months)
+            clauses.append("(o.rolling = 1 OR (o.deadline IS NOT NULL AND o.deadline <= ?))")
+            params.append(horizon.isoformat())
+
+        if require_amount:
+            clauses.append("(o.amount_min IS NOT NULL OR o.amount_max IS NOT NULL)")
+        if criteria.amount_min:
+            clauses.append(
+                "(COALESCE(o.amount_max, o.amount_min) IS NULL OR COALESCE(o.amount_max, o.amount_min) >= ?)"
+            )
+            params.append(criteria.amount_min)
+        if criteria.amount_max:
+            clauses.append(
+                "(COALESCE(o.amount_min, o.amount_max) IS NULL OR COALESCE(o.amount_min, o.amount_max) <= ?)"
+            )
+            params.append(criteria.amount_max)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            f"SELECT o.* FROM opportunities o {where} "
+            "ORDER BY o.deadline IS NULL, o.deadline, o.last_seen DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, [*params, limit]).fetchall()
+            locations: Dict[int, List[str]] = {}
+            if rows:
+                ids = [row["id"] for row in rows]
+                for opportunity_id, value in self._conn.execute(
+                    "SELECT opportunity_id, value FROM opportunity_tags WHERE kind = 'scope' "
+                    f"AND opportunity_id IN ({', '.join('?' for _ in ids)}) ORDER BY value",
+                    ids,
+                ):
+                    locations.setdefault(opportunity_id, []).append(value)
+        return [self._row_to_dict(row, locations.get(row["id"], [])) for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row, locations: List[str]) -> Dict[str, Any]:
+        data = dict(row)
+        data["url"] = data.pop("canonical_url")
+        data["eligibility"] = json.loads(data["eligibility"])
+        data["rolling"] = bool(data["rolling"])
+        data["locations"] = locations
+        data.pop("title_key", None)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of stored opportunities and how many have each fact."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS total, COUNT(deadline) AS with_deadline, "
+                "COUNT(COALESCE(amount_min, amount_max)) AS with_amount, "
+                "COUNT(DISTINCT funder) AS funders FROM opportunities"
+            ).fetchone()
+        return {"path": str(self.path), **dict(row)}
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
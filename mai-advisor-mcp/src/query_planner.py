@@ -0,0 +1,288 @@
+"""
+Cost-based planning of the search fan-out.
+
+Instead of running a fixed two queries per engine, the planner picks which
+engine / query-variant pairs to execute from what each has yielded before:
+
+- History keeps, per engine and variant position (e.g. Google variant 1,
+  the RFP-focused query), an exponentially weighted average of the new
+  unique relevant URLs it contributed per call and of its latency.
+- Candidates are ranked by expected marginal yield per unit of cost. Each
+  further query from an engine already in the plan is discounted, since it
+  mostly re-finds the same pages. Variants without history get an
+  optimistic prior so they are tried.
+- Candidates are added best-first while the cost budget (search credits:
+  one per web call, local index calls are free) and the estimated search
+  wall time (waves of ``max_concurrency`` parallel calls) allow.
+
+research_grants executes the plan in waves and stops early once a wave's
+yield flattens out.
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from caching import default_cache_dir
+from context_builder import tokenize
+from result_dedup import canonicalize_url
+from search_operators import SearchEngine
+
+# Search credits per call; engines not listed cost 1.0
+DEFAULT_CALL_COSTS = {SearchEngine.LOCAL.value: 0.0}
+
+
+@dataclass
+class SearchBudget:
+    """Limits for one research run's search fan-out."""
+
+    max_cost: float = 6.0  # search credits (one per web call)
+    max_latency: Optional[float] = None  # estimated seconds of search wall time
+    min_yield: float = 0.5  # stop when a wave finds fewer new relevant URLs per call
+    flatten_ratio: float = 0.25  # ... or less than this share of the first wave's yield
+
+
+@dataclass
+class QueryStats:
+    """Smoothed history of one engine / query variant."""
+
+    calls: int = 0
+    mean_yield: float = 0.0  # new unique relevant URLs per call
+    mean_latency: float = 0.0  # seconds per call
+
+
+@dataclass
+class PlannedQuery:
+    """One search chosen by the planner."""
+
+    engine: SearchEngine
+    variant: int  # position in the engine's generate_queries list
+    query: str
+    expected_yield: float
+    expected_latency: float
+    cost: float
+
+
+class QueryHistory:
+    """Per engine / variant yield and latency, persisted in SQLite."""
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.3):
+        """
+        Open (or create) the history.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/query_history.sqlite)
+            alpha: Weight of the newest observation in the moving averages
+        """
+        self.path = Path(path) if path else default_cache_dir() / "query_history.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_stats ("
+            "engine TEXT NOT NULL, variant INTEGER NOT NULL, calls INTEGER NOT NULL, "
+            "mean_yield REAL NOT NULL, mean_latency REAL NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (engine, variant))"
+        )
+        self._conn.commit()
+
+    def stats(self) -> Dict[Tuple[str, int], QueryStats]:
+        """All recorded stats keyed by (engine, variant)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT engine, variant, calls, mean_yield, mean_latency FROM query_stats"
+            ).fetchall()
+        return {
+            (engine, variant): QueryStats(calls, y, lat) for engine, variant, calls, y, lat in rows
+        }
+
+    def record(self, engine: str, variant: int, new_relevant: int, latency: float) -> None:
+        """
+        Fold one executed call into the averages.
+
+        Args:
+            engine: Engine name
+            variant: Query variant position
+            new_relevant: Relevant URLs this call added that the run had not seen
+            latency: Call latency in seconds
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT calls, mean_yield, mean_latency FROM query_stats WHERE engine = ? AND variant = ?",
+                (engine, variant),
+            ).fetchone()
+            if row is None:
+                calls, mean_yield, mean_latency = 1, float(new_relevant), latency
+            else:
+                calls = row[0] + 1
+                mean_yield = row[1] + self.alpha * (new_relevant - row[1])
+                mean_latency = row[2] + self.alpha * (latency - row[2])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_stats VALUES (?, ?, ?, ?, ?, ?)",
+                (engine, variant, calls, mean_yield, mean_latency, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class QueryPlanner:
+    """Choose which generated queries to run under a budget."""
+
+    def __init__(
+        self,
+        history: Optional[QueryHistory] = None,
+        call_costs: Optional[Dict[str, float]] = None,
+        prior_yield: float = 3.0,
+        prior_latency: float = 2.0,
+        engine_overlap: float = 0.7,
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            history: Yield history (a default on-disk history is created
+                when omitted)
+            call_costs: Search credits per call by engine name (defaults to
+                DEFAULT_CALL_COSTS; unlisted engines cost 1.0)
+            prior_yield: Expected yield of a variant with no history
+            prior_latency: Expected latency of a variant with no history
+            engine_overlap: Discount applied to each further query from an
+                engine already in the plan
+        """
+        self.history = history or QueryHistory()
+        self.call_costs = {**DEFAULT_CALL_COSTS, **(call_costs or {})}
+        self.prior_yield = prior_yield
+        self.prior_latency = prior_latency
+        self.engine_overlap = engine_overlap
+
+    def _estimate(self, stats: Optional[QueryStats]) -> Tuple[float, float]:
+        if stats is None or stats.calls == 0:
+            return self.prior_yield, self.prior_latency
+        # Blend toward the prior while there are only a few observations
+        weight = stats.calls / (stats.calls + 1)
+        return (
+            weight * stats.mean_yield + (1 - weight) * self.prior_yield,
+            weight * stats.mean_latency + (1 - weight) * self.prior_latency,
+        )
+
+    def plan(
+        self, candidates: Dict[SearchEngine, List[str]], budget: SearchBudget, concurrency: int = 4
+    ) -> List[PlannedQuery]:
+        """
+        Select queries best-first until the budget is spent.
+
+        Args:
+            candidates: Output of UnifiedSearchOperatorGenerator.generate_queries
+            budget: Cost and latency limits
+            concurrency: Searches run in parallel (for the latency estimate)
+
+        Returns:
+            Chosen queries in execution order (best first)
+        """
+        history = self.history.stats()
+        remaining = []
+        for engine, queries in candidates.items():
+            for variant, query in enumerate(queries):
+                expected_yield, expected_latency = self._estimate(
+                    history.get((engine.value, variant))
+                )
+                remaining.append(
+                    PlannedQuery(
+                        engine=engine,
+                        variant=variant,
+                        query=query,
+                        expected_yield=expected_yield,
+                        expected_latency=expected_latency,
+                        cost=self.call_costs.get(engine.value, 1.0),
+                    )
+                )
+
+        chosen: List[PlannedQuery] = []
+        per_engine: Dict[SearchEngine, int] = {}
+        spent = 0.0
+        while remaining:
+
+            def marginal(candidate: PlannedQuery) -> float:
+                return candidate.expected_yield * self.engine_overlap ** per_engine.get(
+                    candidate.engine, 0
+                )
+
+            best = max(
+                remaining, key=lambda candidate: marginal(candidate) / (candidate.cost + 0.25)
+            )
+            remaining.remove(best)
+            if spent + best.cost > budget.max_cost:
+                continue
+            if chosen and marginal(best) < budget.min_yield:
+                continue
+            if (
+                budget.max_latency is not None
+                and chosen
+                and estimate_wall_time(chosen + [best], concurrency) > budget.max_latency
+            ):
+                continue
+            best.expected_yield = round(marginal(best), 3)
+            chosen.append(best)
+            per_engine[best.engine] = per_engine.get(best.engine, 0) + 1
+            spent += best.cost
+        return chosen
+
+
+def estimate_wall_time(planned: List[PlannedQuery], concurrency: int) -> float:
+    """Estimated search wall time when ``planned`` runs in waves of ``concurrency``."""
+    concurrency = max(1, concurrency)
+    return sum(
+        max(q.expected_latency for q in planned[i : i + concurrency])
+        for i in range(0, len(planned), concurrency)
+    )
+
+
+def yield_flattened(wave_yield: float, first_yield: float, budget: SearchBudget) -> bool:
+    """
+    Whether a wave's yield says the remaining waves are not worth running.
+
+    Args:
+        wave_yield: New relevant URLs per call in the latest wave
+        first_yield: The same for the run's first wave
+        budget: Early-stopping thresholds
+
+    Returns:
+        True when the yield is under ``min_yield`` or under ``flatten_ratio``
+        of the first wave
+    """
+    return wave_yield < budget.min_yield or wave_yield < budget.flatten_ratio * first_yield
+
+
+def count_new_relevant(result_set: Dict[str, Any], terms: Set[str], seen_urls: Set[str]) -> int:
+    """
+    Count hits that are relevant and new to the run, marking them seen.
+
+    A hit is relevant when its title or snippet shares a term with the
+    criteria.
+
+    Args:
+        result_set: One engine/query result set
+        terms: Criteria terms (see context_builder.criteria_terms)
+        seen_urls: Canonical URLs already found in this run (updated)
+
+    Returns:
+        Number of new relevant hits
+    """
+    found = 0
+    for hit in result_set.get("results", {}).get("results", []):
+        url = canonicalize_url(hit.get("url", ""))
+        if not url or url in seen_urls:
+            continue
+        seen_urls.add(url)
+        if terms & set(tokenize(f"{hit.get('title') or ''} {hit.get('content') or ''}")):
+            found += 1
+    return found
@@ -0,0 +1,423 @@
+"""
+Shared resilience layer for external providers (Tavily search, OpenRouter LLMs).
+
+Each provider gets one process-wide ``ProviderGuard`` combining:
+
+1. A token-bucket rate limiter, so bursts of concurrent research runs are
+   smoothed out before they turn into 429s.
+2. Retries with exponential backoff and full jitter for transient failures
+   (429, 408, 5xx, timeouts, connection errors), honoring Retry-After.
+3. A circuit breaker that fails fast while a provider is down instead of
+   piling more requests onto it.
+
+Guards are shared by every GrantResearchAgent in the process via
+``get_provider_guard(name)``; ``resilience_stats()`` reports retry and
+circuit metrics for all of them.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+try:
+    import httpx
+
+    # ConnectError, ReadError, RemoteProtocolError, ... subclass neither
+    # ConnectionError nor anything named like one, so list them explicitly
+    _TRANSPORT_ERRORS: Tuple[Type[BaseException], ...] = (httpx.TransportError,)
+except ImportError:
+    _TRANSPORT_ERRORS = ()
+
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the provider's circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit is open; retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+_RETRYABLE_NAME_HINTS = ("timeout", "connection", "ratelimit", "temporarily", "unavailable")
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Best-effort HTTP status of an exception from requests, httpx or openai."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failure is transient and worth retrying.
+
+    Rate limits, timeouts, server errors and connection problems are retried;
+    client errors such as an invalid API key are not.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = _status_code(exc)
+    if status is not None:
+        return status in (408, 409, 425, 429) or status >= 500
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, *_TRANSPORT_ERRORS)):
+        return True
+    name = type(exc).__name__.lower()
+    return any(hint in name for hint in _RETRYABLE_NAME_HINTS)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if the error carries one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate_per_second: Sustained requests per second
+            capacity: Burst size
+        """
+        self.rate = rate_per_second
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a reserved token that was never used (e.g. the caller was cancelled)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class CircuitBreaker:
+    """
+    Closed → open after repeated failures → half-open probe after a cool-down.
+
+    While half-open exactly one call, the probe, reaches the provider; every
+    other caller is short-circuited until the probe's outcome closes or
+    reopens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive transient failures that open the circuit
+            reset_timeout: Seconds to stay open before allowing a probe call
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> Tuple[Optional[float], bool]:
+        """
+        Admit or reject a call.
+
+        Returns:
+            Tuple of (None if the call may proceed, else seconds to wait
+            before retrying; whether the admitted call is the half-open probe)
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = time.monotonic() - self._opened_at
+                if elapsed < self.reset_timeout:
+                    return self.reset_timeout - elapsed, False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    # A failed probe reopens the circuit for a full cool-down
+                    return self.reset_timeout, False
+                self._probing = True
+                return None, True
+            return None, False
+
+    def release_probe(self) -> None:
+        """Let another caller probe after the probe was cancelled or failed non-transiently."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = self.CLOSED
+
+    def record_failure(self) -> bool:
+        """Count a transient failure; return True if this opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                return opened
+            return False
+
+
+class ProviderGuard:
+    """Rate limiting, retry with backoff and circuit breaking for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float = 5.0,
+        burst: float = 10.0,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            name: Provider name used in errors and metrics
+            rate_per_second: Sustained request rate (0 disables rate limiting)
+            burst: Token-bucket capacity
+            max_attempts: Total attempts per call, including the first
+            base_delay: Initial backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+            failure_threshold: Consecutive transient failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "throttled": 0,
+            "throttle_wait_seconds": 0.0,
+            "circuit_opens": 0,
+            "short_circuited": 0,
+            "cancelled": 0,
+        }
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._metrics_lock:
+            self.metrics[key] += amount
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        """Full-jitter exponential backoff, or the provider's Retry-After if longer."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _admit(self) -> Tuple[float, bool]:
+        """Check the breaker and take a rate-limit token; return (wait, is the probe)."""
+        retry_in, probe = self.breaker.before_call()
+        if retry_in is not None:
+            self._count("short_circuited")
+            raise CircuitOpenError(self.name, retry_in)
+        wait = self.bucket.reserve()
+        if wait > 0:
+            self._count("throttled")
+            self._count("throttle_wait_seconds", wait)
+        return wait, probe
+
+    def _on_failure(
+        self, exc: BaseException, attempt: int, should_retry: bool, probe: bool = False
+    ) -> bool:
+        """Record a failed attempt; return True if the call should be retried."""
+        transient = is_retryable(exc)
+        if transient and self.breaker.record_failure():
+            self._count("circuit_opens")
+        elif not transient and probe:
+            self.breaker.release_probe()
+        if transient and should_retry and attempt < self.max_attempts:
+            self._count("retries")
+            return True
+        self._count("failures")
+        return False
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call under the guard.
+
+        Args:
+            fn: Callable performing one request
+            *args: Positional arguments for ``fn``
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Whatever ``fn`` returns
+        """
+        self._count("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            wait, probe = self._admit()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                if not self._on_failure(exc, attempt, True, probe):
+                    raise
+                time.sleep(self._backoff(attempt, exc))
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    async def acall(
+        self,
+        factory: Callable[[], Awaitable[T]],
+        should_retry: Optional[Callable[[BaseException], bool]] = None,
+    ) -> T:
+        """
+        Run an async call under the guard.
+
+        Args:
+            factory: Zero-argument callable returning a fresh awaitable per attempt
+            should_retry: Optional veto on retrying a given failure (e.g. once
+                streamed tokens have already been delivered)
+
+        Returns:
+            Result of the awaited call
+
+        Cancelling the calling task aborts the in-flight attempt (or the
+        rate-limit wait, refunding its token) without counting a failure.
+        """
+        self._count("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            wait, probe = self._admit()
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    # Give the slot back so live requests are not throttled by it
+                    self.bucket.refund()
+                    self._count("cancelled")
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+            try:
+                result = await factory()
+            except asyncio.CancelledError:
+                # Cancellation is neither a provider failure nor retryable
+                self._count("cancelled")
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            except Exception as exc:
+                allowed = should_retry(exc) if should_retry else True
+                if not self._on_failure(exc, attempt, allowed, probe):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, exc))
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, retry and circuit metrics for this provider."""
+        with self._metrics_lock:
+            metrics: Dict[str, Any] = dict(self.metrics)
+        metrics["throttle_wait_seconds"] = round(metrics["throttle_wait_seconds"], 3)
+        metrics["circuit_state"] = self.breaker.state
+        return metrics
+
+
+# Default limits per provider; override with configure_provider()
+DEFAULT_PROVIDER_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "tavily": {"rate_per_second": 5.0, "burst": 10.0},
+    "openrouter": {"rate_per_second": 2.0, "burst": 6.0},
+}
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_provider_guard(name: str) -> ProviderGuard:
+    """Return the process-wide guard for a provider, creating it on first use."""
+    with _guards_lock:
+        guard = _guards.get(name)
+        if guard is None:
+            guard = ProviderGuard(name, **DEFAULT_PROVIDER_SETTINGS.get(name, {}))
+            _guards[name] = guard
+        return guard
+
+
+def configure_provider(name: str, **settings: Any) -> ProviderGuard:
+    """
+    Replace a provider's guard with one using the given settings.
+
+    Args:
+        name: Provider name ("tavily", "openrouter", ...)
+        **settings: ProviderGuard keyword arguments
+
+    Returns:
+        The new guard
+    """
+    merged = {**DEFAULT_PROVIDER_SETTINGS.get(name, {}), **settings}
+    guard = ProviderGuard(name, **merged)
+    with _guards_lock:
+        _guards[name] = guard
+    return guard
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every provider guard created so far."""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.name: guard.stats() for guard in guards}
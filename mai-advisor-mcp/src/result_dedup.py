@@ -0,0 +1,262 @@
+"""
+Cross-engine deduplication of search results.
+
+Google-, Bing- and DuckDuckGo-flavored queries often surface the same grant
+page under different URLs (tracking parameters, http vs https, www. hosts) or
+as mirrored copies of the same PDF. This module collapses those duplicates
+before anything is handed to the LLM:
+
+1. URLs are canonicalized, so trivially different links compare equal.
+2. Page text is fingerprinted with a 64-bit SimHash; hits whose fingerprints
+   differ by only a few bits are treated as the same document.
+
+The first occurrence of a document survives and records every engine, query
+and URL it was seen under.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref",
+    "ref_src",
+    "referrer",
+    "cmpid",
+    "trk",
+    "trkcampaign",
+    "sr_share",
+    "spm",
+    "hsctatracking",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "_hs")
+
+SIMHASH_BITS = 64
+# Minimum tokens before a SimHash is trusted; short snippets collide too easily
+MIN_FINGERPRINT_TOKENS = 20
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that links to the same page compare equal.
+
+    Lowercases scheme and host, treats http as https, drops ``www.``, default
+    ports, fragments, tracking parameters and trailing slashes, and sorts the
+    remaining query parameters.
+
+    Args:
+        url: URL as returned by the search API
+
+    Returns:
+        Canonical URL string (the input unchanged if it cannot be parsed)
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> Optional[int]:
+    """
+    Compute a SimHash fingerprint over word 3-shingles.
+
+    Args:
+        text: Document text
+        bits: Fingerprint width
+
+    Returns:
+        Fingerprint, or None if the text is too short to fingerprint reliably
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < MIN_FINGERPRINT_TOKENS:
+        return None
+
+    weights = [0] * bits
+    shingles = (" ".join(words[i : i + 3]) for i in range(len(words) - 2))
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    SimHash lookup table using band partitioning.
+
+    The fingerprint is split into ``max_distance + 1`` bands; by the pigeonhole
+    principle two fingerprints within ``max_distance`` bits share at least one
+    identical band, so only candidates from matching bands are compared.
+    """
+
+    def __init__(self, max_distance: int = 3, bits: int = SIMHASH_BITS):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_distance: Largest Hamming distance treated as a duplicate
+            bits: Fingerprint width
+        """
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_width = bits // self.bands
+        self._tables: List[Dict[int, List[Tuple[int, Any]]]] = [{} for _ in range(self.bands)]
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_width) - 1
+        return [(fingerprint >> (i * self.band_width)) & mask for i in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[Any]:
+        """Return the payload of a stored near-duplicate, if any."""
+        for table, band in zip(self._tables, self._band_values(fingerprint)):
+            for candidate, payload in table.get(band, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return payload
+        return None
+
+    def add(self, fingerprint: int, payload: Any) -> None:
+        """Store a fingerprint with an associated payload."""
+        for table, band in zip(self._tables, self._band_values(fingerprint)):
+            table.setdefault(band, []).append((fingerprint, payload))
+
+
+def _merge_attribution(
+    survivor: Dict[str, Any], engine: str, query: str, url: str, rank: int
+) -> None:
+    """Record another engine/query/URL (and rank) under which a surviving hit was seen."""
+    survivor["provenance"].append({"engine": engine, "query": query, "rank": rank})
+    if engine not in survivor["engines"]:
+        survivor["engines"].append(engine)
+    if query not in survivor["queries"]:
+        survivor["queries"].append(query)
+    if url and url != survivor.get("url") and url not in survivor["duplicate_urls"]:
+        survivor["duplicate_urls"].append(url)
+
+
+def deduplicate_results(
+    search_results: List[Dict[str, Any]], max_distance: int = 3
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Remove duplicate hits across engine/query result sets.
+
+    Result sets keep their shape (``engine``, ``query``, ``results.results``)
+    so downstream stages are unchanged. Each surviving hit is a copy that gains
+    ``canonical_url``, ``engines``, ``queries`` and ``duplicate_urls`` fields,
+    plus ``provenance``: the engine, query and 1-based rank of every list the
+    hit (or a duplicate of it) appeared in.
+
+    Args:
+        search_results: Result sets as produced by research_grants
+        max_distance: SimHash Hamming distance treated as near-identical content
+
+    Returns:
+        Tuple of (deduplicated result sets, stats dict)
+    """
+    by_url: Dict[str, Dict[str, Any]] = {}
+    near_index = NearDuplicateIndex(max_distance=max_distance)
+    stats = {"input": 0, "kept": 0, "url_duplicates": 0, "content_duplicates": 0}
+
+    deduped_sets = []
+    for result_set in search_results:
+        engine = result_set.get("engine", "unknown")
+        query = result_set.get("query", "")
+        payload = result_set.get("results") or {}
+        kept = []
+
+        for rank, hit in enumerate(payload.get("results", []), 1):
+            stats["input"] += 1
+            url = hit.get("url", "")
+            canonical = canonicalize_url(url)
+
+            survivor = by_url.get(canonical) if canonical else None
+            if survivor is not None:
+                _merge_attribution(survivor, engine, query, url, rank)
+                stats["url_duplicates"] += 1
+                continue
+
+            text = hit.get("raw_content") or hit.get("content") or ""
+            fingerprint = simhash(text)
+            if fingerprint is not None:
+                survivor = near_index.find(fingerprint)
+                if survivor is not None:
+                    _merge_attribution(survivor, engine, query, url, rank)
+                    if canonical:
+                        by_url[canonical] = survivor
+                    stats["content_duplicates"] += 1
+                    continue
+
+            record = dict(hit)
+            record["canonical_url"] = canonical
+            record["engines"] = [engine]
+            record["queries"] = [query]
+            record["duplicate_urls"] = []
+            record["provenance"] = [{"engine": engine, "query": query, "rank": rank}]
+            if canonical:
+                by_url[canonical] = record
+            if fingerprint is not None:
+                near_index.add(fingerprint, record)
+            kept.append(record)
+
+        stats["kept"] += len(kept)
+        deduped_sets.append(
+            {
+                **result_set,
+                "results": {**payload, "results": kept},
+            }
+        )
+
+    return deduped_sets, stats
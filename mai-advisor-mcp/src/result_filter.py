@@ -0,0 +1,229 @@
+"""
+Vectorized filtering of search results against GrantSearchCriteria.
+
+The amount range, deadline window, location and organization type in the
+criteria only shape the query text; engines still return grants that are
+too small, already closed or limited to another state. This module applies
+those criteria to the facts extracted locally (see grant_extraction):
+
+1. Records are loaded into columnar NumPy arrays (amount bounds, deadline
+   day numbers, flags, and boolean state / eligibility matrices).
+2. Every criterion becomes one boolean mask over all records at once.
+3. Survivors are ordered by relevance score, then soonest deadline, with a
+   single lexsort.
+
+Facts that could not be extracted pass by default, so a page is only
+dropped when what it states contradicts the criteria. ``strict=True`` also
+drops pages whose amount or deadline is unknown when that criterion is set.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from search_operators import GrantSearchCriteria
+from context_builder import ContextSnippet
+from grant_extraction import (
+    ELIGIBILITY_LABELS,
+    NATIONWIDE,
+    US_STATES,
+    GrantRecord,
+    find_locations,
+    org_type_labels,
+)
+
+_STATE_INDEX = {state: i for i, state in enumerate(US_STATES)}
+_LABEL_INDEX = {label: i for i, label in enumerate(ELIGIBILITY_LABELS)}
+
+
+@dataclass
+class FilterStats:
+    """Outcome of one filtering pass."""
+
+    total: int = 0
+    kept: int = 0
+    dropped: Dict[str, int] = field(default_factory=dict)  # criterion -> records it rejected
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-serializable form."""
+        return {"total": self.total, "kept": self.kept, "dropped": dict(self.dropped)}
+
+
+class RecordColumns:
+    """Columnar view of extracted records."""
+
+    def __init__(self, records: Sequence[GrantRecord]):
+        """
+        Load records into NumPy arrays.
+
+        Unknown amounts and deadlines are NaN.
+
+        Args:
+            records: Extracted records, in any order
+        """
+        n = len(records)
+        self.size = n
+        self.amount_low = np.full(n, np.nan)
+        self.amount_high = np.full(n, np.nan)
+        self.deadline = np.full(n, np.nan)  # proleptic Gregorian ordinal
+        self.rolling = np.zeros(n, dtype=bool)
+        self.expired = np.zeros(n, dtype=bool)
+        self.nationwide = np.zeros(n, dtype=bool)
+        self.states = np.zeros((n, len(US_STATES)), dtype=bool)
+        self.eligibility = np.zeros((n, len(_LABEL_INDEX)), dtype=bool)
+
+        for i, record in enumerate(records):
+            low = record.amount_min or record.amount_max
+            high = record.amount_max or record.amount_min
+            if low:
+                self.amount_low[i] = low
+                self.amount_high[i] = high
+            if record.deadline:
+                self.deadline[i] = date.fromisoformat(record.deadline).toordinal()
+            self.rolling[i] = record.rolling
+            self.expired[i] = record.expired
+            for location in record.locations:
+                if location == NATIONWIDE:
+                    self.nationwide[i] = True
+                elif location in _STATE_INDEX:
+                    self.states[i, _STATE_INDEX[location]] = True
+            for label in record.eligibility:
+                if label in _LABEL_INDEX:
+                    self.eligibility[i, _LABEL_INDEX[label]] = True
+
+
+def criteria_masks(
+    columns: RecordColumns,
+    criteria: GrantSearchCriteria,
+    today: Optional[date] = None,
+    strict: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every criterion as a boolean mask over all records.
+
+    Args:
+        columns: Records in columnar form
+        criteria: Search criteria
+        today: Reference date (defaults to today)
+        strict: Unknown amount / deadline fails instead of passing
+
+    Returns:
+        Criterion name -> mask of records that satisfy it
+    """
+    today = today or date.today()
+    masks: Dict[str, np.ndarray] = {}
+    unknown_ok = not strict
+
+    # NaN compares False, so unknown values are handled explicitly
+    known_amount = ~np.isnan(columns.amount_low)
+    if criteria.amount_min:
+        masks["amount_min"] = (columns.amount_high >= criteria.amount_min) | (
+            ~known_amount & unknown_ok
+        )
+    if criteria.amount_max:
+        masks["amount_max"] = (columns.amount_low <= criteria.amount_max) | (
+            ~known_amount & unknown_ok
+        )
+
+    masks["open"] = ~columns.expired
+    if criteria.deadline_months:
+        horizon = (today + timedelta(days=30 * criteria.deadline_months)).toordinal()
+        known_deadline = ~np.isnan(columns.deadline)
+        masks["deadline_months"] = (
+            (columns.deadline <= horizon) | columns.rolling | (~known_deadline & unknown_ok)
+        )
+
+    if criteria.location:
+        wanted = [_STATE_INDEX[s] for s in find_locations(criteria.location) if s in _STATE_INDEX]
+        # Without a recognizable state (a city or region) the scope cannot be compared
+        if wanted:
+            scoped = columns.states.any(axis=1)
+            masks["location"] = columns.states[:, wanted].any(axis=1) | columns.nationwide | ~scoped
+
+    if criteria.organization_type:
+        wanted = [_LABEL_INDEX[label] for label in org_type_labels(criteria.organization_type)]
+        if wanted:
+            stated = columns.eligibility.any(axis=1)
+            masks["organization_type"] = np.logical_or(
+                columns.eligibility[:, wanted].any(axis=1), ~stated
+            )
+    return masks
+
+
+def filter_records(
+    records: Sequence[GrantRecord],
+    criteria: GrantSearchCriteria,
+    scores: Optional[Sequence[float]] = None,
+    today: Optional[date] = None,
+    strict: bool = False,
+) -> Tuple[np.ndarray, FilterStats]:
+    """
+    Filter and order records in one vectorized pass.
+
+    Args:
+        records: Extracted records
+        criteria: Search criteria
+        scores: Relevance score per record (higher first); defaults to fit
+        today: Reference date (defaults to today)
+        strict: Unknown amount / deadline fails instead of passing
+
+    Returns:
+        Tuple of (indices of kept records, best first; stats)
+    """
+    columns = RecordColumns(records)
+    stats = FilterStats(total=columns.size)
+    keep = np.ones(columns.size, dtype=bool)
+    for name, mask in criteria_masks(columns, criteria, today, strict).items():
+        rejected = int(np.count_nonzero(keep & ~mask))
+        if rejected:
+            stats.dropped[name] = rejected
+        keep &= mask
+
+    score = np.asarray(scores if scores is not None else [r.fit for r in records], dtype=float)
+    # lexsort sorts by the last key first: score descending, then deadline (unknown last)
+    deadline = np.where(np.isnan(columns.deadline), np.inf, columns.deadline)
+    order = np.lexsort((deadline, -score))
+    kept = order[keep[order]]
+    stats.kept = int(kept.size)
+    return kept, stats
+
+
+def filter_snippets(
+    ranked: List[ContextSnippet],
+    records: Dict[str, GrantRecord],
+    criteria: GrantSearchCriteria,
+    today: Optional[date] = None,
+    strict: bool = False,
+) -> Tuple[List[ContextSnippet], FilterStats]:
+    """
+    Drop ranked snippets whose extracted facts contradict the criteria.
+
+    Snippets without a record are kept (nothing is known against them);
+    kept snippets stay in score order, ties broken by soonest deadline.
+
+    Args:
+        ranked: Snippets from rank_snippets / apply_records
+        records: Records from extract_records, keyed by URL
+        criteria: Search criteria
+        today: Reference date (defaults to today)
+        strict: Unknown amount / deadline fails instead of passing
+
+    Returns:
+        Tuple of (kept snippets, stats)
+    """
+    with_record = [s for s in ranked if s.url in records]
+    without_record = [s for s in ranked if s.url not in records]
+    kept, stats = filter_records(
+        [records[s.url] for s in with_record],
+        criteria,
+        scores=[s.score for s in with_record],
+        today=today,
+        strict=strict,
+    )
+    survivors = [with_record[i] for i in kept] + without_record
+    stats.total += len(without_record)
+    stats.kept += len(without_record)
+    survivors.sort(key=lambda s: s.score, reverse=True)  # stable: deadline order kept on ties
+    return survivors, stats
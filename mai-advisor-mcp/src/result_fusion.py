@@ -0,0 +1,140 @@
+"""
+Reciprocal-rank fusion of multi-engine result lists.
+
+Every engine/query pair returns its own ranked list. Concatenating them
+throws that order away, so a page every engine puts first looks no better
+than one a single query returned last. Reciprocal-rank fusion (RRF) merges
+the lists into one ranking: each appearance at 1-based rank ``r`` in a list
+adds ``weight / (k + r)`` to a page's score. Pages ranked highly by several
+engines rise to the top, and ``k`` (60 by convention) damps the influence
+of any single list's head.
+
+The local BM25 relevance ranking of snippets against the criteria is fused
+in as one more list, so the final order reflects both engine consensus and
+fit to the search.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from context_builder import ContextSnippet
+from result_dedup import canonicalize_url
+
+DEFAULT_RRF_K = 60
+
+
+def _hit_key(hit: Dict[str, Any]) -> str:
+    url = hit.get("url", "")
+    return hit.get("canonical_url") or canonicalize_url(url) or url
+
+
+def fuse_results(
+    search_results: List[Dict[str, Any]],
+    engine_weights: Optional[Dict[str, float]] = None,
+    k: int = DEFAULT_RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Fuse engine/query result sets into one ranked list.
+
+    Hits carrying ``provenance`` (set by deduplicate_results) contribute
+    every list they were seen in, including duplicates that were removed;
+    other hits contribute their position in their own result set. The same
+    page in several sets is merged by canonical URL.
+
+    Args:
+        search_results: Result sets as produced by research_grants
+        engine_weights: Weight per engine name (default 1.0 each)
+        k: RRF rank damping constant
+
+    Returns:
+        Hit copies, best first, each with ``rrf_score``, ``fused_rank`` and
+        ``provenance`` (list of {engine, query, rank})
+    """
+    engine_weights = engine_weights or {}
+    fused: Dict[str, Dict[str, Any]] = {}
+    for result_set in search_results:
+        engine = result_set.get("engine", "unknown")
+        query = result_set.get("query", "")
+        for rank, hit in enumerate(result_set.get("results", {}).get("results", []), 1):
+            key = _hit_key(hit)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {
+                    **hit,
+                    "canonical_url": key,
+                    "provenance": [],
+                    "rrf_score": 0.0,
+                }
+            for source in hit.get("provenance") or [
+                {"engine": engine, "query": query, "rank": rank}
+            ]:
+                entry["provenance"].append(source)
+                entry["rrf_score"] += engine_weights.get(source["engine"], 1.0) / (
+                    k + source["rank"]
+                )
+
+    ranked = sorted(fused.values(), key=lambda hit: hit["rrf_score"], reverse=True)
+    for position, hit in enumerate(ranked, 1):
+        hit["rrf_score"] = round(hit["rrf_score"], 6)
+        hit["fused_rank"] = position
+    return ranked
+
+
+def fuse_snippets(
+    ranked: List[ContextSnippet],
+    fused: List[Dict[str, Any]],
+    relevance_weight: float = 1.0,
+    k: int = DEFAULT_RRF_K,
+) -> List[ContextSnippet]:
+    """
+    Re-score BM25-ranked snippets with the engines' fused ranking.
+
+    A snippet's score becomes its engine RRF score plus
+    ``relevance_weight / (k + BM25 rank)``.
+
+    Args:
+        ranked: Snippets from rank_snippets, best first
+        fused: Hits from fuse_results
+        relevance_weight: Weight of the BM25 relevance list
+        k: RRF rank damping constant
+
+    Returns:
+        The same snippets with fused scores, best first
+    """
+    engine_scores: Dict[str, float] = {}
+    for hit in fused:
+        engine_scores[hit["canonical_url"]] = hit["rrf_score"]
+        engine_scores.setdefault(hit.get("url", ""), hit["rrf_score"])
+    for position, snippet in enumerate(ranked, 1):
+        engine_score = engine_scores.get(snippet.url)
+        if engine_score is None:
+            engine_score = engine_scores.get(canonicalize_url(snippet.url), 0.0)
+        snippet.score = engine_score + relevance_weight / (k + position)
+    return sorted(ranked, key=lambda s: s.score, reverse=True)
+
+
+def ranking_summary(
+    ranked: List[ContextSnippet], fused: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Final ranking with per-item provenance, for result payloads.
+
+    Args:
+        ranked: Snippets in final order
+        fused: Hits from fuse_results
+
+    Returns:
+        One entry per snippet: rank, title, url, score and the engine/query
+        lists (with ranks) it came from
+    """
+    provenance = {hit["canonical_url"]: hit["provenance"] for hit in fused}
+    return [
+        {
+            "rank": position,
+            "title": snippet.title,
+            "url": snippet.url,
+            "score": round(snippet.score, 6),
+            "provenance": provenance.get(snippet.url)
+            or provenance.get(canonicalize_url(snippet.url), []),
+        }
+        for position, snippet in enumerate(ranked, 1)
+    ]
@@ -0,0 +1,264 @@
+"""
+Per-run JSONL spill of raw search payloads.
+
+A deep run used to return ``raw_results`` holding every full Tavily payload,
+page content included, and the JSON report serialized it all in one
+``json.dumps``; with several concurrent runs that dominated memory. Instead:
+
+1. Each search result set is appended to the run's own
+   ``<spill dir>/<run_id>-<suffix>.jsonl`` as it arrives, and every page
+   fetched later for the top hits is appended as its own record.
+2. Once the pipeline has ranked and extracted what it needs, the run keeps
+   only lightweight references (engine, query, hit count, byte offset).
+3. ``load`` / ``iter_results`` read one result set at a time back from disk,
+   with fetched page content merged into its hits, and
+   ``write_json_report`` streams a report with the full payloads without
+   ever holding more than one of them.
+
+Spill files older than ``max_age`` are pruned when an agent starts.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from caching import default_cache_dir
+from result_dedup import canonicalize_url
+
+# Result keys whose values are lists of spill references
+SPILLED_KEYS = ("search_results", "raw_results")
+
+# Run IDs used verbatim in spill file names; anything else is hashed
+_SAFE_RUN_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def default_spill_dir() -> Path:
+    """Directory for per-run spill files (<cache dir>/runs)."""
+    return default_cache_dir() / "runs"
+
+
+def prune_spills(directory: Optional[str] = None, max_age: float = 86400.0) -> int:
+    """
+    Delete spill files not modified for ``max_age`` seconds.
+
+    Args:
+        directory: Spill directory (defaults to default_spill_dir())
+        max_age: Age in seconds after which a spill file is removed
+
+    Returns:
+        Number of files removed
+    """
+    spill_dir = Path(directory) if directory else default_spill_dir()
+    if not spill_dir.is_dir():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in spill_dir.glob("*.jsonl"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue  # another process removed or is rewriting it
+    return removed
+
+
+class ResultSpill:
+    """Append-only JSONL file of one run's search payloads."""
+
+    def __init__(self, path: str, truncate: bool = True):
+        """
+        Open a spill file.
+
+        Args:
+            path: JSONL file path
+            truncate: Start empty (a new or resumed run re-spills every
+                result set); False reopens an existing spill for reading
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.refs: List[Dict[str, Any]] = []  # search result set references, arrival order
+        self._content: Dict[str, Tuple[int, int]] = {}  # page URL -> (offset, length)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w+b" if truncate else "a+b")
+        if not truncate:
+            self._scan()
+
+    @classmethod
+    def for_run(cls, run_id: str, directory: Optional[str] = None) -> "ResultSpill":
+        """
+        New spill file for a run in ``directory`` (defaults to default_spill_dir()).
+
+        The file is named ``<run_id>-<random suffix>.jsonl``, so concurrent
+        runs sharing a run ID never truncate each other's spill. A run ID
+        that is not a plain ``[A-Za-z0-9_-]`` name is replaced by its hash
+        and can never point outside the spill directory.
+
+        Args:
+            run_id: Caller-supplied run identifier
+            directory: Spill directory
+        """
+        spill_dir = Path(directory) if directory else default_spill_dir()
+        if not _SAFE_RUN_ID_RE.fullmatch(run_id):
+            run_id = hashlib.sha256(run_id.encode("utf-8")).hexdigest()[:16]
+        return cls(str(spill_dir / f"{run_id}-{uuid.uuid4().hex[:8]}.jsonl"))
+
+    def _append(self, record: Dict[str, Any]) -> Tuple[int, int]:
+        line = json.dumps(record, default=str).encode("utf-8") + b"\n"
+        with self._lock:
+            self._file.seek(0, 2)
+            offset = self._file.tell()
+            self._file.write(line)
+        return offset, len(line)
+
+    def _scan(self) -> None:
+        """Rebuild references and the content index from an existing file."""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            record = json.loads(line)
+            self._index(record, offset, len(line))
+            offset += len(line)
+
+    def _index(self, record: Dict[str, Any], offset: int, length: int) -> Dict[str, Any]:
+        if record.get("kind") == "content":
+            for url in (record["url"], record.get("canonical_url")):
+                if url:
+                    self._content[url] = (offset, length)
+            return {}
+        ref = {
+            "engine": record.get("engine"),
+            "query": record.get("query"),
+            "hits": len(record.get("results", {}).get("results", [])),
+            "spill": {"offset": offset, "length": length},
+        }
+        self.refs.append(ref)
+        return ref
+
+    def append_search(self, result_set: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Spill one engine/query result set.
+
+        Args:
+            result_set: {"engine", "query", "results"} as returned by a search
+
+        Returns:
+            Lightweight reference (engine, query, hit count, file position)
+        """
+        record = {"kind": "search", **result_set}
+        offset, length = self._append(record)
+        with self._lock:
+            return self._index(record, offset, length)
+
+    def append_content(self, url: str, content: str, canonical_url: Optional[str] = None) -> None:
+        """
+        Spill the full content of a page fetched after the search.
+
+        Args:
+            url: URL the page was fetched from
+            content: Raw page content
+            canonical_url: Canonical form of the hit's URL, if different
+        """
+        record = {
+            "kind": "content",
+            "url": url,
+            "canonical_url": canonical_url,
+            "raw_content": content,
+        }
+        offset, length = self._append(record)
+        with self._lock:
+            self._index(record, offset, length)
+
+    def _read(self, offset: int, length: int) -> Dict[str, Any]:
+        with self._lock:
+            self._file.flush()
+            self._file.seek(offset)
+            record: Dict[str, Any] = json.loads(self._file.read(length))
+        return record
+
+    def load(self, ref: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Read a result set back, with fetched page content merged into its hits.
+
+        Args:
+            ref: Reference from append_search
+
+        Returns:
+            The result set
+        """
+        record = self._read(ref["spill"]["offset"], ref["spill"]["length"])
+        record.pop("kind", None)
+        for hit in record.get("results", {}).get("results", []):
+            if hit.get("raw_content"):
+                continue
+            url = hit.get("url", "")
+            position = self._content.get(url) or self._content.get(canonicalize_url(url))
+            if position is not None:
+                hit["raw_content"] = self._read(*position)["raw_content"]
+        return record
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Every spilled result set in arrival order, one at a time."""
+        for ref in list(self.refs):
+            yield self.load(ref)
+
+    def close(self) -> None:
+        """Flush and close the file (references stay valid for ``open``)."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    @classmethod
+    def open(cls, path: str) -> "ResultSpill":
+        """Reopen a finished run's spill file for reading."""
+        return cls(path, truncate=False)
+
+
+def write_json_report(
+    research_results: Dict[str, Any], fp: IO[str], indent: Optional[int] = 2
+) -> None:
+    """
+    Stream research results as JSON.
+
+    Lists of spill references (``search_results`` / ``raw_results``) are
+    written as the full result sets, loaded from the run's spill file one at
+    a time; everything else is encoded incrementally.
+
+    Args:
+        research_results: Results from research_grants()
+        fp: Text stream to write to
+        indent: Indentation (None for compact output)
+    """
+    encoder = json.JSONEncoder(indent=indent, default=str)
+    newline = "\n" if indent is not None else ""
+    pad = " " * (indent or 0)
+    spill_path = research_results.get("spill_path")
+    spill = ResultSpill.open(spill_path) if spill_path and Path(spill_path).exists() else None
+    try:
+        fp.write("{" + newline)
+        for position, (key, value) in enumerate(research_results.items()):
+            if position:
+                fp.write("," + newline)
+            fp.write(f"{pad}{json.dumps(key)}: ")
+            if spill is not None and key in SPILLED_KEYS and isinstance(value, list):
+                fp.write("[" + newline)
+                for index, ref in enumerate(value):
+                    if index:
+                        fp.write("," + newline)
+                    fp.write(pad * 2)
+                    item = spill.load(ref) if isinstance(ref, dict) and "spill" in ref else ref
+                    for chunk in encoder.iterencode(item):
+                        fp.write(chunk)
+                fp.write(newline + pad + "]")
+            else:
+                for chunk in encoder.iterencode(value):
+                    fp.write(chunk)
+        fp.write(newline + "}" + newline)
+    finally:
+        if spill is not None:
+            spill.close()
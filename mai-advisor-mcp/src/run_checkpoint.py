@@ -0,0 +1,156 @@
+"""
+Checkpoints for resumable research runs.
+
+A research run given a ``run_id`` saves each completed stage as it finishes.
+That covers every search result set, every fetched page and every LLM
+response in the analysis. If the run fails (for example the LLM provider
+times out after all searches succeeded), calling research_grants again with
+the same ``run_id`` replays the finished work from the checkpoint store and
+only repeats the stage that failed.
+
+Checkpoints live in a SQLite file next to the other caches and expire after
+a few days.
+"""
+
+import asyncio
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Optional
+
+from caching import SQLiteTTLCache
+
+
+class RunCheckpointStore(SQLiteTTLCache):
+    """Completed stage outputs of research runs, keyed by run ID and stage."""
+
+    def __init__(
+        self, path: Optional[str] = None, ttl_seconds: float = 3 * 86400, max_entries: int = 20000
+    ):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            path: SQLite file path (defaults to <cache dir>/run_checkpoints.sqlite)
+            ttl_seconds: How long a checkpoint can be resumed (default 3 days)
+            max_entries: Maximum stored stage outputs before LRU eviction
+        """
+        super().__init__(
+            path=path,
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            filename="run_checkpoints.sqlite",
+        )
+
+    @staticmethod
+    def stage_key(run_id: str, stage: str, *parts: Any) -> str:
+        """Build the key for one stage output of a run."""
+        return SQLiteTTLCache.make_key("run", run_id, stage, *parts)
+
+
+class RunCheckpointMismatchError(ValueError):
+    """Raised when a run ID is resumed with different parameters."""
+
+
+class RunCheckpoint:
+    """
+    Checkpoint handle for a single research run.
+
+    Without a store or run ID every lookup misses and nothing is saved, so
+    callers can use the handle unconditionally.
+    """
+
+    def __init__(self, store: Optional[RunCheckpointStore], run_id: Optional[str]):
+        """
+        Bind a store to a run.
+
+        Args:
+            store: Checkpoint store (None disables checkpointing)
+            run_id: Run identifier (None disables checkpointing)
+        """
+        self.store = store if run_id else None
+        self.run_id = run_id
+        self.resumed = 0
+        self.saved = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether this run is being checkpointed."""
+        return self.store is not None
+
+    def get(self, stage: str, *parts: Any) -> Optional[Any]:
+        """
+        Return a saved stage output, or None if the stage has not completed.
+
+        Args:
+            stage: Stage name ("search", "fetch", "llm", ...)
+            *parts: JSON-serializable parts identifying the stage item
+        """
+        if self.store is None or self.run_id is None:
+            return None
+        value = self.store.get(self.store.stage_key(self.run_id, stage, *parts))
+        if value is not None:
+            with self._lock:
+                self.resumed += 1
+        return value
+
+    def set(self, stage: str, value: Any, *parts: Any) -> None:
+        """
+        Save a completed stage output.
+
+        Args:
+            stage: Stage name
+            value: JSON-serializable output
+            *parts: JSON-serializable parts identifying the stage item
+        """
+        if self.store is None or self.run_id is None:
+            return
+        self.store.set(self.store.stage_key(self.run_id, stage, *parts), value)
+        with self._lock:
+            self.saved += 1
+
+    async def aget(self, stage: str, *parts: Any) -> Optional[Any]:
+        """Async variant of ``get`` (SQLite access runs in a worker thread)."""
+        if self.store is None:
+            return None
+        return await asyncio.to_thread(self.get, stage, *parts)
+
+    async def aset(self, stage: str, value: Any, *parts: Any) -> None:
+        """Async variant of ``set``."""
+        if self.store is not None:
+            await asyncio.to_thread(self.set, stage, value, *parts)
+
+    def bind(self, params: Dict[str, Any]) -> bool:
+        """
+        Record the run's parameters, or check them when resuming.
+
+        Args:
+            params: JSON-serializable run parameters (dataclasses are converted)
+
+        Returns:
+            True if this resumes an existing run
+
+        Raises:
+            RunCheckpointMismatchError: If the run ID was started with other parameters
+        """
+        if self.store is None or self.run_id is None:
+            return False
+        params = {
+            key: asdict(value) if is_dataclass(value) and not isinstance(value, type) else value
+            for key, value in params.items()
+        }
+        key = self.store.stage_key(self.run_id, "params")
+        saved = self.store.get(key)
+        if saved is None:
+            self.store.set(key, params)
+            return False
+        if saved != params:
+            raise RunCheckpointMismatchError(
+                f"Run {self.run_id!r} was started with different parameters; use a new run_id"
+            )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Run ID and counts of resumed and newly saved stage outputs."""
+        with self._lock:
+            return {"run_id": self.run_id, "resumed": self.resumed, "saved": self.saved}
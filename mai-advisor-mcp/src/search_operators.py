@@ -9,6 +9,7 @@ class SearchEngine(Enum):
     GOOGLE = "google"
     BING = "bing"
     DUCKDUCKGO = "duckduckgo"
+    LOCAL = "local"  # offline grant index built from bulk listing exports
 
 
 @dataclass
@@ -274,6 +275,60 @@ class DuckDuckGoOperatorGenerator:
         return query.strip()
 
 
+class LocalIndexQueryGenerator:
+    """Generate queries for the offline grant index (SearchEngine.LOCAL)."""
+
+    @staticmethod
+    def _phrase(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    @staticmethod
+    def _filters(criteria: GrantSearchCriteria) -> List[str]:
+        filters = []
+        if criteria.deadline_months:
+            filters.append(f"deadline_months:{criteria.deadline_months}")
+        if criteria.amount_min:
+            filters.append(f"amount_min:{criteria.amount_min}")
+        if criteria.amount_max:
+            filters.append(f"amount_max:{criteria.amount_max}")
+        return filters
+
+    @staticmethod
+    def _exclusions(criteria: GrantSearchCriteria) -> List[str]:
+        return [
+            f"NOT {LocalIndexQueryGenerator._phrase(term)}" for term in criteria.exclude_terms or []
+        ]
+
+    @staticmethod
+    def generate_query(criteria: GrantSearchCriteria) -> str:
+        """
+        Generate a broad, BM25-ranked query for the local grant index.
+
+        Local index syntax (SQLite FTS5 plus filters):
+        - "exact phrase": exact match
+        - OR / AND / NOT: boolean operators
+        - deadline_months:N: still open and closing within N months
+        - amount_min:N / amount_max:N: award range overlaps the amount
+        """
+        terms = [LocalIndexQueryGenerator._phrase(k) for k in criteria.keywords]
+        for context in (criteria.organization_type, criteria.sector, criteria.location):
+            if context:
+                terms.append(LocalIndexQueryGenerator._phrase(context))
+        query_parts = [f"({' OR '.join(terms)})"]
+        query_parts.extend(LocalIndexQueryGenerator._exclusions(criteria))
+        query_parts.extend(LocalIndexQueryGenerator._filters(criteria))
+        return " ".join(query_parts)
+
+    @staticmethod
+    def generate_precise_query(criteria: GrantSearchCriteria) -> str:
+        """Generate a query requiring every keyword to appear."""
+        terms = [LocalIndexQueryGenerator._phrase(k) for k in criteria.keywords]
+        query_parts = [f"({' AND '.join(terms)})"]
+        query_parts.extend(LocalIndexQueryGenerator._exclusions(criteria))
+        query_parts.extend(LocalIndexQueryGenerator._filters(criteria))
+        return " ".join(query_parts)
+
+
 class UnifiedSearchOperatorGenerator:
     """Unified interface for generating search operators across all engines."""
     
@@ -310,6 +365,11 @@ class UnifiedSearchOperatorGenerator:
                     DuckDuckGoOperatorGenerator.generate_query(criteria),
                     DuckDuckGoOperatorGenerator.generate_privacy_focused_query(criteria)
                 ]
+            elif engine == SearchEngine.LOCAL:
+                results[engine] = [
+                    LocalIndexQueryGenerator.generate_query(criteria),
+                    LocalIndexQueryGenerator.generate_precise_query(criteria),
+                ]
         
         return results
     
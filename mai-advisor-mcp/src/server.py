@@ -1,7 +1,10 @@
 """MCP Server for Grant Finder Assistant."""
 import json
 import asyncio
-from typing import Any, Sequence
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
 from dotenv import load_dotenv
 
 from mcp.server import Server
@@ -20,22 +23,108 @@ from search_operators import (
     SearchEngine,
 )
 from grant_agent import GrantResearchAgent
+from run_checkpoint import RunCheckpointMismatchError
+from query_planner import SearchBudget
 from advisor_tools import MAIAdvisorWorkflow
 
 # Load environment variables
 load_dotenv()
 
+# stdout is the JSON-RPC channel of the stdio transport; diagnostics go to
+# stderr through logging, never print()
+logger = logging.getLogger(__name__)
+
 
 # Initialize MCP server
 app = Server("mai-advisor-mcp")
 
 # Initialize grant research agent
-agent = GrantResearchAgent()
+# MAI_ADVISOR_TRIAGE_MODEL names a fast model for per-result triage; the
+# default model then only runs the final synthesis. MAI_ADVISOR_HEDGE=1
+# duplicates Tavily searches that run past their adaptive hedge delay
+agent = GrantResearchAgent(
+    fast_model_name=os.environ.get("MAI_ADVISOR_TRIAGE_MODEL") or None,
+    hedge_searches=os.environ.get("MAI_ADVISOR_HEDGE", "").strip().lower()
+    in ("1", "true", "yes", "on"),
+)
+
+# Per-call deadline for search_grants (seconds); callers may override it
+DEFAULT_TOOL_TIMEOUT = float(os.environ.get("MAI_ADVISOR_TOOL_TIMEOUT", "300"))
 
 # Initialize MAI Advisor workflow
 workflow = MAIAdvisorWorkflow()
 
 
+def _progress_sender() -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """
+    Build a research progress callback that sends MCP progress notifications.
+
+    Returns None when the client did not ask for progress (no progressToken).
+    """
+    ctx = app.request_context
+    token = getattr(ctx.meta, "progressToken", None) if ctx.meta else None
+    if token is None:
+        return None
+
+    async def send(event: Dict[str, Any]) -> None:
+        try:
+            await ctx.session.send_progress_notification(
+                token,
+                event["progress"],
+                total=event["total"],
+                message=event["message"],
+                related_request_id=str(ctx.request_id),
+            )
+        except Exception as e:
+            # A client that stopped listening must not fail the research run
+            logger.warning("Progress notification failed: %s", e)
+
+    return send
+
+
+class _TokenForwarder:
+    """Batches streamed analysis tokens into MCP log notifications."""
+
+    def __init__(self, min_chars: int = 200, max_delay: float = 0.5):
+        """
+        Bind to the current request.
+
+        Args:
+            min_chars: Send once this many characters are buffered
+            max_delay: Send at least this often (seconds) while tokens arrive
+        """
+        self.ctx = app.request_context
+        self.min_chars = min_chars
+        self.max_delay = max_delay
+        self._buffer: list = []
+        self._size = 0
+        self._last_sent = time.monotonic()
+
+    async def __call__(self, token: str) -> None:
+        self._buffer.append(token)
+        self._size += len(token)
+        if self._size >= self.min_chars or time.monotonic() - self._last_sent >= self.max_delay:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send whatever is buffered."""
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._size = 0
+        self._last_sent = time.monotonic()
+        try:
+            await self.ctx.session.send_log_message(
+                level="info",
+                data=text,
+                logger="search_grants.analysis",
+                related_request_id=self.ctx.request_id,
+            )
+        except Exception as e:
+            logger.warning("Token notification failed: %s", e)
+
+
 @app.list_resources()
 async def list_resources() -> list[Resource]:
     """List available resources."""
@@ -218,8 +307,63 @@ async def list_tools() -> list[Tool]:
                     "depth": {
                         "type": "string",
                         "enum": ["basic", "deep"],
-                        "description": "Research depth: basic (fast) or deep (AI-analyzed)",
+                        "description": "Research depth: basic (fast, no LLM; amounts, deadlines and eligibility extracted locally) or deep (AI-analyzed)",
                         "default": "deep"
+                    },
+                    "run_id": {
+                        "type": "string",
+                        "description": "Checkpoint this run under an ID of your choice; calling again with the same ID resumes it, reusing completed searches and analysis steps and retrying only failed work. Omit for an uncheckpointed run.",
+                    },
+                    "stream_tokens": {
+                        "type": "boolean",
+                        "description": "Stream the analysis text as it is generated via logging notifications (logger 'search_grants.analysis')",
+                        "default": False,
+                    },
+                    "timeout_seconds": {
+                        "type": "number",
+                        "description": "Abort the research if it takes longer than this (default 300); with a run_id, completed steps stay resumable",
+                    },
+                    "max_searches": {
+                        "type": "number",
+                        "description": "Web search budget for the run (default 6). Searches are chosen by how many new relevant results they found in past runs, and stop early once they stop finding new ones.",
+                    },
+                    "latency_budget_ms": {
+                        "type": "number",
+                        "description": "Answer within this many milliseconds: search width, page fetching and the analysis model (or no analysis) are chosen from live latency, and the report lists any skipped stages",
+                    },
+                },
+                "required": ["keywords"],
+            },
+        ),
+        Tool(
+            name="search_stored_grants",
+            description="Instantly answer a grant search from opportunities found by earlier search_grants runs, with no web search. Filters on keywords, location, sector, deadline window and funding range.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "keywords": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Keywords to match",
+                    },
+                    "sector": {"type": "string", "description": "Sector or field"},
+                    "location": {"type": "string", "description": "Geographic location or region"},
+                    "amount_min": {
+                        "type": "integer",
+                        "description": "Minimum grant amount in dollars",
+                    },
+                    "amount_max": {
+                        "type": "integer",
+                        "description": "Maximum grant amount in dollars",
+                    },
+                    "deadline_months": {
+                        "type": "integer",
+                        "description": "Only grants with deadlines within X months (or rolling)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of opportunities to return (default: 25)",
+                        "default": 25
                     }
                 },
                 "required": ["keywords"]
@@ -260,9 +404,9 @@ async def list_tools() -> list[Tool]:
                         "type": "array",
                         "items": {
                             "type": "string",
-                            "enum": ["google", "bing", "duckduckgo"]
+                            "enum": ["google", "bing", "duckduckgo", "local"],
                         },
-                        "description": "Search engines to generate queries for (defaults to all)"
+                        "description": "Search engines to generate queries for (defaults to google, bing and duckduckgo; 'local' is the offline grant index)"
                     }
                 },
                 "required": ["keywords"]
@@ -285,6 +429,11 @@ async def list_tools() -> list[Tool]:
                     "requirements": {
                         "type": "string",
                         "description": "Grant requirements and eligibility criteria"
+                    },
+                    "use_cache": {
+                        "type": "boolean",
+                        "description": "Reuse a cached analysis for the same grant/organization pair (default: true)",
+                        "default": True
                     }
                 },
                 "required": ["grant_description", "organization_description"]
@@ -381,15 +530,85 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
         )
         
         depth = arguments.get("depth", "deep")
+        # Checkpointing is opt-in: only a caller-supplied run_id persists steps
+        run_id = arguments.get("run_id") or None
+        if run_id:
+            resume_hint = (
+                f"Completed steps were saved. Call search_grants again with the same "
+                f'criteria and run_id "{run_id}" to resume.'
+            )
+        else:
+            resume_hint = "Pass a run_id to make the research resumable."
+
+        # Report each finished search and the analysis phases as progress
+        # notifications, and optionally forward analysis tokens as they stream
+        on_progress = _progress_sender()
+        on_token = _TokenForwarder() if arguments.get("stream_tokens") else None
+        timeout = arguments.get("timeout_seconds") or DEFAULT_TOOL_TIMEOUT
+        budget = SearchBudget(max_cost=arguments["max_searches"]) if arguments.get("max_searches") else None
         
-        # Perform research
-        results = await agent.research_grants(criteria, depth=depth)
+        # Perform research (checkpointed when a run_id is given). A
+        # client cancellation cancels this task, which aborts in-flight
+        # searches and LLM calls inside research_grants.
+        try:
+            results = await agent.research_grants(
+                criteria,
+                depth=depth,
+                run_id=run_id,
+                on_progress=on_progress,
+                on_token=on_token,
+                timeout=timeout,
+                budget=budget,
+                latency_budget_ms=arguments.get("latency_budget_ms"),
+            )
+            if on_token is not None:
+                await on_token.flush()
+        except RunCheckpointMismatchError as e:
+            return [TextContent(type="text", text=f"Error: {e}")]
+        except asyncio.TimeoutError:
+            return [
+                TextContent(
+                    type="text", text=f"Research timed out after {timeout:g}s. {resume_hint}"
+                )
+            ]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Research failed: {e}\n\n{resume_hint}"
+            )]
         
         # Generate report
         report = agent.generate_grant_report(results, format="markdown")
         
         return [TextContent(type="text", text=report)]
     
+    elif name == "search_stored_grants":
+        criteria = GrantSearchCriteria(
+            keywords=arguments["keywords"],
+            sector=arguments.get("sector"),
+            location=arguments.get("location"),
+            amount_min=arguments.get("amount_min"),
+            amount_max=arguments.get("amount_max"),
+            deadline_months=arguments.get("deadline_months"),
+        )
+
+        opportunities = await asyncio.to_thread(
+            agent.find_stored_opportunities, criteria, limit=arguments.get("limit", 25)
+        )
+        if not opportunities:
+            return [
+                TextContent(
+                    type="text",
+                    text="No stored opportunities match these criteria. Run search_grants to research new ones.",
+                )
+            ]
+
+        report = agent.generate_grant_report(
+            {"criteria": criteria, "opportunities": opportunities}, format="markdown"
+        )
+
+        return [TextContent(type="text", text=report)]
+
     elif name == "generate_search_operators":
         # Extract criteria
         criteria = GrantSearchCriteria(
@@ -445,9 +664,12 @@ Please provide a comprehensive fit analysis."""
             HumanMessage(content=user_prompt)
         ]
         
-        response = agent.model.invoke(messages)
+        analysis = await agent.ainvoke_model(
+            messages,
+            use_cache=arguments.get("use_cache", True)
+        )
         
-        return [TextContent(type="text", text=response.content)]
+        return [TextContent(type="text", text=analysis)]
     
     raise ValueError(f"Unknown tool: {name}")
 
@@ -488,4 +710,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)  # stderr by default
     asyncio.run(main())
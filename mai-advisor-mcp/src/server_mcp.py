@@ -50,6 +50,64 @@ from workflow_impl import GrantAdvisorWorkflow
 # Initialize MCP server
 app = Server("mai-advisor")
 
+# Per-call deadline for long-running tools (seconds); callers may override it
+DEFAULT_TOOL_TIMEOUT = float(os.environ.get("MAI_ADVISOR_TOOL_TIMEOUT", "300"))
+
+
+async def _build_grant_strategy(topic: str, location: str) -> dict:
+    """
+    Generate every strategy document in memory.
+
+    Each step runs in a worker thread and the event loop regains control in
+    between, so a cancelled or timed-out call stops before the next step
+    instead of running the whole workflow to completion.
+
+    Returns:
+        Dict of generated contents keyed by output kind
+    """
+    workflow = GrantAdvisorWorkflow()
+    from app_workflow import generate_ai_agent_todo
+
+    dorks = await asyncio.to_thread(
+        GrantDorkGenerator.generate_all_dorks, topic=topic, location=location if location else None
+    )
+    return {
+        "dorks": dorks,
+        "financial": await asyncio.to_thread(workflow.generate_financial_plan, topic, location),
+        "grant": await asyncio.to_thread(workflow.generate_grant_expert_plan, topic, location),
+        "research": await asyncio.to_thread(workflow.generate_research_plan, topic, location),
+        "crash_course": await asyncio.to_thread(
+            workflow.generate_crash_course_plan, topic, location
+        ),
+        "orchestrator": await asyncio.to_thread(workflow.orchestrate_plan, topic, location),
+        "agent_todo": await asyncio.to_thread(generate_ai_agent_todo, topic, location, dorks),
+    }
+
+
+def _save_grant_strategy(topic: str, location: str, plans: dict) -> dict:
+    """
+    Write a generated strategy to disk as one unit.
+
+    Meant to run in a worker thread: cancelling the awaiting task cannot
+    interrupt the thread midway, so cancellation never leaves a partial set
+    of files; if a write fails, files already written are removed.
+
+    Returns:
+        Dict of saved file paths keyed by output kind
+    """
+    saved = {}
+    try:
+        saved["dorks"] = output_manager.save_dorks(topic, location or None, plans["dorks"])
+        for expert in ("financial", "grant", "research", "crash_course"):
+            saved[expert] = output_manager.save_expert_plan(expert, plans[expert], topic)
+        saved["orchestrator"] = output_manager.save_orchestrator_plan(plans["orchestrator"], topic)
+        saved["agent_todo"] = output_manager.save_ai_agent_todo(plans["agent_todo"])
+    except Exception:
+        for path in saved.values():
+            Path(path).unlink(missing_ok=True)
+        raise
+    return saved
+
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
@@ -77,6 +135,10 @@ async def list_tools() -> list[Tool]:
                     "location": {
                         "type": "string",
                         "description": "Geographic location (optional - e.g., 'Phoenix, Arizona', 'Seattle metro area')"
+                    },
+                    "timeout_seconds": {
+                        "type": "number",
+                        "description": "Give up (writing no files) if generation takes longer than this (default 300)"
                     }
                 },
                 "required": ["topic"]
@@ -155,9 +217,7 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
         )
         
         # Save to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        topic_slug = topic.lower().replace(" ", "_")[:30]
-        output_manager.save_dorks(dorks, f"{timestamp}_{topic_slug}")
+        saved_path = output_manager.save_dorks(topic, location, dorks)
         
         # Format response
         result = f"""# Search Engine Dorks Generated
@@ -195,7 +255,7 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
 3. Review results for grant opportunities (RFPs, applications, announcements)
 4. Filter for relevant deadlines and requirements
 
-**Files saved to:** `grant_dorks/{timestamp}_{topic_slug}.json`
+**Files saved to:** `{saved_path}`
 """
         
         return [TextContent(type="text", text=result)]
@@ -203,38 +263,29 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
     elif name == "generate_grant_strategy":
         topic = arguments["topic"]
         location = arguments.get("location", "")
-        
-        # Initialize workflow
-        workflow = GrantAdvisorWorkflow()
-        
-        # Step 1: Generate dorks
-        dorks = GrantDorkGenerator.generate_all_dorks(
-            topic=topic,
-            location=location if location else None
-        )
+        timeout = arguments.get("timeout_seconds") or DEFAULT_TOOL_TIMEOUT
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        topic_slug = topic.lower().replace(" ", "_")[:30]
-        dorks_file = output_manager.save_dorks(dorks, f"{timestamp}_{topic_slug}")
         
-        # Step 2: Generate expert plans
-        financial_plan = workflow.generate_financial_plan(topic, location)
-        grant_plan = workflow.generate_grant_expert_plan(topic, location)
-        research_plan = workflow.generate_research_plan(topic, location)
-        crash_course_plan = workflow.generate_crash_course_plan(topic, location)
-        
-        financial_file = output_manager.save_expert_plan("financial", financial_plan, timestamp)
-        grant_file = output_manager.save_expert_plan("grant", grant_plan, timestamp)
-        research_file = output_manager.save_expert_plan("research", research_plan, timestamp)
-        crash_course_file = output_manager.save_expert_plan("crash_course", crash_course_plan, timestamp)
-        
-        # Step 3: Orchestrate comprehensive plan
-        orchestrator_plan = workflow.orchestrate_plan(topic, location)
-        orchestrator_file = output_manager.save_orchestrator_plan(orchestrator_plan, timestamp)
+        # Steps 1-4: dorks, expert plans, orchestrated plan and agent todo are
+        # generated in memory first; a cancelled or timed-out call stops here
+        # without touching disk
+        try:
+            plans = await asyncio.wait_for(_build_grant_strategy(topic, location), timeout=timeout)
+        except asyncio.TimeoutError:
+            return [TextContent(
+                type="text",
+                text=f"Grant strategy generation timed out after {timeout:g}s; no files were written."
+            )]
         
-        # Step 4: Generate AI agent todo
-        from app_workflow import generate_ai_agent_todo
-        agent_todo = generate_ai_agent_todo(topic, location, dorks)
-        agent_file = output_manager.save_ai_agent_todo(agent_todo, timestamp)
+        # Save everything in one step so no partial strategy is left behind;
+        # the writes run off the event loop like the build steps
+        saved = await asyncio.to_thread(_save_grant_strategy, topic, location, plans)
+        dorks_file = saved["dorks"]
+        financial_file = saved["financial"]
+        grant_file = saved["grant"]
+        research_file = saved["research"]
+        orchestrator_file = saved["orchestrator"]
+        agent_file = saved["agent_todo"]
         
         # Format success response
         result = f"""# Grant Strategy Generated Successfully ✓
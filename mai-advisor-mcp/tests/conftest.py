@@ -0,0 +1,23 @@
+"""Shared fixtures for the unit tests (src/ and loadtest/ are on the path via pyproject)."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep default cache, history and spill files out of the project tree."""
+    monkeypatch.setenv("MAI_ADVISOR_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture(scope="session")
+def fake_services():
+    """Fake Tavily and chat services from loadtest/ with short fixed latencies."""
+    fakes = pytest.importorskip("fake_services")
+    pytest.importorskip("langchain_openai")
+    config = fakes.FakeServiceConfig(latency_ms=5, jitter=0, payload_kb=1)
+    services = fakes.start_fake_services(config, config)
+    yield services
+    for server in services["servers"]:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,83 @@
+"""Tests for adaptive_depth: sizing the pipeline to a latency budget."""
+
+import pytest
+
+from adaptive_depth import DEFAULT_LATENCY_PRIORS, latency_estimates, plan_depth
+from latency_stats import LatencyRecorder
+
+# search 2s, fetch 1.5s, default model 12s, fast model 4s
+PRIORS = dict(DEFAULT_LATENCY_PRIORS)
+
+
+def test_generous_budget_gets_the_full_pipeline():
+    plan = plan_depth(30, PRIORS, concurrency=4)
+
+    assert plan.analysis == "default"
+    assert (plan.search_waves, plan.max_searches) == (2, 8)
+    assert plan.fetch_content is True
+    assert plan.skipped == []
+    assert plan.analysis_seconds == 12
+
+
+def test_tighter_budget_falls_back_to_the_fast_model():
+    plan = plan_depth(10, PRIORS, fast_model=True)
+
+    assert plan.analysis == "fast"
+    assert plan.search_waves == 2
+    assert plan.fetch_content is False
+    assert plan.skipped == ["default_model", "fetch"]
+    assert plan.analysis_seconds == 4
+
+
+def test_no_analysis_when_no_model_fits_beside_a_search_wave():
+    plan = plan_depth(10, PRIORS)
+
+    assert plan.analysis is None
+    assert plan.analysis_seconds == 0
+    assert plan.search_waves == 2
+    assert plan.skipped == ["analysis"]
+
+
+@pytest.mark.parametrize(
+    "budget, waves, fetch",
+    [(30, 2, True), (5, 2, False), (3, 1, False)],
+)
+def test_search_waves_and_fetching_fit_the_time_left(budget, waves, fetch):
+    plan = plan_depth(budget, PRIORS, concurrency=3, allow_analysis=False)
+
+    assert plan.search_waves == waves
+    assert plan.max_searches == waves * 3
+    assert plan.fetch_content is fetch
+    spent = waves * PRIORS["search_call"] + (PRIORS["fetch_call"] if fetch else 0)
+    assert spent <= budget
+
+
+def test_budget_below_one_search_uses_local_index_or_one_late_wave():
+    with_index = plan_depth(1, PRIORS, allow_analysis=False, local_index=True)
+    without_index = plan_depth(1, PRIORS, allow_analysis=False)
+
+    assert (with_index.search_waves, with_index.max_searches) == (0, 0)
+    assert "web_search" in with_index.skipped
+    assert without_index.search_waves == 1
+    assert "extra_search_waves" in without_index.skipped
+
+
+def test_live_estimates_replace_priors_and_shrink_the_plan():
+    recorder = LatencyRecorder()
+    for _ in range(20):
+        recorder.record("search_call", 5.0)
+
+    estimates = latency_estimates(recorder)
+    plan = plan_depth(10, estimates, allow_analysis=False)
+
+    assert estimates["search_call"] == pytest.approx(5.0)
+    assert estimates["llm_call"] == PRIORS["llm_call"]
+    assert plan.search_waves == 1
+
+
+def test_to_dict_reports_milliseconds():
+    data = plan_depth(10, PRIORS, fast_model=True).to_dict()
+
+    assert data["budget_ms"] == 10_000
+    assert data["estimates_ms"]["search_call"] == 2000
+    assert "budget" not in data and "estimates" not in data
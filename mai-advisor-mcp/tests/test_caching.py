@@ -0,0 +1,151 @@
+"""Tests for caching."""
+
+import pytest
+
+import caching
+from caching import LLMResponseCache, SearchResultCache, SQLiteTTLCache
+
+
+class FakeClock:
+    """Stands in for the time module so TTLs and access order are deterministic."""
+
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds=1.0):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(caching, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = SQLiteTTLCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_hit_and_miss(cache):
+    cache.set("a", {"value": [1, 2]})
+
+    assert cache.get("a") == {"value": [1, 2]}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.set("default", 1)
+    cache.set("short", 2, ttl_seconds=5)
+
+    clock.advance(5)
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.advance(55)
+    assert cache.get("default") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["entries"] == 0
+
+
+def test_purge_expired(cache, clock):
+    cache.set("a", 1, ttl_seconds=10)
+    cache.set("b", 2, ttl_seconds=10)
+    cache.set("c", 3, ttl_seconds=100)
+
+    clock.advance(10)
+
+    assert cache.purge_expired() == 2
+    assert cache.stats()["entries"] == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_eviction_keeps_recently_read_entries(cache, clock):
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+        clock.advance()
+    cache.get("a")  # "b" is now least recently used
+    clock.advance()
+
+    cache.set("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_overwrite_refreshes_ttl_without_eviction(cache, clock):
+    cache.set("a", 1, ttl_seconds=5)
+    clock.advance(4)
+    cache.set("a", 2, ttl_seconds=5)
+    clock.advance(4)
+
+    assert cache.get("a") == 2
+    assert cache.stats()["evictions"] == 0
+
+
+def test_make_key_is_order_insensitive_for_dicts():
+    make_key = SQLiteTTLCache.make_key
+    assert make_key("q", {"a": 1, "b": 2}) == make_key("q", {"b": 2, "a": 1})
+    assert make_key("q", 1) != make_key("q", 2)
+
+
+def test_default_path_uses_cache_dir(isolated_cache_dir):
+    cache = SearchResultCache()
+    try:
+        assert cache.path == isolated_cache_dir / "search_cache.sqlite"
+    finally:
+        cache.close()
+
+
+def test_search_key_covers_every_request_field():
+    key = SearchResultCache.search_key("rural grants", 5, "general", True)
+
+    assert key == SearchResultCache.search_key("rural grants", 5, "general", True)
+    assert key != SearchResultCache.search_key("rural grants", 10, "general", True)
+    assert key != SearchResultCache.search_key("rural grants", 5, "general", False)
+
+
+class Message:
+    def __init__(self, type, content):
+        self.type = type
+        self.content = content
+
+
+def test_normalize_prompt_collapses_whitespace_and_keeps_roles():
+    messages = [Message("system", "Be  brief."), Message("human", ["structured", "content"])]
+
+    assert LLMResponseCache.normalize_prompt(messages) == [
+        ["system", "Be brief."],
+        ["human", '["structured", "content"]'],
+    ]
+
+
+def test_llm_response_key_normalizes_whitespace():
+    spaced = [Message("system", "Be brief."), Message("human", "Find  grants\nin Ohio ")]
+    compact = [Message("system", "Be brief."), Message("human", "Find grants in Ohio")]
+    key = LLMResponseCache.response_key
+
+    assert key(spaced, "m", 0.2) == key(compact, "m", 0.2)
+    assert key(spaced, "m", 0.2) != key(compact, "m", 0.7)
+    assert key(spaced, "m", 0.2) != key(compact, "other", 0.2)
+
+
+def test_llm_cache_round_trip(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+    key = LLMResponseCache.response_key([Message("human", "hi")], "m", 0.0)
+    try:
+        cache.set(key, "hello")
+        assert cache.get(key) == "hello"
+    finally:
+        cache.close()
@@ -0,0 +1,56 @@
+"""Tests for cassette."""
+
+import asyncio
+import json
+
+import pytest
+
+from cassette import Cassette, CassetteMissError, LatencyProfile
+
+
+def test_record_then_replay_in_order(tmp_path):
+    path = tmp_path / "cassettes" / "run.jsonl"
+    recorder = Cassette(str(path), mode="record")
+    recorder.record("search", {"query": "q"}, {"results": [1]}, elapsed=0.2)
+    recorder.record("search", {"query": "q"}, {"results": [2]}, elapsed=0.3)
+    asyncio.run(recorder.arecord("llm", {"prompt": "p"}, "text", elapsed=1.0))
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["kind"] for line in lines] == ["search", "search", "llm"]
+
+    player = Cassette(str(path), mode="replay")
+    replies = [player.replay("search", {"query": "q"}) for _ in range(3)]
+    assert replies == [{"results": [1]}, {"results": [2]}, {"results": [1]}]
+    assert asyncio.run(player.areplay("llm", {"prompt": "p"})) == "text"
+    with pytest.raises(CassetteMissError):
+        player.replay("search", {"query": "other"})
+    assert player.stats()["replayed"] == 4
+
+
+def test_record_mode_starts_over_and_auto_mode_appends(tmp_path):
+    path = tmp_path / "run.jsonl"
+    Cassette(str(path), mode="record").record("search", {"query": "old"}, {}, elapsed=0)
+    Cassette(str(path), mode="record").record("search", {"query": "q"}, {"n": 1}, elapsed=0)
+
+    auto = Cassette(str(path), mode="auto")
+    assert auto.replay("search", {"query": "old"}) is None
+    assert auto.replay("search", {"query": "q"}) == {"n": 1}
+    auto.record("search", {"query": "new"}, {"n": 2}, elapsed=0)
+
+    assert Cassette(str(path), mode="replay").stats()["interactions"] == 2
+
+
+def test_replay_mode_never_records(tmp_path):
+    path = tmp_path / "run.jsonl"
+    player = Cassette(str(path), mode="replay")
+
+    player.record("search", {"query": "q"}, {}, elapsed=0)
+
+    assert not path.exists()
+
+
+def test_latency_profile():
+    assert LatencyProfile("recorded", scale=2).sample(0.5) == 1.0
+    assert LatencyProfile("fixed", mean=0.3).sample() == 0.3
+    assert 0.1 <= LatencyProfile("uniform", mean=0.2, spread=0.1).sample() <= 0.3
+    assert LatencyProfile().sample(5) == 0.0
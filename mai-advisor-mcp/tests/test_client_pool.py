@@ -0,0 +1,94 @@
+"""Tests for client_pool."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("langchain_openai")
+
+import client_pool  # noqa: E402
+from client_pool import (  # noqa: E402
+    configure_http_pool,
+    get_async_http_client,
+    get_chat_model,
+    get_http_client,
+    get_search_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(client_pool, "_settings", dict(client_pool._settings))
+    configure_http_pool()
+    yield
+    configure_http_pool()
+
+
+def test_one_async_client_per_event_loop():
+    async def clients():
+        first = get_async_http_client()
+        await asyncio.sleep(0)
+        return first, get_async_http_client()
+
+    first, again = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+
+    assert first is again
+    assert other is not first
+    # The first loop is closed, so its client is forgotten
+    assert len(client_pool._async_http_clients) == 1
+
+
+def test_async_client_requires_a_running_loop():
+    with pytest.raises(RuntimeError):
+        get_async_http_client()
+
+
+def test_sync_client_and_search_clients_are_shared():
+    assert get_http_client() is get_http_client()
+    assert get_search_client("key-a") is get_search_client("key-a")
+    assert get_search_client("key-a") is not get_search_client("key-b")
+    assert get_search_client("key-a", "http://localhost:1") is not get_search_client("key-a")
+
+
+def test_chat_models_are_shared_within_a_loop_and_bound_to_its_pool():
+    async def models():
+        model = get_chat_model("m", api_key="k")
+        return (
+            model,
+            get_chat_model("m", api_key="k"),
+            get_chat_model("m", api_key="k", temperature=0),
+        )
+
+    model, same, other_temperature = asyncio.run(models())
+    next_loop, _, _ = asyncio.run(models())
+
+    assert model is same
+    assert other_temperature is not model
+    assert next_loop is not model
+
+
+def test_configure_http_pool_replaces_clients():
+    client = get_http_client()
+    search = get_search_client("key")
+
+    configure_http_pool(pool_size=3)
+
+    assert client.is_closed
+    assert get_http_client() is not client
+    assert get_search_client("key") is not search
+    assert client_pool._settings["pool_size"] == 3
+
+
+def test_configure_http_pool_closes_async_clients_on_their_loop():
+    async def replace():
+        client = get_async_http_client()
+        configure_http_pool()
+        await asyncio.sleep(0.01)
+        return client, get_async_http_client()
+
+    old, new = asyncio.run(replace())
+
+    assert old.is_closed
+    assert new is not old
@@ -0,0 +1,104 @@
+"""Tests for context_builder."""
+
+from context_builder import (
+    BM25Ranker,
+    chunk_snippets,
+    criteria_terms,
+    estimate_tokens,
+    pack_context,
+    pack_snippets,
+    rank_snippets,
+    tokenize,
+)
+from search_operators import GrantSearchCriteria
+
+
+def _result_set(engine, hits):
+    return {
+        "engine": engine,
+        "query": f"{engine} query",
+        "results": {
+            "results": [
+                {"url": url, "title": title, "content": content} for url, title, content in hits
+            ]
+        },
+    }
+
+
+CRITERIA = GrantSearchCriteria(keywords=["rural broadband"], location="Ohio")
+SEARCH_RESULTS = [
+    _result_set(
+        "google",
+        [
+            ("https://a.org/arts", "Arts fellowship", "Funding for painters and sculptors."),
+            (
+                "https://a.org/broadband",
+                "Rural broadband grant",
+                "Rural broadband deployment grants for Ohio counties.",
+            ),
+        ],
+    ),
+    _result_set(
+        "bing",
+        [
+            ("https://a.org/ohio", "Ohio community fund", "Small grants across Ohio."),
+            ("https://a.org/broadband", "Rural broadband grant", "Duplicate listing."),
+        ],
+    ),
+]
+
+
+def test_tokenize_and_criteria_terms():
+    assert tokenize("The Rural-Broadband grant, for Ohio!") == ["rural-broadband", "grant", "ohio"]
+    assert criteria_terms(CRITERIA) == ["rural", "broadband", "ohio"]
+
+
+def test_bm25_prefers_documents_with_more_and_rarer_matches():
+    ranker = BM25Ranker([["rural", "broadband"], ["rural", "housing"], ["arts"]])
+
+    scores = ranker.score(["rural", "broadband"])
+
+    assert scores[0] > scores[1] > scores[2] == 0.0
+
+
+def test_rank_snippets_drops_non_matches_and_repeated_urls():
+    ranked = rank_snippets(CRITERIA, SEARCH_RESULTS)
+
+    assert [s.url for s in ranked] == ["https://a.org/broadband", "https://a.org/ohio"]
+    assert ranked[0].engine == "google"
+    assert ranked[0].score > ranked[1].score > 0
+
+
+def test_pack_context_stays_within_the_token_budget():
+    ranked = rank_snippets(CRITERIA, SEARCH_RESULTS)
+    first_cost = pack_snippets(ranked[:1], 10_000).token_count
+
+    packed = pack_context(CRITERIA, SEARCH_RESULTS, token_budget=first_cost)
+
+    assert [s.url for s in packed.snippets] == ["https://a.org/broadband"]
+    assert packed.token_count <= packed.token_budget
+    assert (packed.candidates, packed.overflow) == (2, 1)
+    assert "Result 1: Rural broadband grant" in packed.text
+
+
+def test_pack_snippets_skips_a_snippet_that_does_not_fit():
+    ranked = rank_snippets(CRITERIA, SEARCH_RESULTS)
+    ranked[0].content = "x" * 2000
+    budget = estimate_tokens("x" * 1000)
+
+    packed = pack_snippets(ranked, budget)
+
+    assert [s.url for s in packed.snippets] == ["https://a.org/ohio"]
+
+
+def test_chunk_snippets_gives_an_oversized_snippet_its_own_chunk():
+    ranked = rank_snippets(CRITERIA, SEARCH_RESULTS)
+    ranked[0].content = "x" * 2000
+
+    chunks = chunk_snippets(ranked, token_budget=100)
+
+    assert [[s.url for s in chunk.snippets] for chunk in chunks] == [
+        ["https://a.org/ohio"],
+        ["https://a.org/broadband"],
+    ]
+    assert len(chunk_snippets(ranked, token_budget=100, max_chunks=1)) == 1
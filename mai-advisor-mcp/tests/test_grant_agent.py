@@ -0,0 +1,198 @@
+"""Tests for GrantResearchAgent's search pipeline (stubbed searches and the load-test fakes)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+from grant_agent import GrantResearchAgent  # noqa: E402
+from query_planner import SearchBudget  # noqa: E402
+from run_checkpoint import RunCheckpoint  # noqa: E402
+from search_operators import GrantSearchCriteria, SearchEngine  # noqa: E402
+
+CRITERIA = GrantSearchCriteria(keywords=["rural"])
+PLAN = [(engine, f"rural grants {i}", i) for i in range(2) for engine in SearchEngine][:6]
+
+
+def _agent(**kwargs):
+    options = dict(
+        tavily_api_key="test",
+        openrouter_api_key="test",
+        enable_search_cache=False,
+        enable_llm_cache=False,
+        enable_checkpoints=False,
+        enable_opportunity_store=False,
+        enable_local_index=False,
+    )
+    options.update(kwargs)
+    return GrantResearchAgent(**options)
+
+
+def _stub_searches(agent, hits_per_wave):
+    """Replace the concurrent search path; returns the size of each wave run."""
+    waves = []
+
+    async def execute(wave, max_results, **kwargs):
+        waves.append(len(wave))
+        hits = hits_per_wave[len(waves) - 1]
+        return [
+            {
+                "engine": engine.value,
+                "query": query,
+                "results": {
+                    "results": [
+                        {
+                            "url": f"https://example.org/{engine.value}/{query}/{i}",
+                            "title": "Rural grant",
+                        }
+                        for i in range(hits)
+                    ]
+                },
+                "elapsed": 0.01,
+            }
+            for engine, query in wave
+        ]
+
+    agent._execute_searches_concurrently = execute
+    return waves
+
+
+def _execute_plan(agent, budget):
+    return asyncio.run(agent._execute_plan(CRITERIA, PLAN, budget, 5, False))
+
+
+def test_default_plan_runs_in_waves_of_max_concurrency():
+    agent = _agent()
+    waves = _stub_searches(agent, [3, 3])
+
+    results, stats = _execute_plan(agent, SearchBudget())
+
+    assert waves == [4, 2]
+    assert len(results) == 6
+    assert (stats["executed"], stats["stopped_early"]) == (6, False)
+    assert stats["wave_yields"] == [3.0, 3.0]
+
+
+def test_low_yield_first_wave_skips_the_rest():
+    agent = _agent()
+    waves = _stub_searches(agent, [0, 3])
+
+    _, stats = _execute_plan(agent, SearchBudget())
+
+    assert waves == [4]
+    assert (stats["executed"], stats["stopped_early"]) == (4, True)
+
+
+def test_plan_that_cannot_stop_early_fans_out_at_once():
+    agent = _agent()
+    waves = _stub_searches(agent, [0])
+
+    _, stats = _execute_plan(agent, SearchBudget(min_yield=0))
+
+    assert waves == [6]
+    assert stats["executed"] == 6
+
+
+def test_without_planner_the_plan_runs_in_one_wave():
+    agent = _agent(enable_query_planner=False)
+    waves = _stub_searches(agent, [0])
+
+    _, stats = _execute_plan(agent, SearchBudget())
+
+    assert waves == [6]
+    assert stats["stopped_early"] is False
+
+
+def test_depth_plan_is_sized_from_the_agents_live_latencies():
+    agent = _agent(max_concurrency=3, fast_model_name="fast/model")
+    for _ in range(10):
+        agent.stage_latency.record("search_call", 3.0)
+    no_checkpoint = RunCheckpoint(None, None)
+
+    deep = asyncio.run(agent._plan_depth(10, "deep", no_checkpoint))
+    basic = asyncio.run(agent._plan_depth(10, "basic", no_checkpoint))
+
+    # 9s after the reserve: fast model (4s) plus one 3s wave of three searches
+    assert (deep.analysis, deep.search_waves, deep.max_searches) == ("fast", 1, 3)
+    assert (basic.analysis, basic.search_waves, basic.max_searches) == (None, 2, 6)
+
+
+def test_hedging_is_off_by_default_and_uses_the_shared_tavily_policy():
+    from hedging import get_hedge_policy
+
+    assert _agent().search_hedge is None
+    assert _agent(hedge_searches=True).search_hedge is get_hedge_policy("tavily")
+
+
+def _live_agent(services, **kwargs):
+    return _agent(
+        tavily_base_url=services["search_url"],
+        openrouter_base_url=services["llm_url"],
+        **kwargs,
+    )
+
+
+def test_concurrent_and_sequential_runs_find_the_same_results(fake_services):
+    agent = _live_agent(fake_services)
+    events = []
+
+    def research(concurrent):
+        return asyncio.run(
+            agent.research_grants(
+                CRITERIA, depth="basic", concurrent=concurrent, on_progress=events.append
+            )
+        )
+
+    concurrent, sequential = research(True), research(False)
+
+    def searches(result):
+        return sorted(
+            (result_set["engine"], result_set["query"]) for result_set in result["search_results"]
+        )
+
+    assert searches(concurrent) == searches(sequential)
+    assert concurrent["search_plan"]["executed"] == len(concurrent["search_results"])
+    assert concurrent["total_results"] == sequential["total_results"] > 0
+    assert concurrent["failed_searches"] == sequential["failed_searches"] == []
+    assert events[-1]["progress"] == events[-1]["total"]
+
+
+def test_local_index_searches_run_beside_web_searches(fake_services, tmp_path):
+    from local_index import LocalGrantIndex
+
+    index = LocalGrantIndex(str(tmp_path / "index.sqlite"))
+    index.add(
+        [
+            {
+                "title": "Rural Community Grant",
+                "url": "https://grants.example.gov/rural",
+                "description": "Funding for rural community projects.",
+            }
+        ]
+    )
+    agent = _live_agent(
+        fake_services, local_index=index, enable_local_index=True, enable_query_planner=False
+    )
+
+    result = asyncio.run(agent.research_grants(CRITERIA, depth="basic"))
+    index.close()
+
+    engines = {result_set["engine"] for result_set in result["search_results"]}
+    assert SearchEngine.LOCAL.value in engines and SearchEngine.GOOGLE.value in engines
+    assert result["failed_searches"] == []
+
+
+def test_timeout_aborts_a_run_with_slow_searches():
+    fakes = pytest.importorskip("fake_services")
+    services = fakes.start_fake_services(
+        fakes.FakeServiceConfig(latency_ms=3000, jitter=0), fakes.FakeServiceConfig(latency_ms=5)
+    )
+    agent = _live_agent(services, search_timeout=None)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(agent.research_grants(CRITERIA, depth="basic", timeout=0.3))
+    finally:
+        for server in services["servers"]:
+            server.shutdown()
+            server.server_close()
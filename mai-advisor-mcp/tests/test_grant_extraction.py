@@ -0,0 +1,159 @@
+"""Tests for grant_extraction."""
+
+from datetime import date
+
+import pytest
+
+from grant_extraction import (
+    NATIONWIDE,
+    extract_record,
+    extract_records,
+    find_locations,
+    format_amount,
+    parse_amounts,
+    parse_deadline,
+)
+from search_operators import GrantSearchCriteria
+
+TODAY = date(2025, 1, 15)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Awards range from $10,000 to $50,000 per project.", (10_000, 50_000)),
+        ("Between $50K and $5K is available.", (5_000, 50_000)),
+        ("Grants of up to $250k are available.", (None, 250_000)),
+        ("Requests may be no more than $1.5 million.", (None, 1_500_000)),
+        ("Awards start at a minimum of $2,500.", (2_500, None)),
+        ("A $5 fee applies. Past awards were $7,500 and $12,000.", (7_500, 12_000)),
+        ("No dollar figures here.", (None, None)),
+    ],
+)
+def test_parse_amounts(text, expected):
+    amount_min, amount_max, matched = parse_amounts(text)
+
+    assert (amount_min, amount_max) == expected
+    assert bool(matched) == (expected != (None, None))
+
+
+def test_format_amount():
+    assert format_amount(10_000, 50_000) == "$10,000 - $50,000"
+    assert format_amount(None, 250_000) == "up to $250,000"
+    assert format_amount(2_500, None) == "$2,500+"
+    assert format_amount(5_000, 5_000) == "$5,000"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Applications are due March 15, 2025.", date(2025, 3, 15)),
+        ("Deadline: 15 April 2025", date(2025, 4, 15)),
+        ("Apply by 2025-06-01 to be considered.", date(2025, 6, 1)),
+        ("Proposals must be submitted by 07/04/2025", date(2025, 7, 4)),
+        # A date without a deadline cue is not a deadline
+        ("Posted on February 2, 2025. Read the guidelines.", None),
+        # The cue must be in the date's own sentence
+        ("Apply online. Posted February 2, 2025", None),
+    ],
+)
+def test_parse_deadline_formats_and_cues(text, expected):
+    deadline, _, rolling = parse_deadline(text, TODAY)
+
+    assert deadline == expected
+    assert rolling is False
+
+
+def test_parse_deadline_prefers_earliest_upcoming_date():
+    text = "Round 1 closes 2025-01-01. Round 2 closes 2025-05-01. Round 3 closes 2025-03-01."
+
+    deadline, snippet, _ = parse_deadline(text, TODAY)
+
+    assert deadline == date(2025, 3, 1)
+    assert snippet.endswith("2025-03-01")
+
+
+def test_parse_deadline_returns_latest_when_all_passed():
+    deadline, _, _ = parse_deadline("Deadline: 2024-06-01. Due 2024-09-30.", TODAY)
+
+    assert deadline == date(2024, 9, 30)
+
+
+def test_parse_deadline_uses_letter_of_intent_only_as_fallback():
+    both = "Letters of intent due February 1, 2025. Full applications due 04/30/2025."
+    loi_only = "Letters of intent due February 1, 2025."
+
+    assert parse_deadline(both, TODAY)[0] == date(2025, 4, 30)
+    assert parse_deadline(loi_only, TODAY)[0] == date(2025, 2, 1)
+
+
+def test_parse_deadline_detects_rolling():
+    deadline, _, rolling = parse_deadline("Applications are accepted on a rolling basis.", TODAY)
+
+    assert deadline is None
+    assert rolling is True
+
+
+def test_find_locations():
+    assert find_locations("Open to nonprofits in Michigan and Wisconsin.") == [
+        "michigan",
+        "wisconsin",
+    ]
+    assert NATIONWIDE in find_locations("Organizations nationwide are eligible.")
+    assert find_locations("No geography stated.") == []
+
+
+def test_extract_record_flags_expired_deadline_and_facts():
+    result = {
+        "url": "https://example.org/grant",
+        "title": "Rural Capacity Grant",
+        "content": "Awards up to $40,000. Eligible: 501(c)(3) nonprofits. Deadline: 2024-12-01.",
+    }
+
+    record = extract_record(result, engine="google", today=TODAY)
+
+    assert record.amount_max == 40_000
+    assert record.deadline == "2024-12-01"
+    assert record.expired is True
+    assert record.engines == ["google"]
+    assert {"501(c)(3)", "nonprofit"} <= set(record.eligibility)
+    assert record.facts_line() == (
+        "amount up to $40,000; deadline 2024-12-01 (passed); "
+        f"eligible: {', '.join(record.eligibility)}"
+    )
+
+
+def test_extract_records_keys_by_canonical_url_first_wins():
+    search_results = [
+        {
+            "engine": "google",
+            "results": {
+                "results": [
+                    {
+                        "url": "https://example.org/a",
+                        "canonical_url": "https://example.org/a",
+                        "title": "A",
+                        "content": "Up to $10,000.",
+                    },
+                ]
+            },
+        },
+        {
+            "engine": "bing",
+            "results": {
+                "results": [
+                    {
+                        "url": "http://example.org/a",
+                        "canonical_url": "https://example.org/a",
+                        "title": "A again",
+                        "content": "Up to $99,000.",
+                    },
+                ]
+            },
+        },
+    ]
+
+    records = extract_records(search_results, GrantSearchCriteria(keywords=["rural"]), today=TODAY)
+
+    assert list(records) == ["https://example.org/a"]
+    assert records["https://example.org/a"].amount_max == 10_000
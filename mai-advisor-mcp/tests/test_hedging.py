@@ -0,0 +1,152 @@
+"""Tests for hedging: adaptive delay, hedged attempts and the extra-load budget."""
+
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+from hedging import HedgePolicy, configure_hedging, get_hedge_policy, hedging_stats
+
+
+def _policy(**settings):
+    settings.setdefault("initial_delay", 0.02)
+    return HedgePolicy("test", **settings)
+
+
+def test_delay_uses_initial_value_until_enough_samples():
+    policy = _policy(initial_delay=1.0, min_delay=0.1, max_delay=2.0, min_samples=3, quantile=50)
+
+    policy._observe(0.5)
+    policy._observe(0.5)
+    assert policy.delay() == 1.0
+
+    policy._observe(0.5)
+    assert policy.delay() == pytest.approx(0.5)
+
+    for _ in range(10):
+        policy._observe(30.0)
+    assert policy.delay() == 2.0
+
+
+def test_fast_call_is_not_hedged():
+    policy = _policy(initial_delay=5.0)
+
+    assert policy.run(lambda: "answer") == "answer"
+    assert (policy.metrics["calls"], policy.metrics["hedged"]) == (1, 0)
+
+
+def _slow_then_fast(release):
+    """Blocking call whose first attempt waits for ``release`` and later ones answer at once."""
+    attempts = itertools.count()
+
+    def call():
+        if next(attempts) == 0:
+            release.wait(5)
+            return "primary"
+        return "hedge"
+
+    return call
+
+
+def test_run_hedges_a_slow_call_and_takes_the_first_answer():
+    policy = _policy()
+    release = threading.Event()
+    try:
+        assert policy.run(_slow_then_fast(release)) == "hedge"
+    finally:
+        release.set()
+
+    stats = policy.stats()
+    assert (stats["hedged"], stats["hedge_wins"], stats["primary_wins"]) == (1, 1, 0)
+    assert stats["hedge_rate"] == 1.0
+
+
+def test_run_waits_for_the_primary_when_the_budget_is_spent():
+    policy = _policy(burst=1, max_extra_load=0)
+    release = threading.Event()
+    try:
+        assert policy.run(_slow_then_fast(release)) == "hedge"
+    finally:
+        release.set()
+
+    second = threading.Event()
+    threading.Timer(0.1, second.set).start()
+    assert policy.run(_slow_then_fast(second)) == "primary"
+    assert (policy.metrics["hedged"], policy.metrics["budget_denied"]) == (1, 1)
+
+
+def test_run_raises_the_primarys_error_when_both_attempts_fail():
+    policy = _policy()
+    attempts = itertools.count()
+
+    def fail():
+        attempt = next(attempts)
+        if attempt == 0:
+            threading.Event().wait(0.1)
+        raise RuntimeError(f"attempt {attempt}")
+
+    with pytest.raises(RuntimeError, match="attempt 0"):
+        policy.run(fail)
+    assert policy.metrics["hedged"] == 1
+
+
+def test_arun_hedges_and_cancels_the_slow_primary():
+    policy = _policy()
+
+    async def scenario():
+        cancelled = asyncio.Event()
+        attempts = itertools.count()
+
+        async def call():
+            if next(attempts) == 0:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return "primary"
+            return "hedge"
+
+        result = await policy.arun(call)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return result
+
+    assert asyncio.run(scenario()) == "hedge"
+    assert (policy.metrics["hedged"], policy.metrics["hedge_wins"]) == (1, 1)
+
+
+def test_arun_waits_for_the_primary_when_the_budget_is_denied():
+    policy = _policy(burst=1, max_extra_load=0)
+    policy._tokens = 0
+    attempts = itertools.count()
+
+    async def call():
+        next(attempts)
+        await asyncio.sleep(0.1)
+        return "primary"
+
+    assert asyncio.run(policy.arun(call)) == "primary"
+    assert next(attempts) == 1
+    assert (policy.metrics["hedged"], policy.metrics["budget_denied"]) == (0, 1)
+
+
+def test_arun_raises_the_primarys_error_when_both_attempts_fail():
+    policy = _policy()
+    attempts = itertools.count()
+
+    async def fail():
+        attempt = next(attempts)
+        await asyncio.sleep(0.1 if attempt == 0 else 0)
+        raise ConnectionError(f"attempt {attempt}")
+
+    with pytest.raises(ConnectionError, match="attempt 0"):
+        asyncio.run(policy.arun(fail))
+    assert policy.metrics["hedged"] == 1
+
+
+def test_policies_are_shared_per_provider():
+    configured = configure_hedging("hedge-test", initial_delay=0.5)
+
+    assert get_hedge_policy("hedge-test") is configured
+    assert hedging_stats()["hedge-test"]["delay_seconds"] == 0.5
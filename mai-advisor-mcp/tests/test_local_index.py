@@ -0,0 +1,190 @@
+"""Tests for local_index."""
+
+import json
+import zipfile
+from datetime import date
+
+import pytest
+
+from local_index import LocalGrantIndex, _fallback_match, parse_query
+
+TODAY = date(2025, 1, 15)
+
+GRANTS_GOV_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Grants xmlns="http://apply.grants.gov/system/OpportunityDetail-V1.0">
+  <OpportunitySynopsisDetail_1_0>
+    <OpportunityID>1001</OpportunityID>
+    <OpportunityTitle>Tribal Health &amp; Wellness Program</OpportunityTitle>
+    <OpportunityNumber>HHS-2025-01</OpportunityNumber>
+    <AgencyName>Indian Health Service</AgencyName>
+    <CloseDate>03152025</CloseDate>
+    <AwardFloor>10000</AwardFloor>
+    <AwardCeiling>250,000</AwardCeiling>
+    <EligibleApplicants>07</EligibleApplicants>
+    <EligibleApplicants>11</EligibleApplicants>
+    <Description>&lt;p&gt;Supports community wellness programs.&lt;/p&gt;</Description>
+  </OpportunitySynopsisDetail_1_0>
+  <OpportunityForecastDetail_1_0>
+    <OpportunityID>1002</OpportunityID>
+    <OpportunityTitle>Rural Broadband Forecast</OpportunityTitle>
+    <EstimatedApplicationDueDate>06302025</EstimatedApplicationDueDate>
+    <Description>Broadband deployment in rural areas.</Description>
+  </OpportunityForecastDetail_1_0>
+  <OpportunitySynopsisDetail_1_0>
+    <OpportunityTitle>Listing without an ID is skipped</OpportunityTitle>
+  </OpportunitySynopsisDetail_1_0>
+</Grants>
+"""
+
+LISTINGS = [
+    {
+        "source_id": "solar",
+        "title": "Community Solar Grant",
+        "url": "https://grants.example.gov/solar",
+        "description": "Renewable energy grants for community solar projects.",
+        "close_date": "2025-02-20",
+        "award_floor": 5000,
+        "award_ceiling": 50000,
+    },
+    {
+        "source_id": "loan",
+        "title": "Renewable Energy Loan Program",
+        "url": "https://grants.example.gov/loan",
+        "description": "Low-interest loan financing for renewable energy upgrades.",
+        "close_date": "2025-09-01",
+        "award_floor": 100000,
+    },
+    {
+        "source_id": "wind",
+        "title": "Wind Energy Research",
+        "url": "https://grants.example.gov/wind",
+        "description": "Research funding for wind energy.",
+    },
+    {
+        "source_id": "expired",
+        "title": "Expired Renewable Energy Grant",
+        "url": "https://grants.example.gov/expired",
+        "description": "Renewable energy grant that already closed.",
+        "close_date": "2024-12-31",
+    },
+    {"title": "Listing without a URL is skipped"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = LocalGrantIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def corpus(index):
+    index.add(LISTINGS)
+    return index
+
+
+def _urls(response):
+    return [hit["url"] for hit in response["results"]]
+
+
+def test_parse_query_splits_filters():
+    assert parse_query('"tribal" OR health  deadline_months:6 amount_min:5000') == (
+        '"tribal" OR health',
+        {"deadline_months": 6, "amount_min": 5000},
+    )
+
+
+def test_ingest_grants_gov_xml_and_zip(index, tmp_path):
+    xml_path = tmp_path / "extract.xml"
+    xml_path.write_text(GRANTS_GOV_XML, encoding="utf-8")
+    zip_path = tmp_path / "extract.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.write(xml_path, "GrantsDBExtract.xml")
+
+    assert index.ingest(str(xml_path))["stored"] == 2
+    # Re-ingesting the same listings updates them in place
+    summary = index.ingest(str(zip_path))
+    assert (summary["stored"], summary["listings"]) == (2, 2)
+
+    [hit] = index.search("wellness", today=TODAY)["results"]
+    assert hit["url"] == "https://www.grants.gov/search-results-detail/1001"
+    assert hit["title"] == "Tribal Health & Wellness Program"
+    assert "Application deadline: March 15, 2025" in hit["raw_content"]
+    assert "Award ceiling: $250,000" in hit["raw_content"]
+    assert "Native American tribal governments (Federally recognized)" in hit["raw_content"]
+    assert "<p>" not in hit["raw_content"]
+
+
+def test_ingest_jsonl_skips_blank_lines_and_rejects_unknown_formats(index, tmp_path):
+    path = tmp_path / "listings.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in LISTINGS) + "\n\n", encoding="utf-8")
+
+    assert index.ingest(str(path))["stored"] == 4
+    with pytest.raises(ValueError):
+        index.ingest(str(tmp_path / "listings.csv"))
+
+
+def test_search_excludes_expired_listings(corpus):
+    urls = _urls(corpus.search("renewable", max_results=10, today=TODAY))
+
+    assert "https://grants.example.gov/expired" not in urls
+    assert set(urls) == {"https://grants.example.gov/solar", "https://grants.example.gov/loan"}
+
+
+def test_search_deadline_filter_drops_undated_and_late_listings(corpus):
+    response = corpus.search("energy deadline_months:2", max_results=10, today=TODAY)
+
+    assert _urls(response) == ["https://grants.example.gov/solar"]
+
+
+def test_search_amount_filters_overlap_award_range(corpus):
+    large = corpus.search("energy amount_min:75000", max_results=10, today=TODAY)
+    small = corpus.search("energy amount_max:20000", max_results=10, today=TODAY)
+
+    assert set(_urls(large)) == {
+        "https://grants.example.gov/loan",
+        "https://grants.example.gov/wind",
+    }
+    assert set(_urls(small)) == {
+        "https://grants.example.gov/solar",
+        "https://grants.example.gov/wind",
+    }
+
+
+def test_search_without_terms_lists_by_deadline(corpus):
+    response = corpus.search("amount_max:1000000", max_results=10, today=TODAY)
+
+    assert _urls(response) == [
+        "https://grants.example.gov/solar",
+        "https://grants.example.gov/loan",
+        "https://grants.example.gov/wind",
+    ]
+    assert all(hit["score"] == 0.0 for hit in response["results"])
+
+
+def test_scores_are_positive_and_ordered_on_small_corpus(corpus):
+    hits = corpus.search("renewable energy", max_results=10, today=TODAY)["results"]
+
+    scores = [hit["score"] for hit in hits]
+    assert scores and all(score > 0 for score in scores)
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ('"renewable energy" grant -loan', '("renewable energy" OR "grant") NOT ("loan")'),
+        ('intitle:solar site:gov filetype:pdf -"student loan"', '("solar") NOT ("student loan")'),
+        ("(tribal OR health) AND", '"tribal" OR "health"'),
+        ("-loan site:gov", ""),
+    ],
+)
+def test_fallback_match(expression, expected):
+    assert _fallback_match(expression) == expected
+
+
+def test_web_style_dork_falls_back_and_honors_exclusions(corpus):
+    response = corpus.search('"renewable energy" -loan site:gov', max_results=10, today=TODAY)
+
+    assert _urls(response) == ["https://grants.example.gov/solar"]
@@ -0,0 +1,86 @@
+"""Tests for model_routing and the agent's triage / synthesis tiers."""
+
+import asyncio
+from types import SimpleNamespace
+
+from context_builder import estimate_tokens
+from model_routing import SYNTHESIS, TRIAGE, ModelUsage, parse_triage, response_tokens
+
+
+def test_parse_triage_drops_only_named_results():
+    reply = "1: KEEP\n2: DROP\nResult 3 - drop\n9: DROP\n"
+
+    assert parse_triage(reply, 4) == {1, 4}
+
+
+def test_parse_triage_fails_open_on_unrecognized_reply():
+    assert parse_triage("I cannot help with that.", 3) == {1, 2, 3}
+
+
+def test_response_tokens_prefers_reported_usage():
+    message = SimpleNamespace(usage_metadata={"input_tokens": 120, "output_tokens": 30})
+
+    assert response_tokens(message, "prompt", "text") == (120, 30, False)
+
+
+def test_response_tokens_estimates_without_usage():
+    prompt, text = "Find rural health grants " * 10, "Three grants match."
+
+    assert response_tokens(object(), prompt, text) == (
+        estimate_tokens(prompt),
+        estimate_tokens(text),
+        True,
+    )
+
+
+def test_model_usage_summarizes_each_tier():
+    usage = ModelUsage()
+    usage.record(TRIAGE, "fast", 0.5, 100, 10)
+    usage.record(TRIAGE, "fast", 1.5, 200, 20, estimated=True)
+    usage.record_cached(TRIAGE)
+    usage.record(SYNTHESIS, "strong", 4.0, 1000, 300)
+
+    summary = usage.summary()
+
+    triage = summary[TRIAGE]
+    assert triage["models"] == ["fast"]
+    assert (triage["calls"], triage["cached"], triage["estimated_calls"]) == (2, 1, 1)
+    assert (triage["input_tokens"], triage["output_tokens"]) == (300, 30)
+    assert triage["latency"]["count"] == 2
+    assert summary[SYNTHESIS]["models"] == ["strong"]
+
+
+def _research(fake_services, **kwargs):
+    from grant_agent import GrantResearchAgent
+    from search_operators import GrantSearchCriteria
+
+    agent = GrantResearchAgent(
+        tavily_api_key="test",
+        openrouter_api_key="test",
+        tavily_base_url=fake_services["search_url"],
+        openrouter_base_url=fake_services["llm_url"],
+        model_name="strong/model",
+        enable_search_cache=False,
+        enable_llm_cache=False,
+        enable_checkpoints=False,
+        enable_opportunity_store=False,
+        **kwargs,
+    )
+    criteria = GrantSearchCriteria(keywords=["renewable energy"])
+    return asyncio.run(agent.research_grants(criteria, depth="deep"))
+
+
+def test_triage_runs_on_the_fast_model_and_synthesis_on_the_strong_one(fake_services):
+    usage = _research(fake_services, fast_model_name="fast/model")["model_usage"]
+
+    assert usage[TRIAGE]["models"] == ["fast/model"]
+    assert usage[TRIAGE]["calls"] >= 1
+    assert usage[SYNTHESIS]["models"] == ["strong/model"]
+    assert usage[SYNTHESIS]["calls"] == 1
+
+
+def test_without_a_fast_model_both_tiers_use_the_strong_model(fake_services):
+    usage = _research(fake_services)["model_usage"]
+
+    assert all(tier_usage["models"] == ["strong/model"] for tier_usage in usage.values())
+    assert usage[SYNTHESIS]["calls"] == 1
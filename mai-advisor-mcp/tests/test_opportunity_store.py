@@ -0,0 +1,141 @@
+"""Tests for opportunity_store."""
+
+from datetime import date
+
+import pytest
+
+from grant_extraction import NATIONWIDE, GrantRecord
+from opportunity_store import OpportunityStore, funder_of, title_key
+from search_operators import GrantSearchCriteria
+
+TODAY = date(2025, 1, 15)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OpportunityStore(str(tmp_path / "opportunities.sqlite"))
+    yield store
+    store.close()
+
+
+def _record(url, title="Rural Capacity Grant", **facts):
+    return GrantRecord(title=title, url=url, **facts)
+
+
+def test_funder_and_title_normalization():
+    assert funder_of("https://www.Example.org/grants/a") == "example.org"
+    assert funder_of("https://grants.example.org/a") == "grants.example.org"
+    assert title_key("Rural Capacity Grant (2025)!") == "rural capacity grant 2025"
+
+
+def test_upsert_merges_same_url_and_same_funder_title(store):
+    criteria = GrantSearchCriteria(keywords=["rural"])
+
+    first = store.upsert([_record("https://example.org/a", amount_max=50_000)], criteria)
+    again = store.upsert(
+        [
+            _record("https://example.org/a", deadline="2025-03-01", eligibility=["nonprofit"]),
+            _record("https://www.example.org/other", title="Rural capacity grant"),
+        ],
+        criteria,
+    )
+
+    assert first == {"inserted": 1, "updated": 0}
+    assert again == {"inserted": 0, "updated": 2}
+    [stored] = store.find(criteria, today=TODAY)
+    assert stored["url"] == "https://example.org/a"
+    assert stored["times_seen"] == 3
+    # Missing facts keep the stored values, new ones fill in
+    assert stored["amount_max"] == 50_000
+    assert stored["deadline"] == "2025-03-01"
+    assert stored["eligibility"] == ["nonprofit"]
+
+
+def test_upsert_skips_records_without_url(store):
+    assert store.upsert([_record("")]) == {"inserted": 0, "updated": 0}
+    assert store.stats()["total"] == 0
+
+
+def test_find_matches_keyword_tag_or_title(store):
+    store.upsert(
+        [_record("https://a.org/1", title="Solar Fund")], GrantSearchCriteria(keywords=["energy"])
+    )
+    store.upsert([_record("https://b.org/1", title="Youth Arts Grant")])
+
+    by_tag = store.find(GrantSearchCriteria(keywords=["Energy"]), today=TODAY)
+    by_title = store.find(GrantSearchCriteria(keywords=["youth arts"]), today=TODAY)
+
+    assert [row["url"] for row in by_tag] == ["https://a.org/1"]
+    assert [row["url"] for row in by_title] == ["https://b.org/1"]
+
+
+def test_find_excludes_expired_and_applies_deadline_window(store):
+    store.upsert(
+        [
+            _record("https://a.org/past", title="Past", deadline="2024-12-01"),
+            _record("https://a.org/soon", title="Soon", deadline="2025-02-01"),
+            _record("https://a.org/later", title="Later", deadline="2025-12-01"),
+            _record("https://a.org/rolling", title="Rolling", rolling=True),
+        ]
+    )
+
+    current = store.find(GrantSearchCriteria(keywords=[]), today=TODAY)
+    within = store.find(GrantSearchCriteria(keywords=[], deadline_months=3), today=TODAY)
+    everything = store.find(GrantSearchCriteria(keywords=[]), today=TODAY, include_expired=True)
+
+    # Soonest deadline first, undated last
+    assert [row["title"] for row in current] == ["Soon", "Later", "Rolling"]
+    assert [row["title"] for row in within] == ["Soon", "Rolling"]
+    assert len(everything) == 4
+
+
+def test_find_filters_on_overlapping_amount_range(store):
+    store.upsert(
+        [
+            _record("https://a.org/small", title="Small", amount_max=5_000),
+            _record("https://a.org/mid", title="Mid", amount_min=20_000, amount_max=60_000),
+            _record("https://a.org/large", title="Large", amount_min=500_000),
+            _record("https://a.org/unknown", title="Unknown"),
+        ]
+    )
+    criteria = GrantSearchCriteria(keywords=[], amount_min=10_000, amount_max=100_000)
+
+    matched = {row["title"] for row in store.find(criteria, today=TODAY)}
+    known = {row["title"] for row in store.find(criteria, today=TODAY, require_amount=True)}
+
+    assert matched == {"Mid", "Unknown"}
+    assert known == {"Mid"}
+
+
+def test_find_location_uses_extracted_scope_before_search_tags(store):
+    searched_in_michigan = GrantSearchCriteria(keywords=[], location="Michigan")
+    store.upsert(
+        [_record("https://a.org/wi", title="Wisconsin only", locations=["wisconsin"])],
+        searched_in_michigan,
+    )
+    store.upsert([_record("https://a.org/us", title="National", locations=[NATIONWIDE])])
+    store.upsert([_record("https://a.org/mi", title="Unscoped")], searched_in_michigan)
+    store.upsert([_record("https://a.org/none", title="Elsewhere")])
+
+    found = store.find(GrantSearchCriteria(keywords=[], location="Michigan"), today=TODAY)
+
+    assert {row["title"] for row in found} == {"National", "Unscoped"}
+    assert next(row for row in found if row["title"] == "National")["locations"] == [NATIONWIDE]
+
+
+def test_stats_counts_facts(store):
+    store.upsert(
+        [
+            _record("https://a.org/1", title="One", amount_max=1_000, deadline="2025-05-01"),
+            _record("https://b.org/2", title="Two"),
+        ]
+    )
+
+    stats = store.stats()
+
+    assert (stats["total"], stats["with_deadline"], stats["with_amount"], stats["funders"]) == (
+        2,
+        1,
+        1,
+        2,
+    )
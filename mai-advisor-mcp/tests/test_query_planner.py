@@ -0,0 +1,146 @@
+"""Tests for query_planner."""
+
+import pytest
+
+from query_planner import (
+    PlannedQuery,
+    QueryHistory,
+    QueryPlanner,
+    SearchBudget,
+    count_new_relevant,
+    estimate_wall_time,
+    yield_flattened,
+)
+from search_operators import SearchEngine
+
+CANDIDATES = {
+    SearchEngine.GOOGLE: ["g0", "g1"],
+    SearchEngine.BING: ["b0", "b1"],
+    SearchEngine.LOCAL: ["l0"],
+}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = QueryHistory(str(tmp_path / "history.sqlite"), alpha=0.3)
+    yield history
+    history.close()
+
+
+def test_history_first_call_sets_then_ewma_updates(history):
+    history.record("google", 0, 4, 2.0)
+    assert history.stats()[("google", 0)].mean_yield == 4.0
+
+    history.record("google", 0, 0, 1.0)
+    history.record("google", 0, 10, 1.0)
+
+    stats = history.stats()[("google", 0)]
+    assert stats.calls == 3
+    # 4 -> 4 + 0.3 * (0 - 4) = 2.8 -> 2.8 + 0.3 * (10 - 2.8) = 4.96
+    assert stats.mean_yield == pytest.approx(4.96)
+    # 2 -> 1.7 -> 1.49
+    assert stats.mean_latency == pytest.approx(1.49)
+    assert ("google", 1) not in history.stats()
+
+
+def test_history_persists_across_connections(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    first = QueryHistory(path)
+    first.record("bing", 1, 3, 0.5)
+    first.close()
+
+    reopened = QueryHistory(path)
+    try:
+        assert reopened.stats()[("bing", 1)].calls == 1
+    finally:
+        reopened.close()
+
+
+def test_plan_without_history_spreads_across_engines_within_cost(history):
+    planner = QueryPlanner(history)
+
+    plan = planner.plan(CANDIDATES, SearchBudget(max_cost=2, min_yield=0))
+
+    # Free local calls go first; a second Google query is discounted below Bing's first
+    assert [(query.engine, query.variant) for query in plan] == [
+        (SearchEngine.LOCAL, 0),
+        (SearchEngine.GOOGLE, 0),
+        (SearchEngine.BING, 0),
+    ]
+    assert sum(query.cost for query in plan) == 2
+
+
+def test_plan_prefers_high_yield_and_drops_low_yield_variants(history):
+    for _ in range(5):
+        history.record("google", 0, 6, 1.0)
+        history.record("google", 1, 0, 1.0)
+        history.record("bing", 0, 0, 1.0)
+        history.record("bing", 1, 0, 1.0)
+        history.record("local", 0, 0, 0.1)
+
+    plan = QueryPlanner(history).plan(CANDIDATES, SearchBudget(max_cost=10, min_yield=0.8))
+
+    assert plan[0].engine is SearchEngine.GOOGLE and plan[0].variant == 0
+    # Variants whose blended yield is below min_yield are never added
+    assert all(query.expected_yield >= 0.8 for query in plan[1:])
+    assert (SearchEngine.BING, 1) not in {(query.engine, query.variant) for query in plan}
+
+
+def test_plan_respects_latency_budget(history):
+    for variant in (0, 1):
+        history.record("google", variant, 3, 10.0)
+        history.record("bing", variant, 3, 10.0)
+
+    plan = QueryPlanner(history).plan(
+        {SearchEngine.GOOGLE: ["g0", "g1"], SearchEngine.BING: ["b0", "b1"]},
+        SearchBudget(max_cost=10, max_latency=8.0, min_yield=0),
+        concurrency=2,
+    )
+
+    # One observation blends halfway to the 2s prior: 6s per call, so one wave of two fits
+    assert len(plan) == 2
+    assert estimate_wall_time(plan, 2) == pytest.approx(6.0)
+
+
+def test_estimate_wall_time_sums_slowest_per_wave():
+    def planned(latency):
+        return PlannedQuery(SearchEngine.GOOGLE, 0, "q", 1.0, latency, 1.0)
+
+    queries = [planned(1.0), planned(3.0), planned(2.0)]
+
+    assert estimate_wall_time(queries, 2) == 5.0
+    assert estimate_wall_time(queries, 3) == 3.0
+    assert estimate_wall_time(queries, 0) == 6.0
+
+
+@pytest.mark.parametrize(
+    "wave_yield, first_yield, stop",
+    [
+        (4.0, 4.0, False),
+        (0.4, 4.0, True),  # under min_yield
+        (0.9, 4.0, True),  # under flatten_ratio of the first wave
+        (1.0, 4.0, False),
+        (0.6, 1.0, False),
+    ],
+)
+def test_yield_flattened(wave_yield, first_yield, stop):
+    budget = SearchBudget(min_yield=0.5, flatten_ratio=0.25)
+
+    assert yield_flattened(wave_yield, first_yield, budget) is stop
+
+
+def test_count_new_relevant_marks_urls_seen():
+    result_set = {
+        "results": {
+            "results": [
+                {"url": "https://a.org/rural", "title": "Rural housing grant"},
+                {"url": "https://a.org/other", "title": "Unrelated page"},
+                {"url": "http://www.a.org/rural/", "title": "Rural housing grant"},
+            ]
+        }
+    }
+    seen = set()
+
+    assert count_new_relevant(result_set, {"rural", "housing"}, seen) == 1
+    assert seen == {"https://a.org/rural", "https://a.org/other"}
+    assert count_new_relevant(result_set, {"rural", "housing"}, seen) == 0
@@ -0,0 +1,229 @@
+"""Tests for resilience."""
+
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, ProviderGuard, TokenBucket, is_retryable
+
+
+class FakeClock:
+    """Stands in for the time module: monotonic() is frozen, sleep() advances it."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_is_retryable():
+    assert is_retryable(ProviderError(429))
+    assert is_retryable(ProviderError(503))
+    assert not is_retryable(ProviderError(401))
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(ConnectionResetError())
+    assert not is_retryable(ValueError("bad request"))
+    assert not is_retryable(CircuitOpenError("tavily", 1.0))
+
+
+def test_breaker_opens_then_half_opens_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    assert breaker.before_call() == (None, False)
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.before_call() == (30, False)
+
+    clock.now += 30
+    assert breaker.before_call() == (None, True)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.before_call() == (None, False)
+
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.before_call() == (None, True)
+    # Everyone else waits for the probe's verdict
+    assert breaker.before_call() == (10, False)
+    assert breaker.before_call() == (10, False)
+
+    # A failed probe reopens the circuit for another cool-down
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 5
+    assert breaker.before_call() == (5, False)
+    clock.now += 5
+    assert breaker.before_call() == (None, True)
+
+    # A probe without a verdict hands the slot to the next caller
+    breaker.release_probe()
+    assert breaker.before_call() == (None, True)
+
+
+def test_guard_retries_and_honours_retry_after(clock):
+    guard = ProviderGuard("test", rate_per_second=0, max_attempts=3, base_delay=0.01, max_delay=20)
+    outcomes = [ProviderError(429, {"retry-after": "7"}), ProviderError(503), "ok"]
+
+    def request():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert guard.call(request) == "ok"
+    assert clock.sleeps[0] == 7
+    assert clock.sleeps[1] <= 0.02
+    assert guard.stats()["retries"] == 2
+
+
+def test_guard_does_not_retry_client_errors(clock):
+    guard = ProviderGuard("test", rate_per_second=0, max_attempts=3)
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise ProviderError(401)
+
+    with pytest.raises(ProviderError):
+        guard.call(request)
+    assert len(calls) == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guard_short_circuits_while_open(clock):
+    guard = ProviderGuard("test", rate_per_second=0, max_attempts=1, failure_threshold=1)
+
+    def request():
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        guard.call(request)
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: "never called")
+    stats = guard.stats()
+    assert (stats["circuit_opens"], stats["short_circuited"]) == (1, 1)
+    assert stats["circuit_state"] == CircuitBreaker.OPEN
+
+
+def test_concurrent_callers_send_one_probe_when_half_open(clock):
+    guard = ProviderGuard("test", rate_per_second=0, max_attempts=1, failure_threshold=1)
+    guard.breaker.record_failure()
+    clock.now += guard.breaker.reset_timeout
+    started = []
+
+    async def request():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def burst():
+        return await asyncio.gather(
+            *(guard.acall(request) for _ in range(5)), return_exceptions=True
+        )
+
+    outcomes = asyncio.run(burst())
+
+    assert len(started) == 1
+    assert outcomes.count("ok") == 1
+    assert all(isinstance(o, CircuitOpenError) for o in outcomes if o != "ok")
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_lets_the_next_caller_probe(clock):
+    guard = ProviderGuard("test", rate_per_second=0, failure_threshold=1)
+    guard.breaker.record_failure()
+    clock.now += guard.breaker.reset_timeout
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancel_probe():
+        task = asyncio.create_task(guard.acall(hang))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+
+    assert guard.breaker.before_call() == (None, True)
+
+
+def test_cancelled_wait_refunds_the_rate_limit_token(clock):
+    guard = ProviderGuard("test", rate_per_second=1, burst=1)
+
+    async def request():
+        return "ok"
+
+    async def run():
+        assert await guard.acall(request) == "ok"
+        waiting = asyncio.create_task(guard.acall(request))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(run())
+
+    assert guard.stats()["cancelled"] == 1
+    # Only the completed call's token is spent, so the next caller waits one interval
+    assert guard.bucket.reserve() == pytest.approx(1.0)
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=2)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    clock.now += 1.5
+    assert bucket.reserve() == 0.0
+
+
+@pytest.mark.parametrize(
+    "error", ["ConnectError", "ReadError", "RemoteProtocolError", "ReadTimeout"]
+)
+def test_httpx_transport_errors_are_retryable(error):
+    httpx = pytest.importorskip("httpx")
+
+    assert is_retryable(getattr(httpx, error)("connection dropped"))
+
+
+def test_httpx_connect_errors_are_retried_and_open_the_circuit(clock):
+    httpx = pytest.importorskip("httpx")
+    guard = ProviderGuard("test", rate_per_second=0, max_attempts=2, failure_threshold=2)
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise httpx.ConnectError("connection refused")
+
+    with pytest.raises(httpx.ConnectError):
+        guard.call(request)
+    assert len(calls) == 2
+    assert guard.breaker.state == CircuitBreaker.OPEN
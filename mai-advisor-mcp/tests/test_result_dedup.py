@@ -0,0 +1,104 @@
+"""Tests for result_dedup."""
+
+from result_dedup import (
+    NearDuplicateIndex,
+    canonicalize_url,
+    deduplicate_results,
+    hamming_distance,
+    simhash,
+)
+
+LISTING = (
+    "The community foundation awards capacity building grants to nonprofit organizations "
+    "serving rural counties. Eligible applicants must hold 501c3 status and operate programs "
+    "in education, health, housing or workforce development. Awards range from ten thousand "
+    "to fifty thousand dollars for one year projects, and applicants may request technical "
+    "assistance from program staff before submitting a full proposal through the online "
+    "portal. Priority is given to organizations with budgets under one million dollars that "
+    "have not received foundation support in the past three years. Proposals should describe "
+    "the need, the population served, measurable outcomes, a detailed budget, and a plan for "
+    "sustaining the work after the grant period ends. Site visits may be scheduled for "
+    "finalists during the review period, and final decisions are announced by the board of "
+    "trustees each fall."
+)
+MIRROR = LISTING + " Updated 2025."
+OTHER = (
+    "The state arts council funds individual artists for new public murals, performances "
+    "and community workshops that bring residents together across neighborhoods, with "
+    "priority for first time applicants and projects in underserved towns."
+)
+
+
+def _result_set(engine, query, hits):
+    return {"engine": engine, "query": query, "results": {"results": hits}}
+
+
+def test_canonicalize_url_collapses_trivial_differences():
+    url = "http://WWW.Example.org:80/grants//rural/?utm_source=x&b=2&a=1#apply"
+    assert canonicalize_url(url) == "https://example.org/grants/rural?a=1&b=2"
+    assert canonicalize_url("https://example.org/") == "https://example.org/"
+    assert canonicalize_url("not a url") == "not a url"
+    assert canonicalize_url("") == ""
+
+
+def test_simhash_ignores_case_and_punctuation_and_skips_short_text():
+    assert simhash(LISTING) == simhash(LISTING.upper().replace(",", ""))
+    assert simhash("Too short to fingerprint") is None
+
+
+def test_simhash_near_duplicates_are_close_and_different_pages_are_not():
+    assert hamming_distance(simhash(LISTING), simhash(MIRROR)) <= 3
+    assert hamming_distance(simhash(LISTING), simhash(OTHER)) > 10
+
+
+def test_near_duplicate_index_finds_within_distance():
+    index = NearDuplicateIndex(max_distance=3)
+    fingerprint = simhash(LISTING)
+    index.add(fingerprint, "listing")
+
+    assert index.find(fingerprint ^ 0b101) == "listing"  # two bits off
+    assert index.find(fingerprint ^ 0b1111) is None  # four bits off
+    assert index.find(simhash(OTHER)) is None
+
+
+def test_deduplicate_results_merges_url_and_content_duplicates():
+    search_results = [
+        _result_set(
+            "google",
+            "rural grants",
+            [
+                {"url": "https://example.org/grant", "title": "Rural grant", "content": LISTING},
+                {"url": "https://arts.example.gov/murals", "title": "Murals", "content": OTHER},
+            ],
+        ),
+        _result_set(
+            "bing",
+            "capacity grants",
+            [
+                {"url": "http://www.example.org/grant/?utm_source=bing", "title": "Rural grant"},
+                {
+                    "url": "https://mirror.example.net/grant.pdf",
+                    "title": "Rural grant PDF",
+                    "content": MIRROR,
+                },
+            ],
+        ),
+    ]
+
+    deduped, stats = deduplicate_results(search_results)
+
+    assert stats == {"input": 4, "kept": 2, "url_duplicates": 1, "content_duplicates": 1}
+    assert [len(s["results"]["results"]) for s in deduped] == [2, 0]
+    survivor = deduped[0]["results"]["results"][0]
+    assert survivor["engines"] == ["google", "bing"]
+    assert survivor["duplicate_urls"] == [
+        "http://www.example.org/grant/?utm_source=bing",
+        "https://mirror.example.net/grant.pdf",
+    ]
+    assert survivor["provenance"] == [
+        {"engine": "google", "query": "rural grants", "rank": 1},
+        {"engine": "bing", "query": "capacity grants", "rank": 1},
+        {"engine": "bing", "query": "capacity grants", "rank": 2},
+    ]
+    # The input hits are left untouched
+    assert "provenance" not in search_results[0]["results"]["results"][0]
@@ -0,0 +1,137 @@
+"""Tests for result_filter: the vectorized masks against a per-record reference."""
+
+import math
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from context_builder import ContextSnippet
+from grant_extraction import ELIGIBILITY_LABELS, NATIONWIDE, GrantRecord, org_type_labels
+from result_filter import RecordColumns, criteria_masks, filter_records, filter_snippets
+from search_operators import GrantSearchCriteria
+
+TODAY = date(2025, 1, 15)
+STATES = ["michigan", "wisconsin", "ohio", "texas"]
+
+
+def _random_record(rng, i):
+    amount_min = rng.choice([None, 1_000, 10_000, 50_000])
+    amount_max = rng.choice([None, 5_000, 25_000, 100_000])
+    deadline = rng.choice([None, TODAY + timedelta(days=rng.randint(-60, 400))])
+    return GrantRecord(
+        title=f"grant {i}",
+        url=f"https://example.org/{i}",
+        amount_min=amount_min,
+        amount_max=amount_max,
+        deadline=deadline.isoformat() if deadline else None,
+        rolling=rng.random() < 0.15,
+        expired=bool(deadline and deadline < TODAY),
+        eligibility=rng.sample(ELIGIBILITY_LABELS, rng.randint(0, 2)),
+        locations=rng.sample(STATES + [NATIONWIDE], rng.randint(0, 2)),
+        fit=round(rng.random(), 3),
+    )
+
+
+def _scalar_passes(record, criteria, strict):
+    """One record at a time, written straight from the module's rules."""
+    low = record.amount_min or record.amount_max
+    high = record.amount_max or record.amount_min
+    if criteria.amount_min and not (high >= criteria.amount_min if low else not strict):
+        return False
+    if criteria.amount_max and not (low <= criteria.amount_max if low else not strict):
+        return False
+    if record.expired:
+        return False
+    if criteria.deadline_months and not record.rolling:
+        horizon = TODAY + timedelta(days=30 * criteria.deadline_months)
+        if record.deadline is None:
+            if strict:
+                return False
+        elif date.fromisoformat(record.deadline) > horizon:
+            return False
+    if criteria.location:
+        states = [s for s in record.locations if s != NATIONWIDE]
+        wanted = criteria.location.lower()
+        if states and NATIONWIDE not in record.locations and wanted not in states:
+            return False
+    if criteria.organization_type:
+        wanted_labels = org_type_labels(criteria.organization_type)
+        if record.eligibility and not wanted_labels & set(record.eligibility):
+            return False
+    return True
+
+
+CRITERIA = [
+    GrantSearchCriteria(keywords=["x"]),
+    GrantSearchCriteria(keywords=["x"], amount_min=20_000),
+    GrantSearchCriteria(keywords=["x"], amount_max=8_000, deadline_months=3),
+    GrantSearchCriteria(keywords=["x"], location="Michigan", organization_type="nonprofit"),
+    GrantSearchCriteria(
+        keywords=["x"],
+        amount_min=5_000,
+        amount_max=60_000,
+        deadline_months=6,
+        location="Ohio",
+        organization_type="tribal government",
+    ),
+]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+@pytest.mark.parametrize("strict", [False, True])
+def test_vectorized_filter_matches_scalar_reference(criteria, strict):
+    rng = random.Random(7)
+    records = [_random_record(rng, i) for i in range(300)]
+
+    kept, stats = filter_records(records, criteria, today=TODAY, strict=strict)
+
+    expected = [i for i, record in enumerate(records) if _scalar_passes(record, criteria, strict)]
+    expected.sort(
+        key=lambda i: (
+            -records[i].fit,
+            (
+                date.fromisoformat(records[i].deadline).toordinal()
+                if records[i].deadline
+                else math.inf
+            ),
+        )
+    )
+    assert kept.tolist() == expected
+    assert stats.total == 300
+    assert stats.kept == len(expected)
+    assert sum(stats.dropped.values()) == 300 - len(expected)
+
+
+def test_masks_are_per_criterion():
+    records = [
+        GrantRecord(title="small", url="u1", amount_max=2_000),
+        GrantRecord(title="unknown", url="u2"),
+        GrantRecord(title="texas", url="u3", amount_max=50_000, locations=["texas"]),
+    ]
+    criteria = GrantSearchCriteria(keywords=["x"], amount_min=10_000, location="Michigan")
+
+    masks = criteria_masks(RecordColumns(records), criteria, today=TODAY)
+
+    assert masks["amount_min"].tolist() == [False, True, True]
+    assert masks["location"].tolist() == [True, True, False]
+    assert "deadline_months" not in masks
+    strict = criteria_masks(RecordColumns(records), criteria, today=TODAY, strict=True)
+    assert strict["amount_min"].tolist() == [False, False, True]
+
+
+def test_filter_snippets_keeps_snippets_without_records():
+    ranked = [
+        ContextSnippet("google", "q", "closed", "u1", "", score=0.9),
+        ContextSnippet("google", "q", "no record", "u2", "", score=0.5),
+        ContextSnippet("bing", "q", "open", "u3", "", score=0.7),
+    ]
+    records = {
+        "u1": GrantRecord(title="closed", url="u1", deadline="2024-01-01", expired=True),
+        "u3": GrantRecord(title="open", url="u3", deadline="2025-02-01"),
+    }
+
+    kept, stats = filter_snippets(ranked, records, GrantSearchCriteria(keywords=["x"]), today=TODAY)
+
+    assert [s.url for s in kept] == ["u3", "u2"]
+    assert stats.to_dict() == {"total": 3, "kept": 2, "dropped": {"open": 1}}
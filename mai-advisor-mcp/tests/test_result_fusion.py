@@ -0,0 +1,75 @@
+"""Tests for result_fusion."""
+
+import pytest
+
+from result_dedup import deduplicate_results
+from result_fusion import fuse_results
+
+
+def _result_set(engine, query, urls):
+    return {
+        "engine": engine,
+        "query": query,
+        "results": {"results": [{"url": url, "title": url.rsplit("/", 1)[-1]} for url in urls]},
+    }
+
+
+def test_rrf_ranks_consensus_above_single_engine_top_hit():
+    search_results = [
+        _result_set(
+            "google", "q1", ["https://a.org/solo", "https://a.org/both", "https://a.org/g3"]
+        ),
+        _result_set("bing", "q2", ["https://a.org/b1", "https://a.org/both"]),
+    ]
+
+    fused = fuse_results(search_results, k=60)
+
+    assert [hit["canonical_url"] for hit in fused] == [
+        "https://a.org/both",
+        "https://a.org/solo",
+        "https://a.org/b1",
+        "https://a.org/g3",
+    ]
+    assert [hit["fused_rank"] for hit in fused] == [1, 2, 3, 4]
+    assert fused[0]["rrf_score"] == pytest.approx(2 / 62, abs=1e-6)
+    assert fused[1]["rrf_score"] == pytest.approx(1 / 61, abs=1e-6)
+    assert fused[0]["provenance"] == [
+        {"engine": "google", "query": "q1", "rank": 2},
+        {"engine": "bing", "query": "q2", "rank": 2},
+    ]
+
+
+def test_engine_weights_and_k_shift_the_order():
+    search_results = [
+        _result_set("google", "q", ["https://a.org/g1"]),
+        _result_set("bing", "q", ["https://a.org/b1"]),
+    ]
+
+    # Equal weights tie; the first list seen wins (stable sort)
+    assert fuse_results(search_results)[0]["url"] == "https://a.org/g1"
+    weighted = fuse_results(search_results, engine_weights={"bing": 2.0})
+    assert [hit["url"] for hit in weighted] == ["https://a.org/b1", "https://a.org/g1"]
+    assert weighted[0]["rrf_score"] == pytest.approx(2 / 61, abs=1e-6)
+
+
+def test_deduplicated_hits_keep_every_list_they_appeared_in():
+    search_results = [
+        _result_set("google", "q1", ["https://a.org/g1", "https://a.org/shared"]),
+        _result_set("bing", "q2", ["http://www.a.org/shared/?utm_source=bing", "https://a.org/b2"]),
+    ]
+    deduped, _ = deduplicate_results(search_results)
+
+    fused = fuse_results(deduped)
+
+    # The bing copy was removed by dedup but its rank still counts
+    assert fused[0]["canonical_url"] == "https://a.org/shared"
+    assert fused[0]["rrf_score"] == pytest.approx(1 / 62 + 1 / 61, abs=1e-6)
+    assert len(fused) == 3
+
+
+def test_fuse_results_does_not_mutate_input():
+    search_results = [_result_set("google", "q", ["https://a.org/x"])]
+
+    fuse_results(search_results)
+
+    assert search_results[0]["results"]["results"][0] == {"url": "https://a.org/x", "title": "x"}
@@ -0,0 +1,132 @@
+"""Tests for result_spill."""
+
+import io
+import json
+import os
+import time
+
+import pytest
+
+from result_spill import ResultSpill, prune_spills, write_json_report
+
+
+def _result_set(engine, urls):
+    return {
+        "engine": engine,
+        "query": f"{engine} query",
+        "results": {"results": [{"url": url, "title": url, "content": "snippet"} for url in urls]},
+    }
+
+
+def test_append_and_load_round_trip(tmp_path):
+    spill = ResultSpill(str(tmp_path / "run.jsonl"))
+    first = _result_set("google", ["https://a.org/1", "https://a.org/2"])
+    second = _result_set("bing", ["https://b.org/1"])
+
+    ref = spill.append_search(first)
+    spill.append_search(second)
+
+    assert ref == {"engine": "google", "query": "google query", "hits": 2, "spill": ref["spill"]}
+    assert spill.load(ref) == first
+    assert list(spill.iter_results()) == [first, second]
+    spill.close()
+
+
+def test_content_is_merged_into_hits_by_url_or_canonical_url(tmp_path):
+    spill = ResultSpill(str(tmp_path / "run.jsonl"))
+    ref = spill.append_search(_result_set("google", ["https://a.org/1", "http://www.a.org/2/"]))
+
+    spill.append_content("https://a.org/1", "full page one")
+    spill.append_content("https://mirror.a.org/2", "full page two", canonical_url="https://a.org/2")
+
+    hits = spill.load(ref)["results"]["results"]
+    assert [hit["raw_content"] for hit in hits] == ["full page one", "full page two"]
+    # References only count search result sets
+    assert len(spill.refs) == 1
+    spill.close()
+
+
+def test_reopen_rebuilds_references(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    spill = ResultSpill(path)
+    refs = [
+        spill.append_search(_result_set(engine, [f"https://{engine}.org/1"]))
+        for engine in ("a", "b")
+    ]
+    spill.append_content("https://b.org/1", "page")
+    spill.close()
+
+    reopened = ResultSpill.open(path)
+
+    assert reopened.refs == refs
+    assert reopened.load(refs[1])["results"]["results"][0]["raw_content"] == "page"
+    reopened.close()
+
+
+def test_write_json_report_inlines_spilled_result_sets(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    spill = ResultSpill(path)
+    first = _result_set("google", ["https://a.org/1"])
+    refs = [spill.append_search(first)]
+    spill.close()
+    report = {"topic": "rural housing", "spill_path": path, "search_results": refs, "count": 1}
+
+    buffer = io.StringIO()
+    write_json_report(report, buffer)
+
+    assert json.loads(buffer.getvalue()) == {**report, "search_results": [first]}
+    compact = io.StringIO()
+    write_json_report(report, compact, indent=None)
+    assert json.loads(compact.getvalue()) == json.loads(buffer.getvalue())
+
+
+def test_write_json_report_without_spill_file(tmp_path):
+    report = {
+        "spill_path": str(tmp_path / "missing.jsonl"),
+        "search_results": [{"engine": "google"}],
+    }
+
+    buffer = io.StringIO()
+    write_json_report(report, buffer)
+
+    assert json.loads(buffer.getvalue()) == report
+
+
+def test_for_run_gives_concurrent_runs_their_own_files(tmp_path):
+    first = ResultSpill.for_run("run-1", str(tmp_path))
+    second = ResultSpill.for_run("run-1", str(tmp_path))
+    first.append_search(_result_set("google", ["https://a.org/1"]))
+    second.append_search(_result_set("bing", ["https://b.org/1"]))
+
+    assert first.path != second.path
+    assert first.path.name.startswith("run-1-")
+    assert [ref["engine"] for ref in first.refs] == ["google"]
+    assert first.load(first.refs[0])["engine"] == "google"
+    first.close()
+    second.close()
+
+
+@pytest.mark.parametrize("run_id", ["../../outside", "/etc/passwd", "a/b", "", "x" * 100])
+def test_for_run_hashes_unsafe_run_ids_inside_the_directory(tmp_path, run_id):
+    spill_dir = tmp_path / "runs"
+    victim = tmp_path / "outside.jsonl"
+    victim.write_text("keep me")
+
+    spill = ResultSpill.for_run(run_id, str(spill_dir))
+    spill.close()
+
+    assert spill.path.parent == spill_dir
+    assert spill.path.name.endswith(".jsonl") and "/" not in spill.path.name
+    assert victim.read_text() == "keep me"
+
+
+def test_prune_spills_removes_only_old_files(tmp_path):
+    old = ResultSpill.for_run("old", str(tmp_path))
+    new = ResultSpill.for_run("new", str(tmp_path))
+    old.close()
+    new.close()
+    stale = time.time() - 7200
+    os.utime(old.path, (stale, stale))
+
+    assert prune_spills(str(tmp_path), max_age=3600) == 1
+    assert not old.path.exists() and new.path.exists()
@@ -0,0 +1,118 @@
+"""Tests for run_checkpoint and resuming research runs."""
+
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from run_checkpoint import RunCheckpoint, RunCheckpointMismatchError, RunCheckpointStore
+
+
+@dataclass
+class Params:
+    keywords: list
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RunCheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    yield store
+    store.close()
+
+
+def test_disabled_checkpoint_misses_and_saves_nothing(store):
+    for checkpoint in (RunCheckpoint(None, "run"), RunCheckpoint(store, None)):
+        checkpoint.set("search", {"hits": 1}, "q")
+
+        assert not checkpoint.enabled
+        assert checkpoint.get("search", "q") is None
+        assert checkpoint.bind({"depth": "deep"}) is False
+        assert checkpoint.stats()["saved"] == 0
+
+
+def test_stage_outputs_are_scoped_to_run_and_counted(store):
+    first = RunCheckpoint(store, "run-a")
+    first.set("search", {"hits": 3}, "google", "query")
+
+    resumed = RunCheckpoint(store, "run-a")
+    other = RunCheckpoint(store, "run-b")
+
+    assert resumed.get("search", "google", "query") == {"hits": 3}
+    assert resumed.get("search", "bing", "query") is None
+    assert other.get("search", "google", "query") is None
+    assert first.stats() == {"run_id": "run-a", "resumed": 0, "saved": 1}
+    assert resumed.stats() == {"run_id": "run-a", "resumed": 1, "saved": 0}
+
+
+def test_async_variants_round_trip(store):
+    checkpoint = RunCheckpoint(store, "run")
+
+    async def roundtrip():
+        await checkpoint.aset("llm", "answer", "prompt")
+        return await checkpoint.aget("llm", "prompt")
+
+    assert asyncio.run(roundtrip()) == "answer"
+
+
+def test_bind_records_then_accepts_same_parameters(store):
+    params = {"criteria": Params(keywords=["rural"]), "depth": "deep"}
+
+    assert RunCheckpoint(store, "run").bind(params) is False
+    assert RunCheckpoint(store, "run").bind(params) is True
+
+
+def test_bind_rejects_changed_parameters(store):
+    RunCheckpoint(store, "run").bind({"criteria": Params(keywords=["rural"]), "depth": "deep"})
+
+    with pytest.raises(RunCheckpointMismatchError):
+        RunCheckpoint(store, "run").bind({"criteria": Params(keywords=["urban"]), "depth": "deep"})
+
+
+def _agent(fake_services, store, **kwargs):
+    from grant_agent import GrantResearchAgent
+
+    return GrantResearchAgent(
+        tavily_api_key="test",
+        openrouter_api_key="test",
+        tavily_base_url=fake_services["search_url"],
+        openrouter_base_url=fake_services["llm_url"],
+        enable_search_cache=False,
+        enable_llm_cache=False,
+        enable_opportunity_store=False,
+        checkpoint_store=store,
+        **kwargs,
+    )
+
+
+def test_resumed_run_replays_every_saved_stage(fake_services, store):
+    from search_operators import GrantSearchCriteria
+
+    criteria = GrantSearchCriteria(keywords=["renewable energy"])
+
+    async def research():
+        agent = _agent(fake_services, store)
+        return await agent.research_grants(criteria, depth="basic", run_id="resume-me")
+
+    first = asyncio.run(research())
+    second = asyncio.run(research())
+
+    assert first["checkpoint"]["resumed"] == 0
+    assert first["checkpoint"]["saved"] > 0
+    assert second["checkpoint"] == {
+        "run_id": "resume-me",
+        "resumed": first["checkpoint"]["saved"],
+        "saved": 0,
+    }
+    assert second["search_results"] == first["search_results"]
+    assert second["opportunities"] == first["opportunities"]
+
+
+def test_resume_with_changed_parameters_raises(fake_services, store):
+    from search_operators import GrantSearchCriteria
+
+    criteria = GrantSearchCriteria(keywords=["renewable energy"])
+    agent = _agent(fake_services, store)
+    asyncio.run(agent.research_grants(criteria, depth="basic", run_id="fixed"))
+
+    with pytest.raises(RunCheckpointMismatchError):
+        asyncio.run(agent.research_grants(criteria, depth="deep", run_id="fixed"))